@@ -1,25 +1,164 @@
-from flask import Flask, request, jsonify
+import time
+_import_started = time.perf_counter()
+
+from datetime import date
+
+from flask import Flask, Response, g, request, jsonify
+from functools import wraps
 import numpy as np
 import os
-import xgboost as xgb
-import psycopg2
+import sys
+import threading
 from dotenv import load_dotenv
 from urllib.parse import urlparse
 
+try:
+    # when imported as a package: gunicorn api.app:app / tests
+    from .elo_history import elo_as_of, leaderboard
+    from .inference import Predictor
+    from .model_loader import load_model
+    from .prediction_log import prediction_log, prediction_record
+    from .prediction_matrix import PredictionMatrix
+    from .simulation import cached_simulation
+    from .team_stats import CACHE_TTL as TEAM_STATS_TTL, add_invalidation_listener, get_all_team_stats, get_team_stats_many
+except ImportError:
+    # when run as script: python api/app.py (the project root isn't on sys.path)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from elo_history import elo_as_of, leaderboard
+    from inference import Predictor
+    from model_loader import load_model
+    from prediction_log import prediction_log, prediction_record
+    from prediction_matrix import PredictionMatrix
+    from simulation import cached_simulation
+    from team_stats import CACHE_TTL as TEAM_STATS_TTL, add_invalidation_listener, get_all_team_stats, get_team_stats_many
+
+from db import pool_stats, record_pool_stats
+from league import FEATURE_NAMES
+from metrics import Histogram, SamplingProfiler, StageTimer, render as render_metrics
+
 load_dotenv()
 
-# Load the XGBoost model
-MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'match_predictor_xgb.json')
-model = xgb.XGBClassifier()
-model.load_model(MODEL_PATH)
-#model.load_model("match_predictor_xgb.json")
+# Import cost of the app module itself (xgboost is imported later, by the loader)
+startup_timings = {'import_app_ms': (time.perf_counter() - _import_started) * 1000}
 
 # Inverse label map
 label_map = {0: 'Home Win', 1: 'Draw', 2: 'Away Win'}
 
+# Upper bound on rows scored by a single /predict_batch call
+MAX_BATCH_ROWS = int(os.getenv("MAX_BATCH_ROWS", 5000))
+
+# Materialized predictions: serve /predict_match from a precomputed all-pairs table
+MATERIALIZED_PREDICTIONS = os.getenv("MATERIALIZED_PREDICTIONS", "0") == "1"
+prediction_matrix = PredictionMatrix(None, get_all_team_stats, max_age=TEAM_STATS_TTL)
+add_invalidation_listener(prediction_matrix.mark_stale)
+
+# Latency metrics, served in Prometheus text format by GET /metrics
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency by route.", ["endpoint", "method", "status"])
+STAGE_SECONDS = Histogram(
+    "http_request_stage_seconds", "Time spent per request stage (parse, db, matrix, features, inference, serialize).",
+    ["endpoint", "stage"])
+
+# Opt-in per-request sampling profiler: with PROFILING_ENABLED=1, a request
+# carrying "X-Profile: <PROFILE_TOKEN>" is sampled every PROFILE_INTERVAL seconds and its collapsed stacks written to
+# PROFILE_DIR; the file name comes back in the X-Profile-File header.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "logs/profiles")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.001))
+if PROFILING_ENABLED and not PROFILE_TOKEN:
+    print("⚠️ PROFILING_ENABLED is set but PROFILE_TOKEN is not; profiling stays off.", flush=True)
+
+# Load the XGBoost model (UBJSON copy if exported, else JSON), validated and warmed up.
+#   MODEL_LOAD_MODE=eager       load during import (default; gunicorn preloads it in the master)
+#   MODEL_LOAD_MODE=background  start serving at once; /healthz is 503 until the model is ready
+MODEL_LOAD_MODE = os.getenv("MODEL_LOAD_MODE", "eager")
+MODEL_WAIT_TIMEOUT = float(os.getenv("MODEL_WAIT_TIMEOUT", 10))
+model = None
+predictor = None
+model_ready = False
+model_error = None
+_model_loaded = threading.Event()
+_loader_pid = None
+
+def _load_model():
+    global model, predictor, model_ready, model_error
+    t0 = time.perf_counter()
+    try:
+        loaded, timings = load_model(FEATURE_NAMES)
+    except Exception as e:
+        model_error = str(e)
+        print(f"❌ Model failed to load: {model_error}", flush=True)
+        raise
+    model = loaded
+    predictor = Predictor(model)
+    prediction_matrix.predictor = predictor
+    startup_timings.update(timings)
+    startup_timings['model_total_ms'] = (time.perf_counter() - t0) * 1000
+    model_ready = True
+    _model_loaded.set()
+    print("✅ Model ready: " + ", ".join(
+        f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}" for k, v in startup_timings.items()
+    ), flush=True)
+
+def start_model_loading():
+    """Load the model in a background thread (at most one per process)."""
+    global _loader_pid
+    if model_ready or _loader_pid == os.getpid():
+        return
+    _loader_pid = os.getpid()
+    threading.Thread(target=_load_model, name="model-loader", daemon=True).start()
+
+if MODEL_LOAD_MODE == "background":
+    start_model_loading()
+else:
+    _load_model()
+
+def requires_model(view):
+    """Answer 503 instead of failing if the model isn't loaded yet."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _model_loaded.wait(MODEL_WAIT_TIMEOUT):
+            return jsonify({'error': model_error or 'Model is still loading'}), 503
+        return view(*args, **kwargs)
+    return wrapper
+
+def _format_probabilities(probabilities):
+    return {
+        'Home Win': round(float(probabilities[0]), 2),
+        'Draw': round(float(probabilities[1]), 2),
+        'Away Win': round(float(probabilities[2]), 2)
+    }
+
 # Initialize Flask app
 app = Flask(__name__)
 
+def _profile_requested():
+    if not (PROFILING_ENABLED and PROFILE_TOKEN):
+        return False
+    return request.headers.get('X-Profile') == PROFILE_TOKEN
+
+@app.before_request
+def _start_request():
+    g.request_started = time.perf_counter()
+    g.profiler = SamplingProfiler(interval=PROFILE_INTERVAL).start() if _profile_requested() else None
+
+@app.after_request
+def _finish_request(response):
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    started = g.get('request_started')
+    if started is not None:
+        REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint,
+                                method=request.method, status=response.status_code)
+    profiler = g.get('profiler')
+    if profiler is not None:
+        profiler.stop()
+        name = f"{int(time.time() * 1000)}-{os.getpid()}-{endpoint.strip('/').replace('/', '_') or 'root'}.folded"
+        profiler.write(os.path.join(PROFILE_DIR, name))
+        response.headers['X-Profile-File'] = name
+        response.headers['X-Profile-Samples'] = str(sum(profiler.samples.values()))
+    return response
+
 # Root endpoint for test
 
 @app.route("/")
@@ -29,9 +168,27 @@ def home():
 def index():
     return "Football Match Predictor API is running."
 
+# Readiness probe: only healthy once the model is loaded in this worker
+@app.route('/healthz')
+def healthz():
+    if not model_ready:
+        status = 'error' if model_error else 'loading'
+        return jsonify({'status': status, 'model_loaded': False, 'error': model_error}), 503
+    return jsonify({
+        'status': 'ok',
+        'model_loaded': True,
+        'inference_backend': predictor.backend,
+        'startup_timings': startup_timings,
+        'materialized_predictions': MATERIALIZED_PREDICTIONS and not prediction_matrix.stale,
+        'db_pool': pool_stats(),
+        'pid': os.getpid()
+    })
+
 # POST endpoint for direct features
 @app.route('/predict', methods=['POST'])
+@requires_model
 def predict():
+    timer = StageTimer(STAGE_SECONDS, endpoint='/predict')
     try:
         data = request.get_json()
         features = [
@@ -42,59 +199,66 @@ def predict():
             data['elo_home'],
             data['elo_away']
         ]
-        input_array = np.array(features).reshape(1, -1)
-        prediction = model.predict(input_array)[0]
-        probabilities = model.predict_proba(input_array)[0]
-
-        return jsonify({
+        timer.lap('parse')
+        prediction, probabilities = predictor.predict(features)
+        timer.lap('inference')
+        result = {
             'prediction': label_map[prediction],
-            'probabilities': {
-                'Home Win': round(float(probabilities[0]), 2),
-                'Draw': round(float(probabilities[1]), 2),
-                'Away Win': round(float(probabilities[2]), 2)
-            }
-        })
+            'probabilities': _format_probabilities(probabilities)
+        }
+        response = jsonify(result)
+        timer.lap('serialize')
+        if prediction_log.enabled:
+            prediction_log.log(prediction_record('/predict', features, **result))
+        return response
 
     except Exception as e:
         print(f"Error in /predict: {str(e)}", flush=True)
         return jsonify({'error': str(e)}), 400
 
-# Function to get team stats from PostgreSQL
+# Team stats come from a pooled, cached lookup (see api/team_stats.py)
 def get_team_stats(team_name):
-    """Query team stats from the PostgreSQL DB using DATABASE_URL"""
-    db_url = os.getenv("DATABASE_URL")
-    if not db_url:
-        raise ValueError("DATABASE_URL not set in environment variables")
-
-    # Directly connect using the full DATABASE_URL
-    conn = psycopg2.connect(db_url)
-
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT form_goals, win_rate, elo_rating FROM team_stats WHERE team_name = %s
-    """, (team_name,))
-    result = cur.fetchone()
-    conn.close()
-
-    if result:
-        return {
-            "form_goals": result[0],
-            "win_rate": result[1],
-            "elo_rating": result[2]
-        }
-    else:
-        raise ValueError(f"No stats found for team: {team_name}")
+    """Return the team_stats row for one team"""
+    return lookup_team_stats([team_name])[team_name]
+
+def lookup_team_stats(team_names):
+    """Fetch stats for several teams in one query; raises if any is unknown"""
+    stats = get_team_stats_many(team_names)
+    for team_name in team_names:
+        if team_name not in stats:
+            raise ValueError(f"No stats found for team: {team_name}")
+    return stats
 
 # POST endpoint for team names (Arsenal vs Chelsea)
 @app.route('/predict_match', methods=['POST'])
+@requires_model
 def predict_match():
+    timer = StageTimer(STAGE_SECONDS, endpoint='/predict_match')
     try:
         data = request.get_json()
         home_team = data['home_team']
         away_team = data['away_team']
+        timer.lap('parse')
 
-        home_stats = get_team_stats(home_team)
-        away_stats = get_team_stats(away_team)
+        if MATERIALIZED_PREDICTIONS:
+            probabilities = prediction_matrix.lookup(home_team, away_team)
+            timer.lap('matrix')
+            if probabilities is not None:
+                result = {
+                    'prediction': label_map[int(probabilities.argmax())],
+                    'probabilities': _format_probabilities(probabilities)
+                }
+                response = jsonify(result)
+                timer.lap('serialize')
+                if prediction_log.enabled:
+                    prediction_log.log(prediction_record(
+                        '/predict_match', None, home_team=home_team, away_team=away_team,
+                        source='matrix', **result))
+                return response
+
+        stats = lookup_team_stats([home_team, away_team])
+        home_stats = stats[home_team]
+        away_stats = stats[away_team]
 
         features = [
             home_stats['form_goals'],
@@ -104,24 +268,229 @@ def predict_match():
             home_stats['elo_rating'],
             away_stats['elo_rating']
         ]
+        timer.lap('db')
 
-        input_array = np.array(features).reshape(1, -1)
-        prediction = model.predict(input_array)[0]
-        probabilities = model.predict_proba(input_array)[0]
-
-        return jsonify({
+        prediction, probabilities = predictor.predict(features)
+        timer.lap('inference')
+        result = {
             'prediction': label_map[prediction],
-            'probabilities': {
-                'Home Win': round(float(probabilities[0]), 2),
-                'Draw': round(float(probabilities[1]), 2),
-                'Away Win': round(float(probabilities[2]), 2)
-            }
-        })
+            'probabilities': _format_probabilities(probabilities)
+        }
+        response = jsonify(result)
+        timer.lap('serialize')
+        if prediction_log.enabled:
+            prediction_log.log(prediction_record(
+                '/predict_match', features, home_team=home_team, away_team=away_team, **result))
+        return response
 
     except Exception as e:
         print(f"Error in /predict_match: {str(e)}", flush=True)
         return jsonify({'error': str(e)}), 400
 
+def _batch_team_names(rows):
+    names = []
+    for item in rows:
+        if isinstance(item, dict):
+            for key in ('home_team', 'away_team'):
+                if isinstance(item.get(key), str):
+                    names.append(item[key])
+    return names
+
+def _batch_row_features(item, team_stats, team_error=None):
+    """
+    Turn one /predict_batch item into a feature list (raises on bad input).
+    team_error is set when the team lookup failed; only team rows fail with it.
+    """
+    if isinstance(item, (list, tuple)):
+        if len(item) != len(FEATURE_NAMES):
+            raise ValueError(f"Expected {len(FEATURE_NAMES)} features, got {len(item)}")
+        return [float(v) for v in item]
+
+    if not isinstance(item, dict):
+        raise ValueError("Each row must be a feature list or an object")
+
+    if 'home_team' in item or 'away_team' in item:
+        home_team = item['home_team']
+        away_team = item['away_team']
+        if team_error is not None:
+            raise RuntimeError(f"Team stats unavailable: {team_error}")
+        for team in (home_team, away_team):
+            if team not in team_stats:
+                raise ValueError(f"No stats found for team: {team}")
+        home_stats = team_stats[home_team]
+        away_stats = team_stats[away_team]
+        return [
+            float(home_stats['form_goals']),
+            float(away_stats['form_goals']),
+            float(home_stats['win_rate']),
+            float(away_stats['win_rate']),
+            float(home_stats['elo_rating']),
+            float(away_stats['elo_rating'])
+        ]
+
+    return [float(item[name]) for name in FEATURE_NAMES]
+
+# POST endpoint for many fixtures at once (a gameweek or a whole season)
+@app.route('/predict_batch', methods=['POST'])
+@requires_model
+def predict_batch():
+    """
+    Accepts either a JSON list or {"rows": [...]}; each row is a list of the six
+    features, an object keyed by FEATURE_NAMES, or {"home_team", "away_team"}.
+    All valid rows are scored with a single predict_proba call and returned in
+    input order; invalid rows get an {"error": ...} entry instead.
+    """
+    timer = StageTimer(STAGE_SECONDS, endpoint='/predict_batch')
+    data = request.get_json(silent=True)
+    rows = data.get('rows') if isinstance(data, dict) else data
+    if not isinstance(rows, list):
+        return jsonify({'error': "Body must be a list of rows or {'rows': [...]}"}), 400
+    if len(rows) > MAX_BATCH_ROWS:
+        return jsonify({'error': f"Batch too large ({len(rows)} > {MAX_BATCH_ROWS} rows)"}), 400
+
+    # All teams in the batch are fetched with a single query; if it fails only
+    # the team rows error out and the feature rows are still scored
+    team_names = _batch_team_names(rows)
+    timer.lap('parse')
+    team_stats, team_error = {}, None
+    try:
+        if team_names:
+            team_stats = get_team_stats_many(team_names)
+    except Exception as e:
+        print(f"Error in /predict_batch: {str(e)}", flush=True)
+        team_error = str(e)
+    timer.lap('db')
+
+    results = [None] * len(rows)
+    valid_idx = []
+    matrix = []
+    for i, item in enumerate(rows):
+        try:
+            matrix.append(_batch_row_features(item, team_stats, team_error))
+            valid_idx.append(i)
+        except KeyError as e:
+            results[i] = {'error': f"Missing field: {e.args[0]}"}
+        except Exception as e:
+            results[i] = {'error': str(e)}
+    timer.lap('features')
+
+    if matrix:
+        try:
+            probabilities = predictor.predict_proba(matrix)
+        except Exception as e:
+            print(f"Error in /predict_batch: {str(e)}", flush=True)
+            return jsonify({'error': str(e)}), 500
+
+        labels = probabilities.argmax(axis=1)
+        for i, label, probs in zip(valid_idx, labels, probabilities):
+            results[i] = {
+                'prediction': label_map[int(label)],
+                'probabilities': _format_probabilities(probs)
+            }
+        timer.lap('inference')
+
+    response = jsonify({
+        'count': len(results),
+        'errors': len(rows) - len(valid_idx),
+        'results': results
+    })
+    timer.lap('serialize')
+    return response
+
+# Prometheus scrape endpoint (per worker; see metrics/metrics.py)
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    record_pool_stats()
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+# Whole materialized prediction table (teams x teams x [Home Win, Draw, Away Win])
+@app.route('/matrix', methods=['GET'])
+@requires_model
+def matrix():
+    try:
+        snapshot = prediction_matrix.ensure_fresh()
+    except Exception as e:
+        print(f"Error in /matrix: {str(e)}", flush=True)
+        return jsonify({'error': str(e)}), 503
+
+    probabilities = np.round(snapshot.probabilities.astype(float), 4)
+    table = [[None if np.isnan(cell[0]) else cell.tolist() for cell in row] for row in probabilities]
+    return jsonify({
+        'teams': snapshot.teams,
+        'labels': [label_map[i] for i in range(3)],
+        'built_at': snapshot.built_at,
+        'probabilities': table
+    })
+
+# Monte Carlo rest-of-season table, e.g. /simulate?sims=100000&source=elo
+@app.route('/simulate', methods=['GET'])
+@requires_model
+def simulate():
+    try:
+        season = request.args.get('season')
+        season = int(season) if season else None
+        n_sims = int(request.args.get('sims', 100_000))
+        source = request.args.get('source', 'model')
+        if n_sims < 1:
+            raise ValueError("sims must be positive")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        summary = cached_simulation(season, n_sims, source, predictor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"Error in /simulate: {str(e)}", flush=True)
+        return jsonify({'error': str(e)}), 503
+    return jsonify(summary)
+
+def _history_args():
+    """Common ?as_of=YYYY-MM-DD&rating_type=&source= query args for the Elo history endpoints."""
+    as_of = request.args.get('as_of')
+    return (
+        date.fromisoformat(as_of) if as_of else date.today(),
+        request.args.get('rating_type', 'elo'),
+        request.args.get('source', 'pipeline'),
+    )
+
+# Elo leaderboard as of a date (default today)
+@app.route('/elo/leaderboard', methods=['GET'])
+def elo_leaderboard():
+    try:
+        as_of, rating_type, source = _history_args()
+        limit = min(int(request.args.get('limit', 20)), 200)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        table = leaderboard(as_of, limit, rating_type, source)
+    except Exception as e:
+        print(f"Error in /elo/leaderboard: {str(e)}", flush=True)
+        return jsonify({'error': str(e)}), 503
+    return jsonify({'as_of': as_of.isoformat(), 'leaderboard': table})
+
+# A team's Elo as it stood on a date, e.g. /elo/Arsenal?as_of=2024-01-01
+@app.route('/elo/<team>', methods=['GET'])
+def elo_history(team):
+    try:
+        as_of, rating_type, source = _history_args()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        rating = elo_as_of(team, as_of, rating_type, source)
+    except Exception as e:
+        print(f"Error in /elo: {str(e)}", flush=True)
+        return jsonify({'error': str(e)}), 503
+    if rating is None:
+        return jsonify({'error': f"No Elo history for {team} on or before {as_of.isoformat()}"}), 404
+    return jsonify({'as_of': as_of.isoformat(), **rating})
+
+# Build the table up front so the first /predict_match is already a lookup
+if MATERIALIZED_PREDICTIONS:
+    try:
+        prediction_matrix.build()
+    except Exception as e:
+        print(f"⚠️ Could not materialize predictions at startup: {str(e)}", flush=True)
+
 # Run the app
 if __name__ == '__main__':
     print("⚽ Starting Flask app...")
@@ -0,0 +1,165 @@
+# api/async_app.py
+"""
+Async serving mode (Quart + asyncpg) with the same /predict and /predict_match
+contracts as api/app.py.
+
+- team_stats lookups go through an asyncpg pool (api/async_team_stats.py), so a
+  worker keeps serving while queries are in flight.
+- Single-match predictions are micro-batched (api/micro_batcher.py): requests
+  arriving within MICRO_BATCH_WINDOW_MS share one predict_proba call on a
+  bounded inference pool (ASYNC_INFERENCE_WORKERS threads).
+- The model, label map and materialized matrix are the ones api/app.py loads,
+  so both modes answer identically.
+
+Run from project root:
+  hypercorn --bind 0.0.0.0:$PORT --workers 2 api.async_app:app
+"""
+import asyncio
+import os
+
+from quart import Quart, jsonify, request
+
+from league import FEATURE_NAMES
+
+try:
+    from . import app as sync_app
+    from .async_team_stats import AsyncTeamStats
+    from .micro_batcher import MicroBatcher
+    from .prediction_log import prediction_log, prediction_record
+except ImportError:
+    import app as sync_app
+    from async_team_stats import AsyncTeamStats
+    from micro_batcher import MicroBatcher
+    from prediction_log import prediction_log, prediction_record
+
+label_map = sync_app.label_map
+MICRO_BATCH_WINDOW = float(os.getenv("MICRO_BATCH_WINDOW_MS", 2)) / 1000
+MICRO_BATCH_MAX = int(os.getenv("MICRO_BATCH_MAX", 64))
+INFERENCE_WORKERS = int(os.getenv("ASYNC_INFERENCE_WORKERS", 1))
+
+team_stats = AsyncTeamStats()
+team_stats.add_invalidation_listener(sync_app.prediction_matrix.mark_stale)
+batcher = MicroBatcher(lambda X: sync_app.predictor.predict_proba(X), workers=INFERENCE_WORKERS,
+                       window=MICRO_BATCH_WINDOW, max_batch=MICRO_BATCH_MAX)
+
+app = Quart(__name__)
+
+
+async def _model_ready() -> bool:
+    if sync_app.model_ready:
+        return True
+    return await asyncio.to_thread(sync_app._model_loaded.wait, sync_app.MODEL_WAIT_TIMEOUT)
+
+
+def _model_unavailable():
+    return jsonify({'error': sync_app.model_error or 'Model is still loading'}), 503
+
+
+@app.after_serving
+async def _shutdown():
+    await batcher.close()
+    await team_stats.close()
+    prediction_log.close()
+
+
+@app.route('/')
+async def home():
+    return "⚽ EPL Predictor API is running!"
+
+
+@app.route('/healthz')
+async def healthz():
+    if not sync_app.model_ready:
+        status = 'error' if sync_app.model_error else 'loading'
+        return jsonify({'status': status, 'model_loaded': False, 'error': sync_app.model_error}), 503
+    return jsonify({
+        'status': 'ok',
+        'model_loaded': True,
+        'mode': 'async',
+        'inference_backend': sync_app.predictor.backend,
+        'micro_batches': batcher.batches,
+        'micro_batched_rows': batcher.rows,
+        'materialized_predictions': sync_app.MATERIALIZED_PREDICTIONS and not sync_app.prediction_matrix.stale,
+        'pid': os.getpid()
+    })
+
+
+@app.route('/predict', methods=['POST'])
+async def predict():
+    if not await _model_ready():
+        return _model_unavailable()
+    try:
+        data = await request.get_json()
+        # validated per request: a bad value must fail here, not inside a shared batch
+        features = [float(data[name]) for name in FEATURE_NAMES]
+        probabilities = await batcher.predict(features)
+        result = {
+            'prediction': label_map[int(probabilities.argmax())],
+            'probabilities': sync_app._format_probabilities(probabilities)
+        }
+        if prediction_log.enabled:
+            prediction_log.log(prediction_record('/predict', features, **result))
+        return jsonify(result)
+
+    except Exception as e:
+        print(f"Error in /predict: {str(e)}", flush=True)
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/predict_match', methods=['POST'])
+async def predict_match():
+    if not await _model_ready():
+        return _model_unavailable()
+    try:
+        data = await request.get_json()
+        home_team = data['home_team']
+        away_team = data['away_team']
+
+        source = 'model'
+        features = None
+        probabilities = None
+        if sync_app.MATERIALIZED_PREDICTIONS:
+            matrix = sync_app.prediction_matrix
+            if matrix.stale:
+                # a rebuild queries team_stats and scores every pair: keep it off the event loop
+                probabilities = await asyncio.to_thread(matrix.lookup, home_team, away_team)
+            else:
+                probabilities = matrix.lookup(home_team, away_team)
+            source = 'matrix'
+
+        if probabilities is None:
+            source = 'model'
+            stats = await team_stats.get_many([home_team, away_team])
+            for team in (home_team, away_team):
+                if team not in stats:
+                    raise ValueError(f"No stats found for team: {team}")
+            home_stats = stats[home_team]
+            away_stats = stats[away_team]
+            features = [
+                home_stats['form_goals'],
+                away_stats['form_goals'],
+                home_stats['win_rate'],
+                away_stats['win_rate'],
+                home_stats['elo_rating'],
+                away_stats['elo_rating']
+            ]
+            probabilities = await batcher.predict(features)
+
+        result = {
+            'prediction': label_map[int(probabilities.argmax())],
+            'probabilities': sync_app._format_probabilities(probabilities)
+        }
+        if prediction_log.enabled:
+            prediction_log.log(prediction_record(
+                '/predict_match', features, home_team=home_team, away_team=away_team,
+                source=source, **result))
+        return jsonify(result)
+
+    except Exception as e:
+        print(f"Error in /predict_match: {str(e)}", flush=True)
+        return jsonify({'error': str(e)}), 400
+
+
+if __name__ == '__main__':
+    port = int(os.environ.get("PORT", 5050))
+    app.run(host='0.0.0.0', port=port)
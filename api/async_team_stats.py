@@ -0,0 +1,101 @@
+# api/async_team_stats.py
+"""
+asyncpg counterpart of api/team_stats.py for the async serving mode.
+
+Same contract as get_team_stats_many(): one `team_name = ANY($1)` query for
+the teams missing from a TTL cache. The pool is created lazily inside the
+running event loop, and a dedicated connection LISTENs on team_stats_updated
+so the Elo pipeline's NOTIFY drops the cache at once.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import asyncpg
+
+from db.db import MAX_OVERFLOW, POOL_SIZE
+
+try:
+    from .team_stats import CACHE_TTL, TEAM_STATS_CHANNEL, _database_url
+except ImportError:
+    from team_stats import CACHE_TTL, TEAM_STATS_CHANNEL, _database_url
+
+STATS_SQL = "SELECT team_name, form_goals, win_rate, elo_rating FROM team_stats WHERE team_name = ANY($1::text[])"
+
+
+class AsyncTeamStats:
+    def __init__(self, dsn: Optional[str] = None, ttl: float = CACHE_TTL,
+                 min_size: int = 1, max_size: int = POOL_SIZE + MAX_OVERFLOW):
+        self.dsn = dsn
+        self.ttl = ttl
+        self.min_size = min_size
+        self.max_size = max_size
+        self.pool: Optional[asyncpg.Pool] = None
+        self._listen_conn = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._cache: Dict[str, tuple] = {}  # team_name -> (expires_at, stats)
+        self._invalidation_listeners: List[Callable[[], None]] = []
+
+    async def start(self) -> None:
+        """Create the pool and the LISTEN connection (idempotent)."""
+        if self.pool is not None:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.pool is not None:
+                return
+            dsn = self.dsn or _database_url()
+            self.pool = await asyncpg.create_pool(dsn, min_size=self.min_size, max_size=self.max_size)
+            try:
+                self._listen_conn = await asyncpg.connect(dsn)
+                await self._listen_conn.add_listener(TEAM_STATS_CHANNEL, self._on_notify)
+            except Exception as e:
+                print(f"⚠️ team_stats LISTEN unavailable, relying on TTL only: {e}", flush=True)
+                self._listen_conn = None
+
+    async def close(self) -> None:
+        if self._listen_conn is not None:
+            await self._listen_conn.close()
+            self._listen_conn = None
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    def _on_notify(self, *_args) -> None:
+        self.invalidate()
+
+    def add_invalidation_listener(self, callback: Callable[[], None]) -> None:
+        self._invalidation_listeners.append(callback)
+
+    def invalidate(self) -> None:
+        self._cache.clear()
+        for callback in self._invalidation_listeners:
+            callback()
+
+    async def get_many(self, team_names: Iterable[str]) -> Dict[str, dict]:
+        """{team_name: {"form_goals", "win_rate", "elo_rating"}} for the teams that exist."""
+        names = list(dict.fromkeys(team_names))
+        now = time.monotonic()
+        found: Dict[str, dict] = {}
+        missing = []
+        for name in names:
+            entry = self._cache.get(name)
+            if entry is not None and entry[0] > now:
+                found[name] = entry[1]
+            else:
+                missing.append(name)
+
+        if missing:
+            await self.start()
+            rows = await self.pool.fetch(STATS_SQL, missing)
+            expires_at = time.monotonic() + self.ttl
+            for row in rows:
+                stats = {
+                    "form_goals": row["form_goals"],
+                    "win_rate": row["win_rate"],
+                    "elo_rating": row["elo_rating"]
+                }
+                self._cache[row["team_name"]] = (expires_at, stats)
+                found[row["team_name"]] = stats
+        return found
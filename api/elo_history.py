@@ -0,0 +1,36 @@
+# api/elo_history.py
+"""
+Time-travel reads over the elo_ratings history table, for the /elo endpoints.
+
+The queries live in db/db_utils.py (get_elo_as_of, get_elo_leaderboard) and
+are answered from the elo_ratings indexes:
+  - as-of: one backward range scan on ux_elo_ratings_team_date
+    (team_name, rating_date <= as_of), LIMIT 1
+  - leaderboard: a rating_date range scan on ix_elo_ratings_type_date covering
+    only recently rated teams (ELO_LEADERBOARD_ACTIVE_DAYS, default 60), then
+    the latest row per team
+"""
+import os
+from datetime import date
+from typing import Dict, List, Optional
+
+from db.db_utils import get_elo_as_of, get_elo_leaderboard
+
+LEADERBOARD_ACTIVE_DAYS = int(os.getenv("ELO_LEADERBOARD_ACTIVE_DAYS", 60))
+
+
+def elo_as_of(team_name: str, as_of: date, rating_type: str = "elo",
+              source: str = "pipeline") -> Optional[Dict]:
+    row = get_elo_as_of(team_name, as_of, rating_type, source)
+    if row is None:
+        return None
+    return {"team": team_name, "rating_date": row[0].isoformat(), "elo_rating": row[1]}
+
+
+def leaderboard(as_of: date, limit: int = 20, rating_type: str = "elo",
+                source: str = "pipeline") -> List[Dict]:
+    rows = get_elo_leaderboard(as_of, LEADERBOARD_ACTIVE_DAYS, limit, rating_type, source)
+    return [
+        {"rank": i + 1, "team": team, "rating_date": rating_date.isoformat(), "elo_rating": value}
+        for i, (team, rating_date, value) in enumerate(rows)
+    ]
@@ -0,0 +1,57 @@
+# api/inference.py
+"""
+Shared inference layer for the API.
+
+Every endpoint scores through Predictor.predict_proba(), which walks the trees
+once; the predicted label is the argmax of the returned probabilities, so there
+is no second model.predict() pass.
+
+Backends (INFERENCE_BACKEND env var):
+  sklearn  - XGBClassifier.predict_proba (default)
+  booster  - xgb.Booster.inplace_predict, skipping the sklearn wrapper's
+             validation and DMatrix construction
+  compiled - the booster's trees flattened into NumPy arrays and walked in a
+             vectorized loop (api/tree_scorer.py); fastest for single rows
+"""
+import os
+from typing import Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .tree_scorer import CompiledTreeScorer
+except ImportError:
+    from tree_scorer import CompiledTreeScorer
+
+BACKENDS = ("sklearn", "booster", "compiled")
+
+
+class Predictor:
+    def __init__(self, model, backend: str = None):
+        backend = (backend or os.getenv("INFERENCE_BACKEND", "sklearn")).lower()
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown inference backend '{backend}' (expected one of {BACKENDS})")
+        self.model = model
+        self.backend = backend
+        self._booster = model.get_booster() if backend == "booster" else None
+        self._compiled = CompiledTreeScorer.from_booster(model.get_booster()) if backend == "compiled" else None
+
+    def set_threads(self, n_threads: int) -> None:
+        """Limit XGBoost's thread pool (one per worker avoids oversubscribing cores)."""
+        self.model.set_params(n_jobs=n_threads)
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Return an (n_rows, 3) array of [Home Win, Draw, Away Win] probabilities."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if self._compiled is not None:
+            return self._compiled.predict_proba(X)
+        if self._booster is not None:
+            return np.asarray(self._booster.inplace_predict(X)).reshape(X.shape[0], -1)
+        return self.model.predict_proba(X)
+
+    def predict(self, features: Sequence[float]) -> Tuple[int, np.ndarray]:
+        """Score a single feature row; returns (label index, probabilities)."""
+        probabilities = self.predict_proba(features)[0]
+        return int(probabilities.argmax()), probabilities
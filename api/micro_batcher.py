@@ -0,0 +1,95 @@
+# api/micro_batcher.py
+"""
+Micro-batching of single-row predictions for the async serving mode.
+
+Requests that arrive within `window` seconds of each other (or until
+`max_batch` rows are waiting) are stacked into one predict_proba call, run on
+a bounded thread pool so the event loop never blocks on XGBoost. At most
+`max_inflight` batches are queued for or running on the pool; later batches
+wait on a semaphore. If a batch fails, its rows are rescored one at a time so
+only the offending request gets the error.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class MicroBatcher:
+    def __init__(self, predict_proba: Callable[[np.ndarray], np.ndarray], workers: int = 1,
+                 window: float = 0.002, max_batch: int = 64, max_inflight: Optional[int] = None):
+        self.predict_proba = predict_proba
+        self.window = window
+        self.max_batch = max_batch
+        self.max_inflight = max_inflight or 2 * workers
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self.batches = 0
+        self.rows = 0
+        self._pending: List[Tuple[Sequence[float], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self._tasks = set()
+
+    async def predict(self, features: Sequence[float]) -> np.ndarray:
+        """Probabilities for one feature row, scored together with concurrent callers."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((features, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Sequence[float], asyncio.Future]]) -> None:
+        if self._inflight is None:
+            self._inflight = asyncio.Semaphore(self.max_inflight)
+        async with self._inflight:
+            loop = asyncio.get_running_loop()
+            try:
+                X = np.asarray([features for features, _ in batch], dtype=np.float32)
+                probabilities = await loop.run_in_executor(self.executor, self.predict_proba, X)
+            except Exception:
+                # One bad row must not fail its neighbours: score the batch row by row
+                await self._run_rows(batch, loop)
+                return
+        self.batches += 1
+        self.rows += len(batch)
+        for (_, future), probs in zip(batch, probabilities):
+            if not future.done():
+                future.set_result(probs)
+
+    async def _run_rows(self, batch: List[Tuple[Sequence[float], asyncio.Future]],
+                        loop: asyncio.AbstractEventLoop) -> None:
+        for features, future in batch:
+            if future.done():
+                continue
+            try:
+                X = np.asarray([features], dtype=np.float32)
+                probabilities = await loop.run_in_executor(self.executor, self.predict_proba, X)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.rows += 1
+            if not future.done():
+                future.set_result(probabilities[0])
+
+    async def close(self) -> None:
+        """Score whatever is still waiting, then stop the pool."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self.executor.shutdown(wait=True)
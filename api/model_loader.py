@@ -0,0 +1,118 @@
+# api/model_loader.py
+"""
+Model loading for API startup.
+
+- Prefers the compact UBJSON copy (models/match_predictor_xgb.ubj, ~10x faster
+  to parse than the JSON dump) and falls back to the JSON file.
+- Validates the file and the loaded model (non-empty, 6 features in the
+  expected order, 3 classes) so a bad artifact fails at boot with a clear error.
+- Runs a warm-up inference so the first request doesn't pay for lazy
+  allocations.
+- Records a timing breakdown (import / load / validate / warm-up).
+
+Create the UBJSON copy (done in the Render build step):
+  python -m api.model_loader --export
+"""
+import argparse
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+JSON_PATH = os.path.join(MODEL_DIR, 'match_predictor_xgb.json')
+UBJ_PATH = os.path.join(MODEL_DIR, 'match_predictor_xgb.ubj')
+
+EXPECTED_CLASSES = 3
+WARMUP_ROW = [1.5, 1.2, 0.6, 0.4, 1450.0, 1380.0]
+
+
+class ModelLoadError(RuntimeError):
+    pass
+
+
+def resolve_model_path(path: Optional[str] = None) -> str:
+    """MODEL_PATH env > UBJSON copy (if at least as new as the JSON) > JSON."""
+    path = path or os.getenv("MODEL_PATH")
+    if path:
+        return path
+    if os.path.exists(UBJ_PATH) and (
+        not os.path.exists(JSON_PATH) or os.path.getmtime(UBJ_PATH) >= os.path.getmtime(JSON_PATH)
+    ):
+        return UBJ_PATH
+    return JSON_PATH
+
+
+def load_model(feature_names: List[str], path: Optional[str] = None) -> Tuple[object, Dict[str, float]]:
+    """Load, validate and warm up the classifier; returns (model, timings in ms)."""
+    timings: Dict[str, float] = {}
+    path = os.path.abspath(resolve_model_path(path))
+
+    t0 = time.perf_counter()
+    import numpy as np
+    import xgboost as xgb
+    timings['import_xgboost_ms'] = (time.perf_counter() - t0) * 1000
+
+    if not os.path.exists(path):
+        raise ModelLoadError(f"Model file not found: {path}")
+    if os.path.getsize(path) == 0:
+        raise ModelLoadError(f"Model file is empty: {path}")
+
+    t0 = time.perf_counter()
+    model = xgb.XGBClassifier()
+    try:
+        model.load_model(path)
+    except Exception as e:
+        raise ModelLoadError(f"Could not parse model file {path}: {e}") from e
+    timings['load_ms'] = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    validate_model(model, feature_names)
+    timings['validate_ms'] = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    probabilities = model.predict_proba(np.asarray([WARMUP_ROW], dtype=np.float32))
+    if not np.all(np.isfinite(probabilities)):
+        raise ModelLoadError("Warm-up inference returned non-finite probabilities")
+    timings['warmup_ms'] = (time.perf_counter() - t0) * 1000
+
+    timings['model_path'] = os.path.basename(path)
+    return model, timings
+
+
+def validate_model(model, feature_names: List[str]) -> None:
+    booster = model.get_booster()
+    n_features = booster.num_features()
+    if n_features != len(feature_names):
+        raise ModelLoadError(f"Model expects {n_features} features, API sends {len(feature_names)}")
+    if booster.feature_names and list(booster.feature_names) != list(feature_names):
+        raise ModelLoadError(f"Model feature order {booster.feature_names} != {feature_names}")
+    n_classes = getattr(model, 'n_classes_', None)
+    if n_classes != EXPECTED_CLASSES:
+        raise ModelLoadError(f"Model has {n_classes} classes, expected {EXPECTED_CLASSES}")
+
+
+def export_ubj(src: str = JSON_PATH, dst: str = UBJ_PATH) -> None:
+    """Re-save the JSON model as UBJSON with the installed xgboost version."""
+    import xgboost as xgb
+
+    model = xgb.XGBClassifier()
+    model.load_model(src)
+    model.save_model(dst)
+    print(f"✅ Exported {os.path.basename(src)} -> {os.path.basename(dst)} "
+          f"({os.path.getsize(src) // 1024} KB -> {os.path.getsize(dst) // 1024} KB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model artifact utilities.")
+    parser.add_argument("--export", action="store_true", help="write the UBJSON copy of the JSON model")
+    args = parser.parse_args()
+    if args.export:
+        export_ubj()
+    else:
+        from league import FEATURE_NAMES
+        _, timings = load_model(FEATURE_NAMES)
+        print(timings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# api/prediction_log.py
+"""
+Asynchronous, batched prediction logging.
+
+Request handlers call `prediction_log.log(record)`, which only does a
+non-blocking put on an in-process queue. A background writer thread drains
+the queue and writes batches when `batch_size` records are waiting or
+`flush_interval` seconds have passed, to one of:
+
+  PREDICTION_LOG=postgres   prediction_log table (execute_values, one INSERT per batch)
+  PREDICTION_LOG=jsonl      one JSON object per line in PREDICTION_LOG_PATH
+  PREDICTION_LOG=off        disabled (default)
+
+`close()` (registered with atexit and gunicorn's worker_exit) stops the writer
+after it has flushed everything queued. A batch that can't be written is kept
+and retried on the next flush; if it still fails at shutdown it is spilled to
+PREDICTION_LOG_FALLBACK as JSONL, so a graceful shutdown loses nothing.
+"""
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+LOG_MODE = os.getenv("PREDICTION_LOG", "off").lower()
+LOG_PATH = os.getenv("PREDICTION_LOG_PATH", "logs/predictions.jsonl")
+FALLBACK_PATH = os.getenv("PREDICTION_LOG_FALLBACK", "logs/predictions.fallback.jsonl")
+BATCH_SIZE = int(os.getenv("PREDICTION_LOG_BATCH", 500))
+FLUSH_INTERVAL = float(os.getenv("PREDICTION_LOG_INTERVAL", 2.0))
+QUEUE_SIZE = int(os.getenv("PREDICTION_LOG_QUEUE", 50_000))
+
+COLUMNS = (
+    "logged_at", "endpoint", "home_team", "away_team",
+    "features", "predicted_result", "prediction_probabilities", "source",
+)
+
+INSERT_SQL = f"INSERT INTO prediction_log ({', '.join(COLUMNS)}) VALUES %s"
+
+
+def prediction_record(endpoint: str, features, prediction: str, probabilities: Dict[str, float],
+                      home_team: Optional[str] = None, away_team: Optional[str] = None,
+                      source: str = "model") -> Dict:
+    """Build a prediction_log record (cheap: no I/O, no serialization)."""
+    return {
+        "logged_at": datetime.now(timezone.utc),
+        "endpoint": endpoint,
+        "home_team": home_team,
+        "away_team": away_team,
+        "features": [float(v) for v in features] if features is not None else None,
+        "predicted_result": prediction,
+        "prediction_probabilities": probabilities,
+        "source": source,
+    }
+
+
+def _to_json(record: Dict) -> str:
+    return json.dumps({**record, "logged_at": record["logged_at"].isoformat()})
+
+
+def write_jsonl(path: str) -> Callable[[List[Dict]], None]:
+    """Sink appending each batch to a JSONL file."""
+    def write(batch: List[Dict]) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a") as f:
+            f.write("".join(_to_json(r) + "\n" for r in batch))
+    return write
+
+
+def write_postgres(batch: List[Dict]) -> None:
+    """Sink inserting each batch into prediction_log with one statement."""
+    from psycopg2.extras import Json, execute_values
+    try:
+        from .team_stats import pooled_connection
+    except ImportError:
+        from team_stats import pooled_connection
+
+    rows = [
+        (r["logged_at"], r["endpoint"], r["home_team"], r["away_team"],
+         Json(r["features"]), r["predicted_result"], Json(r["prediction_probabilities"]), r["source"])
+        for r in batch
+    ]
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            execute_values(cur, INSERT_SQL, rows, page_size=len(rows))
+        conn.commit()
+
+
+class PredictionLogger:
+    """Queue + background writer thread; see the module docstring."""
+
+    def __init__(self, sink: Optional[Callable[[List[Dict]], None]],
+                 batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL,
+                 queue_size: int = QUEUE_SIZE, fallback_path: str = FALLBACK_PATH):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fallback_path = fallback_path
+        self.dropped = 0   # records refused because the queue was full
+        self.written = 0
+        self._queue: "queue.Queue[Optional[Dict]]" = queue.Queue(maxsize=queue_size)
+        self._pending: List[Dict] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._writer_pid = None
+        self._closed = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.sink is not None
+
+    def log(self, record: Dict) -> None:
+        """Hand a record to the writer; never blocks the request."""
+        if self.sink is None or self._closed:
+            return
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_writer(self) -> None:
+        # Started lazily, once per process: a thread started in gunicorn's master doesn't survive fork
+        if self._writer_pid == os.getpid():
+            return
+        with self._lock:
+            if self._writer_pid == os.getpid():
+                return
+            self._writer_pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="prediction-log", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                record = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                record = False
+            if record is None:  # close() sentinel
+                self._drain()
+                self._flush(final=True)
+                return
+            if record:
+                self._pending.append(record)
+            if len(self._pending) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush()
+                deadline = time.monotonic() + self.flush_interval
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if record is not None:
+                self._pending.append(record)
+
+    def _flush(self, final: bool = False) -> None:
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            try:
+                self.sink(batch)
+            except Exception as e:
+                print(f"⚠️ Prediction log write failed ({len(self._pending)} pending): {e}", flush=True)
+                if final:
+                    self._spill()
+                return  # keep the batch and retry on the next flush
+            del self._pending[:len(batch)]
+            self.written += len(batch)
+
+    def _spill(self) -> None:
+        write_jsonl(self.fallback_path)(self._pending)
+        print(f"⚠️ Spilled {len(self._pending)} prediction log records to {self.fallback_path}", flush=True)
+        self.written += len(self._pending)
+        self._pending = []
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Flush everything queued so far and stop the writer (idempotent)."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None or self._writer_pid != os.getpid():
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+def _sink_for(mode: str) -> Optional[Callable[[List[Dict]], None]]:
+    if mode == "postgres":
+        return write_postgres
+    if mode == "jsonl":
+        return write_jsonl(LOG_PATH)
+    if mode in ("", "off", "0", "none"):
+        return None
+    raise ValueError(f"Unknown PREDICTION_LOG mode: {mode!r} (expected postgres, jsonl or off)")
+
+
+prediction_log = PredictionLogger(_sink_for(LOG_MODE))
+atexit.register(prediction_log.close)
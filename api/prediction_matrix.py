@@ -0,0 +1,93 @@
+# api/prediction_matrix.py
+"""
+Materialized predictions: probabilities for every ordered (home, away) pair.
+
+With ~20 clubs there are only n*(n-1) fixtures, so the whole table is scored in
+one vectorized model call and kept as an (n, n, 3) float32 array indexed by a
+dense team id. /predict_match then becomes an O(1) array lookup with no DB or
+model call. The table is rebuilt lazily after team_stats changes (the Elo
+pipeline's NOTIFY marks it stale via api/team_stats.py) and, in case a NOTIFY
+is missed, once it is older than `max_age` seconds. Each build publishes one
+immutable MatrixSnapshot, so a lookup never mixes ids and probabilities from
+different builds.
+"""
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+
+def pair_features(names: List[str], stats: Dict[str, dict]) -> np.ndarray:
+    """Build the (n*n, 6) feature matrix for every home/away combination."""
+    form = np.array([stats[t]["form_goals"] for t in names], dtype=np.float32)
+    win = np.array([stats[t]["win_rate"] for t in names], dtype=np.float32)
+    elo = np.array([stats[t]["elo_rating"] for t in names], dtype=np.float32)
+    home, away = np.meshgrid(np.arange(len(names)), np.arange(len(names)), indexing="ij")
+    home, away = home.ravel(), away.ravel()
+    return np.column_stack([form[home], form[away], win[home], win[away], elo[home], elo[away]])
+
+
+class MatrixSnapshot(NamedTuple):
+    teams: List[str]
+    team_ids: Dict[str, int]
+    probabilities: np.ndarray  # (n, n, 3), NaN on the diagonal
+    built_at: float
+
+
+class PredictionMatrix:
+    def __init__(self, predictor, load_stats: Callable[[], Dict[str, dict]], max_age: Optional[float] = None):
+        self.predictor = predictor
+        self.load_stats = load_stats
+        self.max_age = max_age
+        self.snapshot: Optional[MatrixSnapshot] = None
+        self._dirty = True
+        self._lock = threading.Lock()
+
+    @property
+    def stale(self) -> bool:
+        snapshot = self.snapshot
+        if self._dirty or snapshot is None:
+            return True
+        return self.max_age is not None and time.time() - snapshot.built_at > self.max_age
+
+    def mark_stale(self) -> None:
+        self._dirty = True
+
+    def build(self) -> MatrixSnapshot:
+        """Load every team's stats and score all ordered pairs in one call."""
+        # Cleared first: a change notified while we build marks the result stale again
+        self._dirty = False
+        try:
+            stats = self.load_stats()
+        except Exception:
+            self._dirty = True
+            raise
+        names = sorted(stats)
+        n = len(names)
+        probabilities = np.full((n, n, 3), np.nan, dtype=np.float32)
+        if n:
+            scored = self.predictor.predict_proba(pair_features(names, stats))
+            probabilities[:] = scored.reshape(n, n, 3)
+            probabilities[np.arange(n), np.arange(n)] = np.nan  # a team can't play itself
+        probabilities.setflags(write=False)
+
+        snapshot = MatrixSnapshot(names, {t: i for i, t in enumerate(names)}, probabilities, time.time())
+        self.snapshot = snapshot  # one assignment: readers see the old table or the new one
+        print(f"✅ Materialized predictions for {n * (n - 1)} fixtures ({n} teams).", flush=True)
+        return snapshot
+
+    def ensure_fresh(self) -> MatrixSnapshot:
+        if self.stale:
+            with self._lock:
+                if self.stale:
+                    return self.build()
+        return self.snapshot
+
+    def lookup(self, home_team: str, away_team: str) -> Optional[np.ndarray]:
+        """Return the [Home Win, Draw, Away Win] row, or None if either team is unknown."""
+        snapshot = self.ensure_fresh()
+        home, away = snapshot.team_ids.get(home_team), snapshot.team_ids.get(away_team)
+        if home is None or away is None or home == away:
+            return None
+        return snapshot.probabilities[home, away]
@@ -0,0 +1,97 @@
+# api/simulation.py
+"""
+Cached season simulations for GET /simulate.
+
+Results come from the season's and the previous season's results
+(db_utils.get_season_fixtures; the previous final table names the clubs yet to
+play) plus the cached team_stats rows (source=model) or the teams rating cache
+(db_utils.get_elos, source=elo), and are fed to scripts/season_sim.py.
+Summaries are cached per (season, sims, source) for SIMULATE_TTL seconds and
+dropped whenever team_stats is invalidated (the Elo pipeline's NOTIFY after new
+results), so a season is simulated at most once per update however often it
+is requested.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+try:
+    from .team_stats import add_invalidation_listener, get_all_team_stats
+except ImportError:
+    from team_stats import add_invalidation_listener, get_all_team_stats
+
+from db.db_utils import get_elos, get_season_fixtures
+
+SIMULATE_TTL = float(os.getenv("SIMULATE_TTL", 3600))
+SIMULATE_WORKERS = int(os.getenv("SIMULATE_WORKERS", 1))
+SIMULATE_MAX_SIMS = int(os.getenv("SIMULATE_MAX_SIMS", 500_000))
+
+_lock = threading.Lock()          # guards _cache / _generation
+_compute_lock = threading.Lock()  # one simulation at a time per process
+_cache: Dict[Tuple, Tuple[float, Dict]] = {}  # (season, sims, source) -> (expires_at, summary)
+_generation = 0  # bumped on invalidation; results computed across a bump aren't cached
+
+
+def invalidate() -> None:
+    global _generation
+    with _lock:
+        _cache.clear()
+        _generation += 1
+
+
+add_invalidation_listener(invalidate)
+
+
+def season_fixtures(season: Optional[int] = None):
+    """
+    (season, fixtures) with the results of `season` (default: the season of the
+    latest result) and of the season before it, oldest first.
+    """
+    season, fixtures = get_season_fixtures(season)
+    if not fixtures and not season:
+        raise ValueError("No results in match_results")
+    _, previous = get_season_fixtures(season - 1)
+    return season, previous + fixtures
+
+
+def run_simulation(season: Optional[int], n_sims: int, source: str, predictor=None) -> Dict:
+    from scripts.season_sim import elo_probabilities, model_probabilities, season_state, simulate
+
+    season, fixtures = season_fixtures(season)
+    state = season_state(fixtures, season)
+    if source == "model":
+        probabilities = model_probabilities(state.remaining, get_all_team_stats(), predictor)
+    else:
+        from scripts.run_elo_updates import load_elo_config
+        cfg = load_elo_config()
+        ratings = get_elos(state.teams, default=cfg.base_rating)
+        probabilities = elo_probabilities(state.remaining, ratings, cfg.home_adv, cfg.base_rating)
+    summary = simulate(state, probabilities, n_sims, SIMULATE_WORKERS)
+    summary["source"] = source
+    return summary
+
+
+def cached_simulation(season: Optional[int], n_sims: int, source: str, predictor=None) -> Dict:
+    """Summary from the cache, or simulated now (one simulation at a time per process)."""
+    if n_sims > SIMULATE_MAX_SIMS:
+        raise ValueError(f"sims must be at most {SIMULATE_MAX_SIMS}")
+    if source not in ("model", "elo"):
+        raise ValueError("source must be 'model' or 'elo'")
+    key = (season, n_sims, source)
+    entry = _cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return {**entry[1], "cached": True}
+
+    with _compute_lock:
+        # another request may have filled it while we waited
+        entry = _cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return {**entry[1], "cached": True}
+        generation = _generation
+        summary = run_simulation(season, n_sims, source, predictor)
+        summary["simulated_at"] = time.time()
+        with _lock:
+            if generation == _generation:
+                _cache[key] = (time.monotonic() + SIMULATE_TTL, summary)
+    return {**summary, "cached": False}
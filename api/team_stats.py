@@ -0,0 +1,188 @@
+# api/team_stats.py
+"""
+Pooled, cached access to the team_stats table for the prediction endpoints.
+
+- Connections are borrowed from the project-wide SQLAlchemy pool (db/db.py),
+  so the API and the pipeline share one set of pool limits and stats.
+- One query per request for all teams involved (team_name = ANY(%s)).
+- An in-memory TTL cache in front of it. The Elo pipeline sends
+  NOTIFY team_stats_updated after writing ratings; a dedicated LISTEN
+  connection is polled (a local, non-blocking socket read) before every cache
+  read, so fresh ratings are picked up at once while repeated predictions for
+  the same clubs never query the DB. If the LISTEN connection can't be opened
+  (or drops), the cache runs on TTL alone and the connection is retried with
+  exponential backoff (LISTEN_RETRY_MIN .. LISTEN_RETRY_MAX seconds).
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List
+
+import psycopg2
+
+from db import db as shared_db
+
+# Must match db.db_utils.TEAM_STATS_CHANNEL (the pipeline side of the NOTIFY)
+TEAM_STATS_CHANNEL = "team_stats_updated"
+
+CACHE_TTL = float(os.getenv("TEAM_STATS_TTL", 300))
+LISTEN_RETRY_MIN = float(os.getenv("LISTEN_RETRY_MIN", 1))
+LISTEN_RETRY_MAX = float(os.getenv("LISTEN_RETRY_MAX", 60))
+
+_lock = threading.Lock()
+_listen_lock = threading.Lock()
+_listen_conn = None
+_listen_retry_at = 0.0  # monotonic time of the next LISTEN attempt after a failure
+_listen_backoff = 0.0
+_cache: Dict[str, tuple] = {}  # team_name -> (expires_at, stats)
+_invalidation_listeners: List[Callable[[], None]] = []
+
+
+def _database_url() -> str:
+    """libpq URL of the shared engine (for connections that live outside the pool)."""
+    return shared_db.engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+@contextmanager
+def pooled_connection():
+    """Borrow a psycopg2 connection from the shared pool."""
+    conn = shared_db.get_connection()
+    try:
+        yield conn
+        conn.rollback()  # end the read transaction before handing the connection back
+    except Exception:
+        conn.invalidate()  # don't return a possibly broken connection to the pool
+        raise
+    finally:
+        conn.close()
+
+
+def _start_listener() -> None:
+    """Open the LISTEN connection; on failure fall back to TTL only and retry later."""
+    global _listen_conn, _listen_retry_at, _listen_backoff
+    try:
+        conn = psycopg2.connect(_database_url())
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {TEAM_STATS_CHANNEL};")
+    except Exception as e:
+        _listen_backoff = min(max(_listen_backoff * 2, LISTEN_RETRY_MIN), LISTEN_RETRY_MAX)
+        _listen_retry_at = time.monotonic() + _listen_backoff
+        print(f"⚠️ team_stats LISTEN unavailable, relying on TTL only "
+              f"(retry in {_listen_backoff:.0f}s): {e}", flush=True)
+        return
+    _listen_conn = conn
+    if _listen_backoff:
+        # notifications sent while we weren't listening are lost
+        _listen_backoff = 0.0
+        invalidate()
+
+
+def _drain_notifications() -> None:
+    # Only one thread needs to read the socket; the others just use the cache
+    if not _listen_lock.acquire(blocking=False):
+        return
+    try:
+        _poll_listener()
+    finally:
+        _listen_lock.release()
+
+
+def _poll_listener() -> None:
+    global _listen_conn
+    if _listen_conn is None and time.monotonic() >= _listen_retry_at:
+        _start_listener()
+    if _listen_conn is None:
+        return
+    try:
+        _listen_conn.poll()
+    except Exception:
+        # Lost the listener: drop the cache and reconnect on next use
+        _listen_conn = None
+        invalidate()
+        return
+    if _listen_conn.notifies:
+        _listen_conn.notifies.clear()
+        invalidate()
+
+
+def reset_connections(close: bool = True) -> None:
+    """
+    Drop the pooled and LISTEN connections. Gunicorn calls this with close=True
+    in the master before forking and close=False in each worker, so no socket
+    is ever shared between processes.
+    """
+    global _listen_conn
+    with _lock:
+        if close and _listen_conn is not None:
+            _listen_conn.close()
+        _listen_conn = None
+    shared_db.dispose(close=close)
+
+
+def add_invalidation_listener(callback: Callable[[], None]) -> None:
+    """Call `callback` whenever the cached team_stats rows are dropped."""
+    _invalidation_listeners.append(callback)
+
+
+def invalidate() -> None:
+    """Forget every cached team_stats row."""
+    with _lock:
+        _cache.clear()
+    for callback in _invalidation_listeners:
+        callback()
+
+
+def get_team_stats_many(team_names: Iterable[str]) -> Dict[str, dict]:
+    """
+    Return {team_name: {"form_goals", "win_rate", "elo_rating"}} for the teams
+    that exist; unknown teams are simply absent from the result.
+    """
+    names = list(dict.fromkeys(team_names))
+    _drain_notifications()
+
+    now = time.monotonic()
+    found: Dict[str, dict] = {}
+    missing = []
+    for name in names:
+        entry = _cache.get(name)
+        if entry is not None and entry[0] > now:
+            found[name] = entry[1]
+        else:
+            missing.append(name)
+
+    if missing:
+        with pooled_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT team_name, form_goals, win_rate, elo_rating
+                    FROM team_stats WHERE team_name = ANY(%s)
+                """, (missing,))
+                rows = cur.fetchall()
+
+        expires_at = time.monotonic() + CACHE_TTL
+        with _lock:
+            for team_name, form_goals, win_rate, elo_rating in rows:
+                stats = {
+                    "form_goals": form_goals,
+                    "win_rate": win_rate,
+                    "elo_rating": elo_rating
+                }
+                _cache[team_name] = (expires_at, stats)
+                found[team_name] = stats
+
+    return found
+
+
+def get_all_team_stats() -> Dict[str, dict]:
+    """Return stats for every team in team_stats (used to materialize predictions)."""
+    _drain_notifications()
+    with pooled_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT team_name, form_goals, win_rate, elo_rating FROM team_stats")
+            rows = cur.fetchall()
+    return {
+        team_name: {"form_goals": form_goals, "win_rate": win_rate, "elo_rating": elo_rating}
+        for team_name, form_goals, win_rate, elo_rating in rows
+    }
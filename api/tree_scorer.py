@@ -0,0 +1,137 @@
+# api/tree_scorer.py
+"""
+Compiled tree-ensemble scorer (INFERENCE_BACKEND=compiled).
+
+The trained booster's trees are flattened once into contiguous NumPy arrays
+(feature index, threshold, left/right child, leaf value). Scoring then walks
+every tree at once: each step advances all (row, tree) cursors one level with a
+handful of vectorized gathers. Leaves point at themselves, so after max_depth
+steps every cursor sits on its leaf. For single-row requests on this six-feature
+model this avoids most of xgboost's per-call overhead (DMatrix setup, thread
+dispatch, sklearn validation).
+
+Matches xgboost's own rules: go left when x < threshold (float32), follow
+default_left for missing values, margins = base_score + sum of the class's
+leaves, then softmax.
+"""
+import json
+from typing import List
+
+import numpy as np
+
+
+def _parse_base_score(raw: str, n_classes: int) -> np.ndarray:
+    raw = raw.strip()
+    if raw.startswith('['):
+        values = [float(v) for v in raw.strip('[]').split(',')]
+    else:
+        values = [float(raw)] * n_classes
+    return np.asarray(values, dtype=np.float32)
+
+
+class CompiledTreeScorer:
+    def __init__(self, feature, threshold, left, right, default_left, value,
+                 roots, tree_class, base_margin, max_depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.base_margin = base_margin
+        self.max_depth = max_depth
+        # children[2 * node] = right child, children[2 * node + 1] = left child
+        self.children = np.empty(2 * len(left), dtype=np.int32)
+        self.children[0::2] = right
+        self.children[1::2] = left
+        n_classes = len(base_margin)
+        # (n_trees, n_classes) one-hot: leaf values @ class_map = per-class margin
+        self.class_map = np.zeros((len(roots), n_classes), dtype=np.float32)
+        self.class_map[np.arange(len(roots)), tree_class] = 1.0
+
+    @classmethod
+    def from_booster(cls, booster) -> "CompiledTreeScorer":
+        learner = json.loads(booster.save_raw('json'))['learner']
+        objective = learner['objective']['name']
+        if objective != 'multi:softprob' and objective != 'multi:softmax':
+            raise ValueError(f"Compiled scorer supports multi-class softmax models, not {objective}")
+        params = learner['learner_model_param']
+        n_classes = int(params['num_class'])
+        model = learner['gradient_booster']['model']
+        trees = model['trees']
+
+        feature: List[np.ndarray] = []
+        threshold, left, right, default_left, value = [], [], [], [], []
+        roots = np.empty(len(trees), dtype=np.int32)
+        max_depth = 0
+        offset = 0
+        for t, tree in enumerate(trees):
+            if any(tree['split_type']):
+                raise ValueError("Categorical splits are not supported by the compiled scorer")
+            lc = np.asarray(tree['left_children'], dtype=np.int32)
+            rc = np.asarray(tree['right_children'], dtype=np.int32)
+            n_nodes = len(lc)
+            is_leaf = lc == -1
+            own = np.arange(n_nodes, dtype=np.int32)
+            # Leaves loop back onto themselves; children become global node ids
+            left.append(np.where(is_leaf, own, lc) + offset)
+            right.append(np.where(is_leaf, own, rc) + offset)
+            feature.append(np.where(is_leaf, 0, tree['split_indices']).astype(np.int32))
+            cond = np.asarray(tree['split_conditions'], dtype=np.float32)
+            threshold.append(np.where(is_leaf, np.inf, cond).astype(np.float32))
+            value.append(np.where(is_leaf, cond, 0.0).astype(np.float32))
+            default_left.append(np.asarray(tree['default_left'], dtype=bool))
+            roots[t] = offset
+            max_depth = max(max_depth, _depth(lc, rc))
+            offset += n_nodes
+
+        return cls(
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            left=np.concatenate(left),
+            right=np.concatenate(right),
+            default_left=np.concatenate(default_left),
+            value=np.concatenate(value),
+            roots=roots,
+            tree_class=np.asarray(model['tree_info'], dtype=np.int64),
+            base_margin=_parse_base_score(params['base_score'], n_classes),
+            max_depth=max_depth,
+        )
+
+    def margins(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_rows, n_features = X.shape
+        flat_x = X.ravel()
+        # Offset of each row inside flat_x, so one take() gathers every cursor's feature
+        row_offset = (np.arange(n_rows, dtype=np.int32) * n_features)[:, None]
+        has_missing = np.isnan(flat_x).any()
+
+        node = np.broadcast_to(self.roots, (n_rows, len(self.roots)))
+        for _ in range(self.max_depth):
+            x = flat_x.take(row_offset + self.feature.take(node))
+            go_left = x < self.threshold.take(node)
+            if has_missing:
+                missing = np.isnan(x)
+                go_left[missing] = self.default_left.take(node[missing])
+            node = self.children.take(2 * node + go_left)
+        return self.value.take(node) @ self.class_map + self.base_margin
+
+    def predict_proba(self, X) -> np.ndarray:
+        margins = self.margins(X).astype(np.float64)
+        margins -= margins.max(axis=1, keepdims=True)
+        exp = np.exp(margins)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+def _depth(left_children: np.ndarray, right_children: np.ndarray) -> int:
+    depth = 0
+    frontier = [0]
+    while True:
+        children = [c for n in frontier for c in (left_children[n], right_children[n]) if c != -1]
+        if not children:
+            return depth
+        frontier = children
+        depth += 1
@@ -0,0 +1,66 @@
+# benchmarks/bench_inference.py
+"""
+Micro-benchmark of per-request model latency.
+
+Compares the old request path (model.predict + model.predict_proba on the same
+row) with the shared inference layer's backends: a single predict_proba pass,
+the booster inplace_predict fast path and the compiled NumPy tree scorer.
+
+Run from project root:
+  python -m benchmarks.bench_inference [--n 2000]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import xgboost as xgb
+
+from api.inference import Predictor
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'models', 'match_predictor_xgb.json')
+ROW = [1.5, 1.2, 0.6, 0.4, 1450.0, 1380.0]
+
+
+def _time_per_call(fn, n: int):
+    for _ in range(min(50, n)):  # warm-up
+        fn()
+    samples = np.empty(n)
+    for i in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - t0
+    return samples * 1e6  # microseconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--n", type=int, default=2000, help="timed calls per variant")
+    args = parser.parse_args()
+
+    model = xgb.XGBClassifier()
+    model.load_model(MODEL_PATH)
+
+    def legacy():
+        input_array = np.array(ROW).reshape(1, -1)
+        model.predict(input_array)[0]
+        model.predict_proba(input_array)[0]
+
+    sklearn_once = Predictor(model, backend="sklearn")
+    booster = Predictor(model, backend="booster")
+    compiled = Predictor(model, backend="compiled")
+
+    variants = [
+        ("predict + predict_proba (before)", legacy),
+        ("Predictor[sklearn] single pass", lambda: sklearn_once.predict(ROW)),
+        ("Predictor[booster] inplace_predict", lambda: booster.predict(ROW)),
+        ("Predictor[compiled] NumPy trees", lambda: compiled.predict(ROW)),
+    ]
+    print(f"{'variant':40s} {'p50 us':>10s} {'p99 us':>10s} {'mean us':>10s}")
+    for name, fn in variants:
+        us = _time_per_call(fn, args.n)
+        print(f"{name:40s} {np.percentile(us, 50):10.1f} {np.percentile(us, 99):10.1f} {us.mean():10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# benchmarks/stub_football_data.py
+"""
+Local stand-in for football-data.org: serves a fixed /v4/competitions/PL/matches
+payload with the rate-limit headers the real API sends, so fetch and sync
+paths can be benchmarked without a token or network access.
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+
+class StubFootballData:
+    def __init__(self, payload: Dict, host: str = "127.0.0.1", port: int = 0):
+        body = json.dumps(payload).encode()
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests += 1
+                if not self.path.startswith("/v4/competitions/PL/matches"):
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("X-Requests-Available-Minute", "9")
+                self.send_header("X-RequestCounter-Reset", "60")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name="stub-football-data", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v4"
+
+    def __enter__(self) -> "StubFootballData":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
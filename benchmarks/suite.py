@@ -0,0 +1,359 @@
+# benchmarks/suite.py
+"""
+Offline benchmark suite: API throughput, Elo pipeline, match ingestion, model load.
+
+Everything runs on this machine: db_utils is pointed at a throwaway SQLite file
+instead of Postgres, match_results rows are synthetic (benchmarks/synthetic.py)
+and football-data.org is replaced by a local stub (benchmarks/stub_football_data.py).
+
+  model_load     load_model() wall time (median of --load-runs)
+  predict        POST /predict under --concurrency clients: req/s, p50/p99
+  predict_match  POST /predict_match the same way (team_stats read from SQLite)
+  elo_updates    run_elo_updates.main() over --fixtures unprocessed fixtures
+  insert_matches insert_matches() over --rows new rows, then the same rows again
+  sync_matches   sync_finished_matches() against the stub serving --rows matches
+
+Run from project root:
+  python -m benchmarks.suite --output benchmarks/results.json
+  python -m benchmarks.suite --baseline benchmarks/baseline.json --fail-on-regression
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import requests
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db import db_utils, session_scope
+from models import Base, TeamStats
+
+from benchmarks.stub_football_data import StubFootballData
+from benchmarks.synthetic import TEAMS, football_data_payload, synthetic_match_results, synthetic_team_stats
+
+BENCHMARKS = ["model_load", "predict", "predict_match", "elo_updates", "insert_matches", "sync_matches"]
+
+PREDICT_BODY = {
+    "home_form_goals": 1.5, "away_form_goals": 1.2,
+    "home_win_rate": 0.6, "away_win_rate": 0.4,
+    "elo_home": 1450.0, "elo_away": 1380.0,
+}
+
+
+# ---- Offline stand-ins ----
+@contextmanager
+def sqlite_standin() -> Iterator[sessionmaker]:
+    """Point db_utils at a fresh SQLite file with every table created; restore afterwards."""
+    with tempfile.TemporaryDirectory(prefix="epl-bench-") as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                               connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        previous = db_utils.SessionLocal
+        db_utils.SessionLocal = factory
+        try:
+            yield factory
+        finally:
+            db_utils.SessionLocal = previous
+            engine.dispose()
+
+
+@contextmanager
+def patched(obj, **attrs) -> Iterator[None]:
+    saved = {name: getattr(obj, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(obj, name, value)
+
+
+@contextmanager
+def quiet() -> Iterator[None]:
+    """Silence the ✅ prints of the code under test while it is being timed."""
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            yield
+        finally:
+            sys.stdout = stdout
+
+
+def sqlite_team_stats_many(factory: sessionmaker) -> Callable:
+    """get_team_stats_many() backed by the SQLite stand-in (one IN query per call)."""
+    def lookup(team_names):
+        with session_scope(factory) as db:
+            rows = db.query(TeamStats.team_name, TeamStats.form_goals, TeamStats.win_rate,
+                            TeamStats.elo_rating).filter(TeamStats.team_name.in_(list(team_names))).all()
+        return {r.team_name: {"form_goals": r.form_goals, "win_rate": r.win_rate,
+                              "elo_rating": r.elo_rating} for r in rows}
+    return lookup
+
+
+# ---- Measurements ----
+def latency_summary(samples: List[float], elapsed: float, errors: int = 0) -> Dict:
+    ms = np.asarray(samples) * 1000
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": len(samples) / elapsed if elapsed else 0.0,
+        "p50_ms": float(np.percentile(ms, 50)) if len(ms) else 0.0,
+        "p99_ms": float(np.percentile(ms, 99)) if len(ms) else 0.0,
+        "mean_ms": float(ms.mean()) if len(ms) else 0.0,
+    }
+
+
+@contextmanager
+def serve(app) -> Iterator[str]:
+    """The Flask app on a threaded werkzeug server at a free local port."""
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, name="bench-api", daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def load_test(url: str, bodies: List[Dict], requests_total: int, concurrency: int, warmup: int = 20) -> Dict:
+    """POST `requests_total` bodies (cycled) from `concurrency` client threads."""
+    def client(worker: int) -> Tuple[List[float], int]:
+        latencies, errors = [], 0
+        with requests.Session() as http:
+            for i in range(worker, requests_total, concurrency):
+                t0 = time.perf_counter()
+                try:
+                    ok = http.post(url, json=bodies[i % len(bodies)], timeout=30).status_code == 200
+                except requests.RequestException:
+                    ok = False
+                latencies.append(time.perf_counter() - t0)
+                errors += not ok
+        return latencies, errors
+
+    with requests.Session() as http:
+        for i in range(warmup):
+            http.post(url, json=bodies[i % len(bodies)], timeout=30)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - t0
+
+    samples = [s for latencies, _ in results for s in latencies]
+    summary = latency_summary(samples, elapsed, sum(e for _, e in results))
+    summary["concurrency"] = concurrency
+    return summary
+
+
+def bench_model_load(runs: int) -> Dict:
+    from league import FEATURE_NAMES
+    from api.model_loader import load_model
+
+    totals, timings = [], {}
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        _, timings = load_model(FEATURE_NAMES)
+        totals.append((time.perf_counter() - t0) * 1000)
+    return {"runs": runs, "load_ms": statistics.median(totals), "last_breakdown_ms": timings}
+
+
+def bench_api(endpoints: List[str], requests_total: int, concurrency: int) -> Dict:
+    import api.app as app_module
+
+    results = {}
+    with sqlite_standin() as factory:
+        db_utils.replace_team_stats(synthetic_team_stats())
+        pairs = [{"home_team": h, "away_team": a} for h in TEAMS for a in TEAMS if h != a]
+        bodies = {"predict": [PREDICT_BODY], "predict_match": pairs}
+        with patched(app_module, get_team_stats_many=sqlite_team_stats_many(factory)), \
+                quiet(), serve(app_module.app) as base_url:
+            for name in endpoints:
+                results[name] = load_test(f"{base_url}/{name}", bodies[name], requests_total, concurrency)
+    return results
+
+
+def bench_elo_updates(n_fixtures: int) -> Dict:
+    from scripts import run_elo_updates
+
+    with sqlite_standin():
+        db_utils.bulk_insert_fixtures(synthetic_match_results(n_fixtures))
+        db_utils.replace_team_stats(synthetic_team_stats())
+        with quiet():
+            t0 = time.perf_counter()
+            run_elo_updates.main()
+            seconds = time.perf_counter() - t0
+        left = len(db_utils.get_unprocessed_fixtures())
+    return {"fixtures": n_fixtures, "seconds": seconds, "fixtures_per_s": n_fixtures / seconds,
+            "unprocessed_after": left}
+
+
+def bench_insert_matches(n_rows: int) -> Dict:
+    from scripts import fetch_data
+
+    rows = synthetic_match_results(n_rows)
+    with sqlite_standin(), quiet():
+        t0 = time.perf_counter()
+        inserted, _ = fetch_data.insert_matches(rows)
+        seconds = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        _, skipped = fetch_data.insert_matches(rows)
+        dup_seconds = time.perf_counter() - t0
+    return {"rows": n_rows, "inserted": inserted, "seconds": seconds, "rows_per_s": n_rows / seconds,
+            "duplicates_skipped": skipped, "duplicate_seconds": dup_seconds}
+
+
+def bench_sync_matches(n_rows: int) -> Dict:
+    from scripts import fetch_data
+
+    payload = football_data_payload(synthetic_match_results(n_rows))
+    token = "offline-benchmark"
+    with StubFootballData(payload) as stub, sqlite_standin(), \
+            patched(fetch_data, API_TOKEN=token, HEADERS={"X-Auth-Token": token}, BASE_URL=stub.base_url), \
+            quiet():
+        t0 = time.perf_counter()
+        inserted, _ = fetch_data.sync_finished_matches()
+        seconds = time.perf_counter() - t0
+    return {"rows": n_rows, "inserted": inserted, "seconds": seconds, "rows_per_s": n_rows / seconds}
+
+
+def run_suite(only: Optional[List[str]] = None, requests_total: int = 2000, concurrency: int = 8,
+              n_fixtures: int = 2000, n_rows: int = 10000, load_runs: int = 5) -> Dict:
+    selected = [b for b in BENCHMARKS if not only or b in only]
+    endpoints = [e for e in ("predict", "predict_match") if e in selected]
+    results: Dict[str, Dict] = {}
+    for name in selected:
+        print(f"⏱️ {name} ...", flush=True)
+        if name == "model_load":
+            results[name] = bench_model_load(load_runs)
+        elif name in endpoints:
+            if name not in results:  # both endpoints share one server and SQLite stand-in
+                results.update(bench_api(endpoints, requests_total, concurrency))
+        elif name == "elo_updates":
+            results[name] = bench_elo_updates(n_fixtures)
+        elif name == "insert_matches":
+            results[name] = bench_insert_matches(n_rows)
+        elif name == "sync_matches":
+            results[name] = bench_sync_matches(n_rows)
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "params": {"requests": requests_total, "concurrency": concurrency, "fixtures": n_fixtures,
+                       "rows": n_rows, "load_runs": load_runs},
+        },
+        "results": results,
+    }
+
+
+# ---- Baseline comparison ----
+def metric_direction(name: str) -> Optional[int]:
+    """+1 if higher is better, -1 if lower is better, None for counts and other context."""
+    if name.endswith("rps") or name.endswith("_per_s"):
+        return 1
+    if name.endswith("_ms") or name.endswith("seconds"):
+        return -1
+    return None
+
+
+def flatten(results: Dict) -> Dict[str, float]:
+    """{"predict.p99_ms": 4.2, ...} for every comparable metric."""
+    return {
+        f"{bench}.{metric}": float(value)
+        for bench, values in results.items()
+        for metric, value in values.items()
+        if isinstance(value, (int, float)) and metric_direction(metric) is not None
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.10) -> List[Dict]:
+    """
+    Per-metric change against a baseline run. A metric regresses when it moves
+    the wrong way by more than `tolerance` (a fraction of the baseline value).
+    """
+    now, before = flatten(current["results"]), flatten(baseline["results"])
+    rows = []
+    for name in sorted(now.keys() & before.keys()):
+        old, new = before[name], now[name]
+        change = (new - old) / old if old else 0.0
+        better = change * metric_direction(name.rsplit(".", 1)[1])
+        status = "regressed" if better < -tolerance else "improved" if better > tolerance else "ok"
+        rows.append({"metric": name, "baseline": old, "current": new,
+                     "change_pct": change * 100, "status": status})
+    return rows
+
+
+def print_comparison(rows: List[Dict]) -> None:
+    icons = {"ok": "  ", "improved": "✅", "regressed": "❌"}
+    print(f"   {'metric':36s} {'baseline':>12s} {'current':>12s} {'change':>9s}")
+    for r in rows:
+        print(f"{icons[r['status']]} {r['metric']:36s} {r['baseline']:12.2f} {r['current']:12.2f} "
+              f"{r['change_pct']:+8.1f}%")
+
+
+def print_results(report: Dict) -> None:
+    for bench, values in report["results"].items():
+        shown = ", ".join(
+            f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+            for k, v in values.items() if not isinstance(v, dict)
+        )
+        print(f"📊 {bench}: {shown}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="run a subset")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent API clients")
+    parser.add_argument("--fixtures", type=int, default=2000, help="fixtures for run_elo_updates")
+    parser.add_argument("--rows", type=int, default=10000, help="rows for insert_matches / sync")
+    parser.add_argument("--load-runs", type=int, default=5, help="model loads to take the median of")
+    parser.add_argument("--output", help="write the results JSON here")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed change before flagging (fraction)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 if any metric regressed")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.only, args.requests, args.concurrency, args.fixtures, args.rows, args.load_runs)
+    print_results(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("meta", {}).get("params") not in (None, report["meta"].get("params")):
+            print(f"⚠️ Baseline was run with different parameters: {baseline['meta']['params']}")
+        rows = compare(report, baseline, args.tolerance)
+        print_comparison(rows)
+        regressed = [r["metric"] for r in rows if r["status"] == "regressed"]
+        if regressed:
+            print(f"❌ {len(regressed)} metric(s) regressed beyond {args.tolerance:.0%}: {', '.join(regressed)}")
+            if args.fail_on_regression:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
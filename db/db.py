@@ -1,26 +1,125 @@
-# db.py
+# db/db.py
+"""
+The one SQLAlchemy engine (and connection pool) for the whole project.
+
+The URL comes from DATABASE_URL, else DB_URL, else DB_USER / DB_PASS /
+DB_HOST / DB_PORT / DB_NAME. The pool is sized for a shared Postgres with a
+small connection limit. Each process holds at most DB_POOL_SIZE +
+DB_MAX_OVERFLOW connections, and callers wait up to DB_POOL_TIMEOUT seconds
+for one instead of opening more. Connections are recycled after
+DB_POOL_RECYCLE seconds and pinged before use, since Render drops idle ones.
+
+  session_scope()   one unit of work: commit on success, rollback on error, always close
+  get_connection()  a pooled DBAPI (psycopg2) connection; close() returns it to the pool
+  pool_stats()      checked-out / idle / overflow counts for /healthz, /metrics and the pipeline
+  record_pool_stats()  the same, also set on the db_pool_connections gauge
+"""
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
 from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from metrics import Gauge
 
 # Load environment variables from .env if available
 load_dotenv()
 
-# Get database credentials from env or use defaults
-DB_USER = os.getenv("DB_USER", "epl_user")
-DB_PASSWORD = os.getenv("DB_PASS", "Ianvl.2392")
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "5432")
-DB_NAME = os.getenv("DB_NAME", "epl_prediction_db")
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
 
-# Construct DB URL
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-# Create SQLAlchemy engine and session
-engine = create_engine(DATABASE_URL, echo=False)
+def database_url() -> str:
+    """
+    DATABASE_URL > DB_URL > DB_* parts. Driverless postgres:// and postgresql://
+    URLs (Render's format) are pinned to psycopg2, which is what requirements.txt installs.
+    """
+    url = os.getenv("DATABASE_URL") or os.getenv("DB_URL")
+    if not url:
+        url = "postgresql+psycopg2://{user}:{password}@{host}:{port}/{name}".format(
+            user=os.getenv("DB_USER", "epl_user"),
+            password=os.getenv("DB_PASS", ""),
+            host=os.getenv("DB_HOST", "localhost"),
+            port=os.getenv("DB_PORT", "5432"),
+            name=os.getenv("DB_NAME", "epl_prediction_db"),
+        )
+    scheme, sep, rest = url.partition("://")
+    if sep and scheme in ("postgres", "postgresql"):
+        url = f"postgresql+psycopg2://{rest}"
+    return url
+
+
+def make_engine(url: Optional[str] = None) -> Engine:
+    url = url or database_url()
+    if url.startswith("sqlite"):
+        return create_engine(url)
+    return create_engine(
+        url,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        pool_recycle=POOL_RECYCLE,
+        pool_pre_ping=True,
+        pool_use_lifo=True,  # reuse warm connections; idle extras age out via recycle
+    )
+
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Add this to db.py
+
+@contextmanager
+def session_scope(factory: Optional[sessionmaker] = None) -> Iterator[Session]:
+    """A session for one unit of work (commit on success, rollback on error)."""
+    db = (factory or SessionLocal)()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
 def get_connection():
-    return engine.raw_connection()
\ No newline at end of file
+    """Pooled DBAPI connection (psycopg2 API); close() hands it back to the pool."""
+    return engine.raw_connection()
+
+
+def pool_stats() -> Dict[str, int]:
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {}
+    return {
+        "size": pool.size(),
+        "max": pool.size() + MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+DB_POOL_CONNECTIONS = Gauge("db_pool_connections", "Shared DB pool connections by state.", ["state"])
+
+
+def record_pool_stats() -> Dict[str, int]:
+    """pool_stats(), also published on the db_pool_connections gauge."""
+    stats = pool_stats()
+    for state, value in stats.items():
+        DB_POOL_CONNECTIONS.set(value, state=state)
+    return stats
+
+
+def dispose(close: bool = True) -> None:
+    """
+    Drop pooled connections. Gunicorn calls this with close=True in the master
+    before forking and close=False in each worker (SQLAlchemy's fork recipe),
+    so no socket is ever shared between processes.
+    """
+    engine.dispose(close=close)
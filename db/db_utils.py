@@ -1,90 +1,177 @@
 # db/db_utils.py
-from datetime import date
-from typing import List, Tuple, Dict, Iterable
+from datetime import date, timedelta
+import threading
+from typing import List, Tuple, Dict, Iterable, Optional
 
 Key = Tuple[date, str, str]
 
-import os
-import psycopg2
-from sqlalchemy.exc import NoResultFound, IntegrityError
-from sqlalchemy import and_
-
-from db import SessionLocal
-from models import Team, Fixture
-
-# ---- Optional: keep raw connection for legacy scripts (not used by Elo runner) ----
-def get_connection():
-    return psycopg2.connect(
-        dbname=os.environ.get("DB_NAME", "epl_prediction_db"),
-        user=os.environ.get("DB_USER", "epl_user"),
-        password=os.environ.get("DB_PASS", "Ianvl.2392"),
-        host=os.environ.get("DB_HOST", "localhost"),
-        port=os.environ.get("DB_PORT", "5432"),
-    )
+from functools import wraps
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import and_, func, text, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from db import SessionLocal, session_scope
+from db import get_connection  # noqa: F401  (legacy scripts: pooled raw connection)
+from models import Team, Fixture, EloRating, TeamStats, SyncState, TableVersion
+from league import season_bounds, season_of
+from metrics import Histogram
+
+# Channel the API's team_stats cache LISTENs on (api/team_stats.py)
+TEAM_STATS_CHANNEL = "team_stats_updated"
+
+# Rows (or keys) per statement for multi-row writes
+BULK_PAGE_SIZE = 5000
+
+def _insert_for(db):
+    """Dialect-specific INSERT (both support .on_conflict_do_nothing/do_update)."""
+    return sqlite.insert if db.get_bind().dialect.name == "sqlite" else postgresql.insert
+
+DB_SECONDS = Histogram("db_query_seconds", "Wall time of db_utils helpers.", ["op"])
+
+def _timed(fn):
+    """Record each call's duration in db_query_seconds{op=<function name>}."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with DB_SECONDS.time(op=fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
+
+def _session():
+    # Resolved at call time so tests can swap SessionLocal for an SQLite factory
+    return session_scope(SessionLocal)
+
+# ---- Versioned, read-through cache of the teams table ----
+# A trigger bumps table_versions['teams'] in the same transaction as every write
+# to teams (models.table_version_triggers). The bump row-locks, so versions are
+# handed out in commit order and any write committed after a read shows up as a
+# new version (unlike max(last_updated), which a long transaction can stamp
+# below a max already seen). A read costs one primary-key lookup; ratings are
+# re-read (a plain column fetch, no ORM objects) only when the version moved.
+
+class _TeamsCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.source = None  # session factory the ratings came from
+        self.version = None
+        self.ratings: Optional[Dict[str, float]] = None
+
+_teams_cache = _TeamsCache()
+
+def _teams_snapshot() -> Dict[str, float]:
+    """{team_name: elo_rating}, re-read only when the teams version changed."""
+    cache = _teams_cache
+    with cache.lock, _session() as db:
+        # version first: a write landing between the two reads just forces a reload next time
+        version = db.query(TableVersion.version).filter_by(table_name=Team.__tablename__).scalar()
+        if cache.ratings is None or cache.source is not SessionLocal or version != cache.version:
+            with DB_SECONDS.time(op="load_teams"):
+                rows = db.query(Team.name, Team.elo_rating).all()
+            cache.ratings = {name: float(elo if elo is not None else 1500.0) for name, elo in rows}
+            cache.source, cache.version = SessionLocal, version
+        return cache.ratings
+
+def get_elos(team_names: Iterable[str], default: float = 1500.0) -> Dict[str, float]:
+    """Ratings for many teams at once, from the teams cache; unknown teams get `default`."""
+    ratings = _teams_snapshot()
+    return {name: ratings.get(name, default) for name in team_names}
 
 # ---- Simple getters/setters used elsewhere ----
 def get_elo(team_name: str) -> float:
-    db = SessionLocal()
-    try:
-        team = db.query(Team).filter_by(name=team_name).one()
-        return float(team.elo_rating or 1500.0)
-    except NoResultFound:
+    rating = _teams_snapshot().get(team_name)
+    if rating is None:
         print(f"⚠️ Team '{team_name}' not found. Returning default Elo.")
         return 1500.0
-    finally:
-        db.close()
+    return rating
 
 def update_elo(team_name: str, new_elo: float) -> None:
-    db = SessionLocal()
-    try:
+    with _session() as db:
         team = db.query(Team).filter_by(name=team_name).one_or_none()
         if team is None:
             team = Team(name=team_name, elo_rating=new_elo)
             db.add(team)
         else:
             team.elo_rating = new_elo
-        db.commit()
-        print(f"✅ Updated Elo for {team_name} to {new_elo:.2f}")
-    finally:
-        db.close()
+    print(f"✅ Updated Elo for {team_name} to {new_elo:.2f}")
 
 def save_fixture(data: Dict) -> None:
     """
     Insert a match into match_results.
     If the unique (match_date, home_team, away_team) already exists, ignore it.
     """
-    db = SessionLocal()
     try:
-        fixture = Fixture(**data)
-        db.add(fixture)
-        db.commit()
-        print(f"✅ Saved fixture: {data['home_team']} vs {data['away_team']} on {data['match_date']}")
+        with _session() as db:
+            db.add(Fixture(**data))
     except IntegrityError:
-        db.rollback()
         # Already exists — that's fine for idempotent ingestion
         # Optionally, update existing row's scores/result if needed.
-    finally:
-        db.close()
+        return
+    print(f"✅ Saved fixture: {data['home_team']} vs {data['away_team']} on {data['match_date']}")
+
+@_timed
+def bulk_insert_fixtures(rows: List[Dict]) -> Tuple[int, int]:
+    """
+    Insert many match_results rows in one statement/transaction:
+      INSERT ... ON CONFLICT (match_date, home_team, away_team) DO NOTHING RETURNING id
+    SQLAlchemy pages the rows into multi-row VALUES batches (the same technique
+    as psycopg2's execute_values), and RETURNING only yields rows that were
+    really inserted, so duplicates are counted as skipped instead of inserted.
+    Returns (inserted, skipped).
+    """
+    if not rows:
+        return 0, 0
+    with _session() as db:
+        insert = _insert_for(db)
+        stmt = (
+            insert(Fixture)
+            .on_conflict_do_nothing(index_elements=["match_date", "home_team", "away_team"])
+            .returning(Fixture.id)
+        )
+        inserted = len(db.execute(stmt, rows).all())
+        return inserted, len(rows) - inserted
+
+# ---- Incremental sync state (scripts/fetch_data.sync_finished_matches) ----
+@_timed
+def get_sync_state(key: str) -> Optional[Dict]:
+    """Return {"watermark", "etag", "last_modified", "params_hash", "content_hash"} or None."""
+    with _session() as db:
+        row = db.get(SyncState, key)
+        if row is None:
+            return None
+        return {
+            "watermark": row.watermark,
+            "etag": row.etag,
+            "last_modified": row.last_modified,
+            "params_hash": row.params_hash,
+            "content_hash": row.content_hash,
+        }
+
+@_timed
+def save_sync_state(key: str, **fields) -> None:
+    """Upsert the sync_state row for `key` (only the given fields change)."""
+    with _session() as db:
+        insert = _insert_for(db)
+        stmt = insert(SyncState).values(key=key, **fields)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SyncState.key],
+            set_={**{name: stmt.excluded[name] for name in fields}, "updated_at": func.now()},
+        )
+        db.execute(stmt)
 
 # ---- Helpers required by scripts/run_elo_updates.py ----
+@_timed
 def get_latest_elos() -> Dict[str, float]:
     """
     Return {team_name: latest_elo} for all teams.
     """
-    db = SessionLocal()
-    try:
-        rows = db.query(Team.name, Team.elo_rating).all()
-        return {name: float(elo or 1500.0) for name, elo in rows}
-    finally:
-        db.close()
+    return dict(_teams_snapshot())
 
+@_timed
 def get_unprocessed_fixtures() -> List[Tuple[date, str, str, int, int, str]]:
     """
     Returns list of:
       (match_date, home_team, away_team, home_goals, away_goals, result)
     """
-    db = SessionLocal()
-    try:
+    with _session() as db:
         q = (
             db.query(Fixture)
             .filter(Fixture.processed.is_(False))
@@ -95,9 +182,61 @@ def get_unprocessed_fixtures() -> List[Tuple[date, str, str, int, int, str]]:
             result = "H" if f.home_goals > f.away_goals else "A" if f.away_goals > f.home_goals else "D"
             rows.append((f.match_date, f.home_team, f.away_team, f.home_goals, f.away_goals, result))
         return rows
-    finally:
-        db.close()
 
+@_timed
+def get_all_fixtures(processed_only: bool = False) -> List[Tuple[date, str, str, int, int, str]]:
+    """
+    Every fixture in match_results (or only those run_elo_updates has already
+    folded in), oldest first, as
+      (match_date, home_team, away_team, home_goals, away_goals, result)
+    Used for full replays; plain column fetch, no ORM objects.
+    """
+    with _session() as db:
+        q = db.query(Fixture.match_date, Fixture.home_team, Fixture.away_team,
+                     Fixture.home_goals, Fixture.away_goals, Fixture.result)
+        if processed_only:
+            q = q.filter(Fixture.processed.is_(True))
+        q = q.order_by(Fixture.match_date.asc(), Fixture.home_team.asc(), Fixture.away_team.asc())
+        return [tuple(r) for r in q.all()]
+
+@_timed
+def get_season_fixtures(season: Optional[int] = None) -> Tuple[int, List[Tuple[date, str, str, int, int, str]]]:
+    """
+    (season, fixtures) for one EPL season (July to June, by start year; default:
+    the season of the latest stored result), oldest first.
+    """
+    with _session() as db:
+        if season is None:
+            latest = db.query(func.max(Fixture.match_date)).scalar()
+            if latest is None:
+                return 0, []
+            season = season_of(latest)
+        start, end = season_bounds(season)
+        q = (
+            db.query(Fixture.match_date, Fixture.home_team, Fixture.away_team,
+                     Fixture.home_goals, Fixture.away_goals, Fixture.result)
+            .filter(Fixture.match_date >= start, Fixture.match_date < end)
+            .order_by(Fixture.match_date.asc(), Fixture.home_team.asc(), Fixture.away_team.asc())
+        )
+        return season, [tuple(r) for r in q.all()]
+
+def iter_fixtures(chunk_size: int = 5000) -> Iterable[Tuple[date, str, str, int, int, str]]:
+    """
+    Stream every fixture, oldest first, with a server-side cursor, so
+    multi-decade histories never sit in memory at once.
+    """
+    with _session() as db:
+        q = (
+            db.query(Fixture.match_date, Fixture.home_team, Fixture.away_team,
+                     Fixture.home_goals, Fixture.away_goals, Fixture.result)
+            .order_by(Fixture.match_date.asc(), Fixture.home_team.asc(), Fixture.away_team.asc())
+            .execution_options(stream_results=True)
+            .yield_per(chunk_size)
+        )
+        for r in q:
+            yield tuple(r)
+
+@_timed
 def mark_fixtures_processed_by_keys(keys: Iterable[Key]) -> None:
     """
     Mark processed = TRUE using composite key (match_date, home_team, away_team).
@@ -105,31 +244,175 @@ def mark_fixtures_processed_by_keys(keys: Iterable[Key]) -> None:
     keys = list(keys)
     if not keys:
         return
-    db = SessionLocal()
-    try:
-        # Looping is simplest & clear; number of unprocessed items is usually small
-        for mdate, home, away in keys:
-            (db.query(Fixture)
-               .filter(
-                    Fixture.match_date == mdate,
-                    Fixture.home_team == home,
-                    Fixture.away_team == away,
-               )
-               .update({"processed": True}, synchronize_session=False))
-        db.commit()
-    finally:
-        db.close()
+    with _session() as db:
+        _mark_processed(db, keys)
+
+def _mark_processed(db, keys: List[Key]) -> None:
+    # Set-based UPDATE ... WHERE (match_date, home_team, away_team) IN (...),
+    # BULK_PAGE_SIZE keys per statement to stay under bind-parameter limits
+    for i in range(0, len(keys), BULK_PAGE_SIZE):
+        db.execute(
+            update(Fixture)
+            .where(tuple_(Fixture.match_date, Fixture.home_team, Fixture.away_team)
+                   .in_(keys[i:i + BULK_PAGE_SIZE]))
+            .values(processed=True)
+            .execution_options(synchronize_session=False)
+        )
 
 def upsert_team_elo(team_name: str, new_elo: float) -> None:
     """Create/Update Team.elo_rating atomically."""
-    db = SessionLocal()
-    try:
+    with _session() as db:
         team = db.query(Team).filter_by(name=team_name).one_or_none()
         if team is None:
             team = Team(name=team_name, elo_rating=new_elo)
             db.add(team)
         else:
             team.elo_rating = new_elo
-        db.commit()
-    finally:
-        db.close()
\ No newline at end of file
+
+@_timed
+def notify_team_stats_changed() -> None:
+    """Tell running API processes to drop their cached team_stats rows."""
+    with _session() as db:
+        if db.get_bind().dialect.name != "postgresql":
+            return  # LISTEN/NOTIFY is Postgres-only; nothing to tell
+        db.execute(text("SELECT pg_notify(:channel, '')"), {"channel": TEAM_STATS_CHANNEL})
+
+# ---- Feature store (scripts/feature_store.py) ----
+TEAM_STATS_COLUMNS = ("form_goals", "win_rate", "elo_rating", "matches_played",
+                      "recent_goals", "recent_wins")
+
+@_timed
+def get_team_stats_rows() -> List[Dict]:
+    """All team_stats rows as dicts (feature store state included)."""
+    with _session() as db:
+        cols = [TeamStats.team_name] + [getattr(TeamStats, c) for c in TEAM_STATS_COLUMNS]
+        return [dict(r._mapping) for r in db.query(*cols).all()]
+
+def _upsert_team_stats(db, rows: List[Dict]) -> None:
+    insert = _insert_for(db)
+    stmt = insert(TeamStats).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TeamStats.team_name],
+        set_={**{c: stmt.excluded[c] for c in TEAM_STATS_COLUMNS}, "updated_at": func.now()},
+    )
+    db.execute(stmt)
+
+@_timed
+def replace_team_stats(rows: List[Dict]) -> None:
+    """Write a full feature-store snapshot in one statement."""
+    if not rows:
+        return
+    with _session() as db:
+        _upsert_team_stats(db, rows)
+
+# ---- Rating history (elo_ratings) ----
+def _upsert_elo_history(db, rows: List[Dict]) -> None:
+    insert = _insert_for(db)
+    stmt = insert(EloRating).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["team_name", "rating_date", "rating_type", "source"],
+        set_={"rating_value": stmt.excluded.rating_value, "updated_at": func.now()},
+    )
+    db.execute(stmt)
+
+@_timed
+def write_elo_history(rows: List[Dict], page_size: int = BULK_PAGE_SIZE) -> int:
+    """
+    Bulk upsert {team_name, rating_date, rating_value, rating_type, source} rows,
+    `page_size` rows per statement, all in one transaction.
+    """
+    if not rows:
+        return 0
+    with _session() as db:
+        for i in range(0, len(rows), page_size):
+            _upsert_elo_history(db, rows[i:i + page_size])
+        return len(rows)
+
+@_timed
+def get_elo_as_of(team_name: str, as_of: date, rating_type: str = "elo",
+                  source: str = "pipeline") -> Optional[Tuple[date, float]]:
+    """(rating_date, rating) of the latest history row on or before `as_of`."""
+    with _session() as db:
+        row = (
+            db.query(EloRating.rating_date, EloRating.rating_value)
+            .filter(EloRating.team_name == team_name,
+                    EloRating.rating_date <= as_of,
+                    EloRating.rating_type == rating_type,
+                    EloRating.source == source)
+            .order_by(EloRating.rating_date.desc())
+            .limit(1)
+            .one_or_none()
+        )
+        return (row[0], float(row[1])) if row else None
+
+@_timed
+def get_elo_leaderboard(as_of: date, active_days: int = 60, limit: int = 20, rating_type: str = "elo",
+                        source: str = "pipeline") -> List[Tuple[str, date, float]]:
+    """
+    (team, rating_date, rating) of the top `limit` teams as of `as_of`, best first.
+    Only teams rated within `active_days` of the newest rating on or before
+    `as_of` are ranked, so relegated clubs drop out once the next season starts
+    and ClubElo's other leagues never enter the scan.
+    """
+    with _session() as db:
+        scope = (EloRating.rating_type == rating_type, EloRating.source == source)
+        newest = db.query(func.max(EloRating.rating_date)).filter(
+            *scope, EloRating.rating_date <= as_of).scalar()
+        if newest is None:
+            return []
+        latest = (
+            db.query(EloRating.team_name, func.max(EloRating.rating_date).label("rating_date"))
+            .filter(*scope, EloRating.rating_date <= as_of,
+                    EloRating.rating_date >= newest - timedelta(days=active_days))
+            .group_by(EloRating.team_name)
+            .subquery()
+        )
+        rows = (
+            db.query(EloRating.team_name, EloRating.rating_date, EloRating.rating_value)
+            .join(latest, and_(EloRating.team_name == latest.c.team_name,
+                               EloRating.rating_date == latest.c.rating_date))
+            .filter(*scope)
+            .order_by(EloRating.rating_value.desc(), EloRating.team_name.asc())
+            .limit(limit)
+            .all()
+        )
+        return [(team, rating_date, float(value)) for team, rating_date, value in rows]
+
+# ---- Bulk write path used by scripts/run_elo_updates.py ----
+@_timed
+def apply_elo_updates(
+    ratings: Dict[str, float],
+    processed_keys: Iterable[Key],
+    team_stats_rows: Optional[List[Dict]] = None,
+    history_rows: Optional[List[Dict]] = None,
+) -> None:
+    """
+    Write final ratings and mark fixtures processed in ONE transaction:
+      - one INSERT ... ON CONFLICT (name) DO UPDATE over all teams
+      - one INSERT ... ON CONFLICT over team_stats (feature store snapshot), if given
+      - INSERT ... ON CONFLICT over elo_ratings (rating history), if given
+      - set-based UPDATEs of match_results over the (date, home, away) keys
+    History rows and keys go BULK_PAGE_SIZE per statement, so a large backlog
+    stays under the driver's bind-parameter limits (SQLite: 32766).
+    A crash between the two can no longer leave ratings updated while the same
+    fixtures are still unprocessed (and so get applied twice on the next run).
+    """
+    keys = list(processed_keys)
+    if not ratings and not keys:
+        return
+    with _session() as db:
+        if team_stats_rows:
+            _upsert_team_stats(db, team_stats_rows)
+        for i in range(0, len(history_rows or ()), BULK_PAGE_SIZE):
+            _upsert_elo_history(db, history_rows[i:i + BULK_PAGE_SIZE])
+        if ratings:
+            insert = _insert_for(db)
+            stmt = insert(Team).values(
+                [{"name": name, "elo_rating": float(elo)} for name, elo in ratings.items()]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Team.name],
+                set_={"elo_rating": stmt.excluded.elo_rating, "last_updated": func.now()},
+            )
+            db.execute(stmt)
+        _mark_processed(db, keys)
@@ -0,0 +1,54 @@
+# gunicorn.conf.py
+"""
+Production serving config:
+  gunicorn -c gunicorn.conf.py api.app:app
+
+The app (and the XGBoost model) is imported once in the master (preload_app)
+and shared copy-on-write with the forked workers. Tunables via env:
+  PORT, WEB_CONCURRENCY (workers, default 2), GUNICORN_THREADS,
+  GUNICORN_KEEPALIVE, GUNICORN_TIMEOUT, MODEL_THREADS (XGBoost threads per worker)
+
+Workers aren't sized from cpu_count(): in a container that is the host's core
+count, and every worker holds its own LISTEN connection plus up to
+DB_POOL_SIZE + DB_MAX_OVERFLOW pooled ones against Postgres' connection limit.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5050')}"
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+threads = int(os.getenv("GUNICORN_THREADS", 2))
+worker_class = "gthread"
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+preload_app = True
+accesslog = "-"
+
+MODEL_THREADS = int(os.getenv("MODEL_THREADS", 1))
+
+
+def when_ready(server):
+    # The master may have opened DB connections while preloading (materialized
+    # predictions); close them so forked workers never share a socket.
+    from api import team_stats
+    team_stats.reset_connections(close=True)
+    # Move everything loaded so far out of the GC's view so collections in the
+    # workers don't touch (and copy) the shared pages.
+    gc.freeze()
+    server.log.info("⚽ Model preloaded; forking %s workers x %s threads", workers, threads)
+
+
+def post_fork(server, worker):
+    from api import app as app_module, team_stats
+    team_stats.reset_connections(close=False)
+    if app_module.model_ready:
+        app_module.predictor.set_threads(MODEL_THREADS)
+    else:
+        # MODEL_LOAD_MODE=background: the master's loader thread doesn't survive fork
+        app_module.start_model_loading()
+
+
+def worker_exit(server, worker):
+    # Flush queued prediction log records before the worker goes away
+    from api.prediction_log import prediction_log
+    prediction_log.close()
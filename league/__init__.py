@@ -0,0 +1,4 @@
+# league/__init__.py
+from .league import FEATURE_NAMES, SEASON_START_MONTH, season_bounds, season_of
+
+__all__ = ["FEATURE_NAMES", "SEASON_START_MONTH", "season_bounds", "season_of"]
@@ -0,0 +1,30 @@
+# league/league.py
+"""
+League calendar and model feature order, shared by the API, the pipeline and
+the DB helpers. Standard library only, so importing it pulls in nothing else.
+"""
+from datetime import date
+from typing import Tuple
+
+# Feature order expected by the model
+FEATURE_NAMES = [
+    'home_form_goals',
+    'away_form_goals',
+    'home_win_rate',
+    'away_win_rate',
+    'elo_home',
+    'elo_away',
+]
+
+# Seasons run July-June and are named by their start year
+SEASON_START_MONTH = 7
+
+
+def season_of(match_date: date) -> int:
+    """EPL season by start year: Aug 2023 - May 2024 is 2023."""
+    return match_date.year if match_date.month >= SEASON_START_MONTH else match_date.year - 1
+
+
+def season_bounds(season: int) -> Tuple[date, date]:
+    """[start, end) dates of a season: 1 July to the next 1 July."""
+    return date(season, SEASON_START_MONTH, 1), date(season + 1, SEASON_START_MONTH, 1)
@@ -0,0 +1,5 @@
+# metrics/__init__.py
+from .metrics import Counter, Gauge, Histogram, StageTimer, REGISTRY, render, write_textfile
+from .profiler import SamplingProfiler
+
+__all__ = ["Counter", "Gauge", "Histogram", "StageTimer", "REGISTRY", "render", "write_textfile", "SamplingProfiler"]
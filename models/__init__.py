@@ -1,4 +1,4 @@
 # models/__init__.py
-from .models import Base, Team, Fixture
+from .models import Base, Team, Fixture, EloRating, TeamStats, SyncState, TableVersion, PredictionLog
 
-__all__ = ["Base", "Team", "Fixture"]
\ No newline at end of file
+__all__ = ["Base", "Team", "Fixture", "EloRating", "TeamStats", "SyncState", "TableVersion", "PredictionLog"]
\ No newline at end of file
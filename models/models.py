@@ -1,7 +1,8 @@
 # models/models.py
 from sqlalchemy import (
-    Column, Integer, String, Float, Date, DateTime, Boolean, UniqueConstraint, func
+    Column, Integer, String, Float, Date, DateTime, Boolean, JSON, Index, UniqueConstraint, event, func
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
@@ -27,4 +28,113 @@ class Fixture(Base):
     __table_args__ = (
         UniqueConstraint("match_date", "home_team", "away_team",
                          name="ux_match_unique"),
-    )
\ No newline at end of file
+    )
+
+class EloRating(Base):
+    """
+    Rating history: one row per team per rating date and source.
+    Written in bulk by run_elo_updates (rating_type "elo", source "pipeline")
+    and by the ClubElo ingestion (scripts/elo_ratings_fetch.py).
+    """
+    __tablename__ = "elo_ratings"
+    id = Column(Integer, primary_key=True)
+    team_name = Column(String(128), nullable=False)
+    rating_date = Column(Date, nullable=False)
+    rating_value = Column(Float, nullable=False)
+    rating_type = Column(String(32), nullable=False, default="elo")
+    source = Column(String(32), nullable=False, default="pipeline")
+    meta = Column(JSON().with_variant(JSONB, "postgresql"))
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Upsert target; as-of lookups are answered from it alone (rating_value is INCLUDEd).
+        Index("ux_elo_ratings_team_date", "team_name", "rating_date", "rating_type", "source",
+              unique=True, postgresql_include=["rating_value"]),
+        # Leaderboard: the recent rating_date range of one rating_type/source.
+        Index("ix_elo_ratings_type_date", "rating_type", "source", "rating_date"),
+    )
+
+class TeamStats(Base):
+    """Current model features per team, maintained by scripts/feature_store.py."""
+    __tablename__ = "team_stats"  # read by the API's /predict_match
+    team_name = Column(String(128), primary_key=True)
+    form_goals = Column(Float, nullable=False)   # mean goals scored over the form window
+    win_rate = Column(Float, nullable=False)     # share of wins over the win-rate window
+    elo_rating = Column(Float, nullable=False)
+    matches_played = Column(Integer, nullable=False, default=0)
+    recent_goals = Column(JSON, nullable=False, default=list)  # window contents, oldest first
+    recent_wins = Column(JSON, nullable=False, default=list)   # 1 = win, 0 = draw/loss
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class SyncState(Base):
+    """High-water mark + HTTP validators for incremental football-data.org syncs."""
+    __tablename__ = "sync_state"
+    key = Column(String(64), primary_key=True)  # "PL:<season start year>", e.g. "PL:2023"
+    watermark = Column(Date)                    # latest match_date ingested
+    etag = Column(String(256))
+    last_modified = Column(String(64))
+    params_hash = Column(String(64))            # sha256 of the query params etag/last_modified answer
+    content_hash = Column(String(64))           # sha256 of the last payload written
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class TableVersion(Base):
+    """
+    Write counter per table, bumped by a trigger in the same transaction as the
+    write (see TABLE_VERSION_TRIGGERS; read by the db_utils teams cache). The
+    bump row-locks, so versions follow commit order.
+    """
+    __tablename__ = "table_versions"
+    table_name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+# Triggers that bump table_versions on every write to a versioned table, so
+# writes from any client (db_utils, scripts, psql) move the version. Installed
+# by create_all() (scripts/create_db.py), idempotently, on new and old databases.
+VERSIONED_TABLES = ["teams"]
+
+def _bump_sql(table: str, current: str) -> str:
+    return (f"INSERT INTO table_versions (table_name, version) VALUES ('{table}', 1) "
+            f"ON CONFLICT (table_name) DO UPDATE SET version = {current} + 1")
+
+def table_version_triggers(dialect: str, table: str) -> list:
+    """DDL statements for `table`'s version trigger on `dialect` (postgresql or sqlite)."""
+    if dialect == "postgresql":
+        return [
+            f"""CREATE OR REPLACE FUNCTION bump_{table}_version() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    {_bump_sql(table, "table_versions.version")};
+    RETURN NULL;
+END $$""",
+            f"DROP TRIGGER IF EXISTS {table}_version ON {table}",
+            f"CREATE TRIGGER {table}_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION bump_{table}_version()",
+        ]
+    if dialect == "sqlite":  # row triggers only
+        return [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_version_{op.lower()} AFTER {op} ON {table} "
+            f"BEGIN {_bump_sql(table, 'version')}; END"
+            for op in ("INSERT", "UPDATE", "DELETE")
+        ]
+    return []
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_table_version_triggers(metadata, connection, **kw):
+    if not connection.dialect.has_table(connection, TableVersion.__tablename__):
+        return
+    for table in VERSIONED_TABLES:
+        if connection.dialect.has_table(connection, table):
+            for statement in table_version_triggers(connection.dialect.name, table):
+                connection.exec_driver_sql(statement)
+
+class PredictionLog(Base):
+    """One row per served prediction, written in batches by api/prediction_log.py."""
+    __tablename__ = "prediction_log"
+    id = Column(Integer, primary_key=True)
+    logged_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    endpoint = Column(String(32), nullable=False)         # "/predict" or "/predict_match"
+    home_team = Column(String(128))
+    away_team = Column(String(128))
+    features = Column(JSON().with_variant(JSONB, "postgresql"))  # null when served from the matrix
+    predicted_result = Column(String(16), nullable=False)  # "Home Win"/"Draw"/"Away Win"
+    prediction_probabilities = Column(JSON().with_variant(JSONB, "postgresql"), nullable=False)
+    source = Column(String(16), nullable=False, default="model")  # "model" or "matrix"
@@ -0,0 +1,94 @@
+# scripts/backfill.py
+"""
+Historical backfill of many EPL seasons.
+
+Seasons are fetched concurrently by a thread pool that shares one RateLimiter
+(driven by football-data.org's request-counter headers and 429s). Each season is
+written through the bulk insert path as soon as it arrives, and recorded in
+sync_state (key "PL:<season>"), so an interrupted backfill resumes with only the
+seasons that are still missing.
+
+Run from project root:
+  python -m scripts.backfill --from 2015 --to 2023 [--workers 4] [--per-minute 10] [--force]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from db.db_utils import get_sync_state, save_sync_state
+from scripts.fetch_data import (
+    RateLimiter,
+    _rows_hash,
+    _sync_key,
+    fetch_finished_epl_matches,
+    insert_matches,
+)
+
+
+def pending_seasons(seasons: List[int], force: bool = False) -> List[int]:
+    """Seasons without a completed sync_state row (all of them with force=True)."""
+    if force:
+        return list(seasons)
+    return [s for s in seasons if not (get_sync_state(_sync_key(s)) or {}).get("watermark")]
+
+
+def backfill(
+    seasons: List[int],
+    workers: int = 4,
+    per_minute: int = 10,
+    force: bool = False,
+    limiter: Optional[RateLimiter] = None,
+) -> Dict[int, tuple]:
+    """Fetch and store `seasons`; returns {season: (inserted, skipped)}."""
+    todo = pending_seasons(seasons, force)
+    done = sorted(set(seasons) - set(todo))
+    if done:
+        print(f"↪️ Already backfilled, skipping: {done}")
+    if not todo:
+        return {}
+
+    limiter = limiter or RateLimiter(per_minute=per_minute)
+    results: Dict[int, tuple] = {}
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(fetch_finished_epl_matches, season=s, retry=5, limiter=limiter): s
+            for s in todo
+        }
+        # Stream each season into the DB on this thread as soon as it arrives
+        for future in as_completed(futures):
+            season = futures[future]
+            try:
+                rows = future.result()
+            except Exception as e:
+                print(f"❌ Season {season} failed: {e}")
+                continue
+            results[season] = insert_matches(rows) if rows else (0, 0)
+            if rows:
+                save_sync_state(
+                    _sync_key(season),
+                    watermark=max(r["match_date"] for r in rows),
+                    content_hash=_rows_hash(rows),
+                )
+            print(f"✅ Season {season}: {len(rows)} matches")
+
+    print(f"✅ Backfilled {len(results)}/{len(todo)} seasons in {time.perf_counter() - t0:.1f}s.")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill historical EPL seasons.")
+    parser.add_argument("--from", dest="start", type=int, required=True, help="first season (start year)")
+    parser.add_argument("--to", dest="end", type=int, required=True, help="last season (start year)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--per-minute", type=int, default=10, help="initial request budget per minute")
+    parser.add_argument("--force", action="store_true", help="refetch seasons already backfilled")
+    args = parser.parse_args()
+
+    backfill(list(range(args.start, args.end + 1)), workers=args.workers,
+             per_minute=args.per_minute, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
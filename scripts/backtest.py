@@ -0,0 +1,172 @@
+# scripts/backtest.py
+"""
+Walk-forward backtest of the match classifier.
+
+For every test season S: train a fresh XGBClassifier on all seasons < S, predict
+season S, and score it (log-loss, Brier score, accuracy, calibration / ECE).
+Folds are independent, so they are trained in parallel on a process pool
+(one xgboost thread per process). Everything runs offline from a local fixtures
+dump; features are the point-in-time ones from scripts/build_training_set.py.
+
+Run from project root:
+  python -m scripts.backtest --dump-fixtures data/fixtures.csv      # once, from the DB
+  python -m scripts.backtest --fixtures-csv data/fixtures.csv [--min-train-seasons 3]
+                             [--workers 4] [--report backtest.json]
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from scripts.build_training_set import point_in_time_chunks, read_fixtures_csv
+from scripts.run_elo_updates import ELO_CONFIG_PATH, EloConfig, load_elo_config
+
+DEFAULT_PARAMS = {
+    "n_estimators": 200,
+    "max_depth": 4,
+    "learning_rate": 0.05,
+    "subsample": 0.9,
+    "objective": "multi:softprob",
+}
+CALIBRATION_BINS = 10
+
+
+# ---- Metrics ----
+def log_loss(y: np.ndarray, proba: np.ndarray) -> float:
+    p = np.clip(proba[np.arange(len(y)), y], 1e-15, 1.0)
+    return float(-np.log(p).mean())
+
+
+def brier_score(y: np.ndarray, proba: np.ndarray) -> float:
+    """Multi-class Brier: mean over matches of the squared error summed over H/D/A."""
+    onehot = np.eye(proba.shape[1])[y]
+    return float(((proba - onehot) ** 2).sum(axis=1).mean())
+
+
+def calibration(y: np.ndarray, proba: np.ndarray, bins: int = CALIBRATION_BINS) -> Dict:
+    """
+    Reliability table over all (match, outcome) probabilities, and the expected
+    calibration error: sum over bins of |mean predicted - observed| * bin share.
+    """
+    p = proba.ravel()
+    hit = (np.eye(proba.shape[1])[y]).ravel()
+    idx = np.minimum((p * bins).astype(int), bins - 1)
+    count = np.bincount(idx, minlength=bins)
+    mean_p = np.bincount(idx, weights=p, minlength=bins) / np.maximum(count, 1)
+    observed = np.bincount(idx, weights=hit, minlength=bins) / np.maximum(count, 1)
+    ece = float((np.abs(mean_p - observed) * count).sum() / max(count.sum(), 1))
+    table = [
+        {"bin": f"{b / bins:.1f}-{(b + 1) / bins:.1f}", "n": int(count[b]),
+         "predicted": round(float(mean_p[b]), 4), "observed": round(float(observed[b]), 4)}
+        for b in range(bins) if count[b]
+    ]
+    return {"ece": round(ece, 4), "bins": table}
+
+
+# ---- Folds ----
+def run_fold(season: int, X: np.ndarray, y: np.ndarray, seasons: np.ndarray, params: Dict) -> Dict:
+    """Train on seasons < `season`, evaluate on `season` (runs in a worker process)."""
+    import xgboost as xgb
+
+    train, test = seasons < season, seasons == season
+    t0 = time.perf_counter()
+    model = xgb.XGBClassifier(**params, n_jobs=1)
+    model.fit(X[train], y[train])
+    proba = model.predict_proba(X[test])
+    return {
+        "season": int(season),
+        "train_rows": int(train.sum()),
+        "test_rows": int(test.sum()),
+        "log_loss": round(log_loss(y[test], proba), 4),
+        "brier": round(brier_score(y[test], proba), 4),
+        "accuracy": round(float((proba.argmax(axis=1) == y[test]).mean()), 4),
+        "calibration": calibration(y[test], proba),
+        "fit_seconds": round(time.perf_counter() - t0, 2),
+    }
+
+
+def walk_forward(
+    fixtures,
+    min_train_seasons: int = 3,
+    workers: Optional[int] = None,
+    params: Optional[Dict] = None,
+    elo_cfg: Optional[EloConfig] = None,
+) -> List[Dict]:
+    """
+    Per-season metrics for every season with at least `min_train_seasons` before it.
+    Elo features use `elo_cfg`, defaulting to the tuned config the API is served with.
+    """
+    chunks = list(point_in_time_chunks(fixtures, elo_cfg or load_elo_config()))
+    X = np.concatenate([c["X"] for c in chunks])
+    y = np.concatenate([c["y"] for c in chunks]).astype(np.int64)
+    seasons = np.concatenate([c["season"] for c in chunks])
+
+    all_seasons = np.unique(seasons)
+    test_seasons = all_seasons[min_train_seasons:]
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(run_fold, s, X, y, seasons, params) for s in test_seasons]
+        return [f.result() for f in futures]
+
+
+def print_report(results: List[Dict]) -> None:
+    print(f"{'season':>8s} {'train':>7s} {'test':>6s} {'logloss':>8s} {'brier':>7s} {'acc':>6s} {'ece':>6s}")
+    for r in results:
+        print(f"{r['season']:>8d} {r['train_rows']:>7d} {r['test_rows']:>6d} {r['log_loss']:>8.4f} "
+              f"{r['brier']:>7.4f} {r['accuracy']:>6.3f} {r['calibration']['ece']:>6.3f}")
+    if results:
+        weights = np.array([r["test_rows"] for r in results])
+        for key in ("log_loss", "brier", "accuracy"):
+            mean = np.average([r[key] for r in results], weights=weights)
+            print(f"  overall {key}: {mean:.4f}")
+
+
+def dump_fixtures(path: str) -> int:
+    """Write match_results to a CSV dump for offline backtests."""
+    from db.db_utils import iter_fixtures
+
+    n = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["match_date", "home_team", "away_team", "home_goals", "away_goals", "result"])
+        for row in iter_fixtures():
+            writer.writerow(row)
+            n += 1
+    print(f"✅ Dumped {n} fixtures to {path}.")
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest by season.")
+    parser.add_argument("--fixtures-csv", help="local fixtures dump (date ordered)")
+    parser.add_argument("--dump-fixtures", metavar="PATH", help="write match_results to PATH and exit")
+    parser.add_argument("--min-train-seasons", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--report", help="write the per-season metrics as JSON")
+    parser.add_argument("--elo-config", default=ELO_CONFIG_PATH,
+                        help="Elo parameters JSON (the one run_elo_updates serves with)")
+    args = parser.parse_args()
+
+    if args.dump_fixtures:
+        dump_fixtures(args.dump_fixtures)
+        return
+    if not args.fixtures_csv:
+        parser.error("--fixtures-csv is required (create one with --dump-fixtures)")
+
+    t0 = time.perf_counter()
+    results = walk_forward(read_fixtures_csv(args.fixtures_csv), args.min_train_seasons, args.workers,
+                           elo_cfg=load_elo_config(args.elo_config))
+    print_report(results)
+    print(f"✅ {len(results)} folds in {time.perf_counter() - t0:.1f}s.")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# scripts/build_training_set.py
+"""
+Point-in-time training matrix for retraining and backtests.
+
+Replays match_results once in date order. For each fixture it records the
+features as they stood BEFORE kickoff (SoccerElo ratings + FeatureStore form)
+and the label, then applies the result. Rows are written in fixed-size chunks,
+so memory stays flat however long the history is.
+
+Output (one file per chunk in --out):
+  npz      part-00000.npz with X (n, 6) float32, y (n,) int8, season (n,) int16,
+           match_date (n,) datetime64[D], home_team / away_team (n,) str
+  parquet  part-00000.parquet with the same columns (requires pyarrow)
+
+Labels follow the API's label_map: 0 = Home Win, 1 = Draw, 2 = Away Win.
+
+Run from project root:
+  python -m scripts.build_training_set --out data/training [--fixtures-csv dump.csv]
+"""
+import argparse
+import csv
+import os
+import time
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from league import FEATURE_NAMES, season_of
+from scripts.feature_store import FeatureStore, FormConfig
+from scripts.run_elo_updates import ELO_CONFIG_PATH, EloConfig, SoccerElo, load_elo_config
+
+LABELS = {"H": 0, "D": 1, "A": 2}
+CHUNK_ROWS = 50_000
+
+
+def read_fixtures_csv(path: str) -> Iterator[Tuple[date, str, str, int, int, str]]:
+    """Stream a local fixtures dump (columns as in match_results)."""
+    with open(path, newline="") as f:
+        for r in csv.DictReader(f):
+            hg, ag = int(r["home_goals"]), int(r["away_goals"])
+            result = r.get("result") or ("H" if hg > ag else "A" if ag > hg else "D")
+            yield (date.fromisoformat(r["match_date"]), r["home_team"], r["away_team"], hg, ag, result)
+
+
+def point_in_time_chunks(
+    fixtures: Iterable[Tuple],
+    elo_cfg: Optional[EloConfig] = None,
+    form_cfg: Optional[FormConfig] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Iterator[Dict[str, np.ndarray]]:
+    """Yield column dicts of at most `chunk_rows` rows; fixtures must be in date order."""
+    elo = SoccerElo(elo_cfg or EloConfig())
+    store = FeatureStore(form_cfg)
+
+    def empty():
+        return {"X": np.empty((chunk_rows, len(FEATURE_NAMES)), dtype=np.float32),
+                "y": np.empty(chunk_rows, dtype=np.int8),
+                "season": np.empty(chunk_rows, dtype=np.int16),
+                "match_date": np.empty(chunk_rows, dtype="datetime64[D]"),
+                "home_team": [], "away_team": []}
+
+    buf, n = empty(), 0
+    for mdate, home, away, hg, ag, result in fixtures:
+        form = store.features(home, away)
+        buf["X"][n] = (form["home_form_goals"], form["away_form_goals"],
+                       form["home_win_rate"], form["away_win_rate"],
+                       elo.get(home), elo.get(away))
+        buf["y"][n] = LABELS[result]
+        buf["season"][n] = season_of(mdate)
+        buf["match_date"][n] = mdate
+        buf["home_team"].append(home)
+        buf["away_team"].append(away)
+        n += 1
+
+        # only now does the result become known
+        elo.update_pair(home, away, hg, ag)
+        store.update(home, away, hg, ag)
+
+        if n == chunk_rows:
+            yield _finish(buf, n)
+            buf, n = empty(), 0
+    if n:
+        yield _finish(buf, n)
+
+
+def _finish(buf: Dict, n: int) -> Dict[str, np.ndarray]:
+    out = {k: v[:n] for k, v in buf.items() if isinstance(v, np.ndarray)}
+    out["home_team"] = np.asarray(buf["home_team"])
+    out["away_team"] = np.asarray(buf["away_team"])
+    return out
+
+
+def write_chunk(chunk: Dict[str, np.ndarray], out_dir: str, part: int, fmt: str = "npz") -> str:
+    if fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow); use --format npz")
+        columns = {name: chunk["X"][:, i] for i, name in enumerate(FEATURE_NAMES)}
+        columns.update({k: chunk[k] for k in ("y", "season", "match_date", "home_team", "away_team")})
+        path = os.path.join(out_dir, f"part-{part:05d}.parquet")
+        pq.write_table(pa.table(columns), path)
+    else:
+        path = os.path.join(out_dir, f"part-{part:05d}.npz")
+        np.savez(path, **chunk)
+    return path
+
+
+def build(fixtures: Iterable[Tuple], out_dir: str, fmt: str = "npz", chunk_rows: int = CHUNK_ROWS,
+          elo_cfg: Optional[EloConfig] = None, form_cfg: Optional[FormConfig] = None) -> List[str]:
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for part, chunk in enumerate(point_in_time_chunks(fixtures, elo_cfg, form_cfg, chunk_rows)):
+        paths.append(write_chunk(chunk, out_dir, part, fmt))
+    return paths
+
+
+def load_training_set(out_dir: str) -> Dict[str, np.ndarray]:
+    """Concatenate every npz chunk in `out_dir` (for training/backtests)."""
+    parts = sorted(f for f in os.listdir(out_dir) if f.endswith(".npz"))
+    if not parts:
+        raise FileNotFoundError(f"No training chunks in {out_dir}")
+    loaded = [np.load(os.path.join(out_dir, f)) for f in parts]
+    return {k: np.concatenate([p[k] for p in loaded]) for k in loaded[0].files}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the point-in-time training matrix.")
+    parser.add_argument("--out", required=True, help="output directory")
+    parser.add_argument("--fixtures-csv", help="read a local fixtures dump instead of the DB")
+    parser.add_argument("--format", choices=("npz", "parquet"), default="npz")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--elo-config", default=ELO_CONFIG_PATH,
+                        help="Elo parameters JSON (the one run_elo_updates serves with)")
+    args = parser.parse_args()
+
+    if args.fixtures_csv:
+        fixtures = read_fixtures_csv(args.fixtures_csv)
+    else:
+        from db.db_utils import iter_fixtures
+        fixtures = iter_fixtures()
+
+    t0 = time.perf_counter()
+    paths = build(fixtures, args.out, args.format, args.chunk_rows, load_elo_config(args.elo_config))
+    print(f"✅ Wrote {len(paths)} chunk(s) to {args.out} in {time.perf_counter() - t0:.1f}s.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,64 @@
 # scripts/create_db.py
+from typing import List
+
+from sqlalchemy import inspect, text
+
 from db import engine
 from models import Base
 
+# Columns added to tables that may predate them; create_all() never alters an
+# existing table, so these are added here with defaults that backfill old rows.
+ADDED_COLUMNS = {
+    "team_stats": {
+        "matches_played": "INTEGER NOT NULL DEFAULT 0",
+        "recent_goals": "JSON NOT NULL DEFAULT '[]'",
+        "recent_wins": "JSON NOT NULL DEFAULT '[]'",
+        "updated_at": "TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+    },
+    "sync_state": {
+        "params_hash": "VARCHAR(64)",
+    },
+}
+
+def add_missing_columns(bind=engine) -> List[str]:
+    """ALTER existing tables to add any ADDED_COLUMNS they lack; returns "table.column" names."""
+    inspector = inspect(bind)
+    added = []
+    with bind.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            if not inspector.has_table(table):
+                continue  # create_all() builds it with every column
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            for column, ddl in columns.items():
+                if column in existing:
+                    continue
+                if bind.dialect.name == "sqlite":
+                    ddl = ddl.replace(" DEFAULT CURRENT_TIMESTAMP", "")  # SQLite only allows constant defaults here
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+                added.append(f"{table}.{column}")
+    return added
+
+def add_missing_indexes(bind=engine) -> List[str]:
+    """Create model indexes missing from tables that already exist; returns their names."""
+    inspector = inspect(bind)
+    added = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=bind)
+                added.append(index.name)
+    return added
+
 def main():
+    added = add_missing_columns()
     Base.metadata.create_all(bind=engine)
+    added += add_missing_indexes()
+    if added:
+        print(f"✅ Added: {', '.join(added)}")
     print("✅ Tables ensured.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,10 +1,30 @@
-# db_utils_elo_debug.py
+# scripts/elo_ratings_fetch.py
+"""
+ClubElo ingestion into elo_ratings.
+
+Streams ClubElo CSV exports (Rank,Club,Country,Level,Elo,From,To) from a local
+file or over HTTP (api.clubelo.com or a stand-in), and upserts them with
+execute_values in pages of `page_size` rows, on a connection borrowed from the
+shared pool (db/db.py, so DATABASE_URL / DB_URL as everywhere else). Rows are committed every
+`commit_every` rows, so memory and transaction size stay bounded however large
+the dump is; errors are raised, not swallowed.
+
+Run from project root:
+  python -m scripts.elo_ratings_fetch clubelo_dump.csv [--page-size 2000] [--commit-every 100000]
+  python -m scripts.elo_ratings_fetch http://api.clubelo.com/Arsenal
+"""
+import argparse
+import csv
 import json
-from typing import Iterable, Mapping, Tuple
-import psycopg2
+import time
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import requests
 from psycopg2.extras import execute_values
 
-UPSERT_SQL_RETURNING = """
+from db import get_connection
+
+UPSERT_SQL = """
 INSERT INTO elo_ratings
     (team_name, rating_date, rating_value, rating_type, source, meta)
 VALUES %s
@@ -12,8 +32,7 @@ ON CONFLICT (team_name, rating_date, rating_type, source)
 DO UPDATE SET
     rating_value = EXCLUDED.rating_value,
     meta         = COALESCE(elo_ratings.meta, '{}'::jsonb) || COALESCE(EXCLUDED.meta, '{}'::jsonb),
-    updated_at   = now()
-RETURNING 1;
+    updated_at   = now();
 """
 
 def _to_row(rec: Mapping) -> Tuple:
@@ -26,27 +45,92 @@ def _to_row(rec: Mapping) -> Tuple:
         json.dumps(rec.get("meta", {})),
     )
 
-def upsert_elo_batch_debug(conn_str: str, records: Iterable[Mapping], page_size: int = 1000) -> int:
-    rows = [_to_row(r) for r in records]
-    if not rows:
-        print("[elo] No records to upsert.")
-        return 0
+# ---- Parsing (streaming) ----
+def _lines(source: str) -> Iterator[str]:
+    if source.startswith(("http://", "https://")):
+        with requests.get(source, stream=True, timeout=60) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines(decode_unicode=True):
+                if line:
+                    yield line
+    else:
+        with open(source, newline="") as f:
+            yield from f
+
+def iter_clubelo_records(source: str) -> Iterator[Dict]:
+    """Yield elo_ratings records from a ClubElo CSV, one line at a time."""
+    for r in csv.DictReader(_lines(source)):
+        elo, start = r.get("Elo"), r.get("From")
+        if not elo or elo == "None" or not start:
+            continue
+        yield {
+            "team_name": r["Club"],
+            "rating_date": start,
+            "rating_value": elo,
+            "meta": {k: r[k] for k in ("Rank", "Country", "Level", "To") if r.get(k) not in (None, "", "None")},
+        }
+
+def _pages(records: Iterable[Mapping], page_size: int) -> Iterator[List[Tuple]]:
+    """
+    Rows in pages of `page_size`. Duplicate keys inside a page are collapsed
+    (last wins): ON CONFLICT DO UPDATE can't touch the same row twice per statement.
+    """
+    page: Dict[Tuple, Tuple] = {}
+    for rec in records:
+        row = _to_row(rec)
+        page[(row[0], row[1], row[3], row[4])] = row
+        if len(page) >= page_size:
+            yield list(page.values())
+            page = {}
+    if page:
+        yield list(page.values())
+
+# ---- Loading ----
+def upsert_elo_batches(
+    records: Iterable[Mapping],
+    page_size: int = 2000,
+    commit_every: int = 100_000,
+) -> int:
+    """
+    Upsert records into elo_ratings; returns rows applied (inserted + updated).
+    Each page is one execute_values statement; a transaction is committed every
+    `commit_every` rows and at the end (a failure rolls back the open one).
+    """
+    applied = 0
+    uncommitted = 0
+    t0 = time.perf_counter()
+    conn = get_connection()
     try:
-        with psycopg2.connect(conn_str) as conn:
-            with conn.cursor() as cur:
-                # Print where we connected
-                cur.execute("SELECT current_database(), current_user;")
-                db, user = cur.fetchone()
-                print(f"[elo] Connected to DB={db} as {user}. Attempting {len(rows)} upserts...")
-
-                # Show a tiny sample of teams
-                sample = [r[0] for r in rows[:5]]
-                print(f"[elo] Sample teams: {sample}{'...' if len(rows) > 5 else ''}")
-
-                execute_values(cur, UPSERT_SQL_RETURNING, rows, page_size=page_size)
-                applied = cur.rowcount  # number of RETURNING rows for this statement
-                print(f"[elo] Applied rows (inserted+updated): {applied}")
-                return applied
-    except Exception as e:
-        print("[elo] ERROR during upsert:", repr(e))
-        return 0
\ No newline at end of file
+        with conn.cursor() as cur:
+            for page in _pages(records, page_size):
+                execute_values(cur, UPSERT_SQL, page, page_size=len(page))
+                applied += cur.rowcount
+                uncommitted += len(page)
+                if uncommitted >= commit_every:
+                    conn.commit()
+                    uncommitted = 0
+                    elapsed = time.perf_counter() - t0
+                    print(f"[elo] {applied} rows ({applied / elapsed:,.0f} rows/s)", flush=True)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - t0
+    print(f"✅ Upserted {applied} ClubElo rows in {elapsed:.1f}s ({applied / max(elapsed, 1e-9):,.0f} rows/s).")
+    return applied
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Load ClubElo CSV exports into elo_ratings.")
+    parser.add_argument("source", help="CSV file path or http(s) URL")
+    parser.add_argument("--page-size", type=int, default=2000)
+    parser.add_argument("--commit-every", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    upsert_elo_batches(iter_clubelo_records(args.source),
+                       page_size=args.page_size, commit_every=args.commit_every)
+
+if __name__ == "__main__":
+    main()
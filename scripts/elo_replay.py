@@ -0,0 +1,224 @@
+# scripts/elo_replay.py
+"""
+Vectorized Elo replay engine.
+
+Same maths as SoccerElo (scripts/run_elo_updates.py), but teams are mapped to
+integer ids and ratings live in a NumPy array. Fixtures are split, in order,
+into batches in which no team appears twice (in practice: a matchday), and each
+batch is updated with array operations. Because fixtures inside a batch are
+independent, the result is the same as a fixture-by-fixture replay.
+
+sequential=True updates one fixture at a time with SoccerElo's own formulas and
+reproduces SoccerElo bit-for-bit.
+
+Run from project root (replays every fixture in match_results):
+  python -m scripts.elo_replay [--write-history]
+"""
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scripts.run_elo_updates import EloConfig, SoccerElo, history_rows, load_elo_config
+
+# (match_date, home_team, away_team, home_goals, away_goals, ...) as returned by db_utils
+FixtureRow = Tuple
+
+
+@dataclass
+class ReplayResult:
+    ratings: Dict[str, float]
+    pre_home: np.ndarray   # home rating before each fixture (input order)
+    pre_away: np.ndarray   # away rating before each fixture
+    expected_home: np.ndarray  # home expectation (incl. home advantage) before each fixture
+    post_home: np.ndarray  # home rating after each fixture
+    post_away: np.ndarray
+
+
+def conflict_free_batches(home_ids: np.ndarray, away_ids: np.ndarray) -> List[Tuple[int, int]]:
+    """Split fixtures, in order, into [start, stop) runs where no team repeats."""
+    batches = []
+    start = 0
+    seen = set()
+    for i, (h, a) in enumerate(zip(home_ids.tolist(), away_ids.tolist())):
+        if h in seen or a in seen:
+            batches.append((start, i))
+            start = i
+            seen = set()
+        seen.add(h)
+        seen.add(a)
+    if start < len(home_ids):
+        batches.append((start, len(home_ids)))
+    return batches
+
+
+class EloReplay:
+    def __init__(self, cfg: EloConfig, initial: Optional[Dict[str, float]] = None):
+        self.cfg = cfg
+        self.team_ids: Dict[str, int] = {}
+        self.ratings = np.empty(0, dtype=np.float64)
+        if initial:
+            for team, rating in initial.items():
+                idx = self._id(team)
+                self.ratings[idx] = rating
+
+    def _id(self, team: str) -> int:
+        idx = self.team_ids.get(team)
+        if idx is None:
+            idx = self.team_ids[team] = len(self.team_ids)
+            if idx >= len(self.ratings):
+                grown = np.full(max(2 * len(self.ratings), 32), self.cfg.base_rating)
+                grown[:len(self.ratings)] = self.ratings
+                self.ratings = grown
+        return idx
+
+    def encode(self, fixtures: Iterable[FixtureRow]):
+        """Map fixture rows to (home_ids, away_ids, home_goals, away_goals) arrays."""
+        fixtures = list(fixtures)
+        home_ids = np.fromiter((self._id(f[1]) for f in fixtures), dtype=np.int64, count=len(fixtures))
+        away_ids = np.fromiter((self._id(f[2]) for f in fixtures), dtype=np.int64, count=len(fixtures))
+        hg = np.fromiter((f[3] for f in fixtures), dtype=np.int64, count=len(fixtures))
+        ag = np.fromiter((f[4] for f in fixtures), dtype=np.int64, count=len(fixtures))
+        return home_ids, away_ids, hg, ag
+
+    def replay(self, fixtures: Sequence[FixtureRow], sequential: bool = False) -> ReplayResult:
+        """Apply fixtures (already in chronological order) to the current ratings."""
+        home_ids, away_ids, hg, ag = self.encode(fixtures)
+        n = len(home_ids)
+        pre_home = np.empty(n)
+        pre_away = np.empty(n)
+        expected_home = np.empty(n)
+        post_home = np.empty(n)
+        post_away = np.empty(n)
+
+        if sequential:
+            self._replay_sequential(home_ids, away_ids, hg, ag, pre_home, pre_away, expected_home,
+                                    post_home, post_away)
+        elif n:
+            self._replay_batched(home_ids, away_ids, hg, ag, pre_home, pre_away, expected_home,
+                                 post_home, post_away)
+
+        return ReplayResult(self.as_dict(), pre_home, pre_away, expected_home, post_home, post_away)
+
+    def _replay_sequential(self, home_ids, away_ids, hg, ag, pre_home, pre_away, expected_home,
+                           post_home, post_away):
+        cfg = self.cfg
+        R = self.ratings.tolist()  # plain floats: cheaper to index than array scalars
+        rows = zip(home_ids.tolist(), away_ids.tolist(), hg.tolist(), ag.tolist())
+        for i, (h, a, goals_h, goals_a) in enumerate(rows):
+            Ra, Rb = R[h], R[a]
+            d = (Ra + cfg.home_adv) - Rb
+            Eh = SoccerElo.expected(d); Ea = 1 - Eh
+            Sh, Sa = (1.0, 0.0) if goals_h > goals_a else (0.0, 1.0) if goals_a > goals_h else (0.5, 0.5)
+            g = SoccerElo.g_factor(abs(goals_h - goals_a), abs(d))
+            R[h] = Ra + cfg.k * g * (Sh - Eh)
+            R[a] = Rb + cfg.k * g * (Sa - Ea)
+            pre_home[i], pre_away[i], expected_home[i] = Ra, Rb, Eh
+            post_home[i], post_away[i] = R[h], R[a]
+        self.ratings[:] = R
+
+    def _replay_batched(self, home_ids, away_ids, hg, ag, pre_home, pre_away, expected_home,
+                        post_home, post_away):
+        cfg, R = self.cfg, self.ratings
+        # Everything that doesn't depend on ratings is computed once for all fixtures
+        Sh = np.where(hg > ag, 1.0, np.where(ag > hg, 0.0, 0.5))
+        Sa = np.where(hg > ag, 0.0, np.where(ag > hg, 1.0, 0.5))
+        goal_diff = np.abs(hg - ag)
+        log_gd = np.where(goal_diff <= 0, 0.0, np.log(goal_diff + 1.0))
+        draw_or_none = goal_diff <= 0
+
+        for start, stop in conflict_free_batches(home_ids, away_ids):
+            h, a = home_ids[start:stop], away_ids[start:stop]
+            Ra, Rb = R[h], R[a]
+            d = (Ra + cfg.home_adv) - Rb
+            Eh = 1.0 / (1.0 + 10 ** (-d / 400.0)); Ea = 1 - Eh
+            g = log_gd[start:stop] * (2.2 / ((np.abs(d) * 0.001) + 2.2))
+            g[draw_or_none[start:stop]] = 1.0
+            R[h] = Ra + cfg.k * g * (Sh[start:stop] - Eh)
+            R[a] = Rb + cfg.k * g * (Sa[start:stop] - Ea)
+            pre_home[start:stop], pre_away[start:stop], expected_home[start:stop] = Ra, Rb, Eh
+            post_home[start:stop], post_away[start:stop] = R[h], R[a]
+
+    def as_dict(self) -> Dict[str, float]:
+        return {team: float(self.ratings[idx]) for team, idx in self.team_ids.items()}
+
+
+def replay_configs(
+    fixtures: Sequence[FixtureRow],
+    k: np.ndarray,
+    home_adv: np.ndarray,
+    base_rating: float = 1500.0,
+    burn_in: int = 0,
+) -> np.ndarray:
+    """
+    Replay the same fixtures under many (k, home_adv) configs at once and return
+    each config's mean log-loss of the Elo expectation against the actual result
+    (1 / 0.5 / 0 for the home side), ignoring the first `burn_in` fixtures.
+
+    Configs are an extra array dimension: ratings are a (n_configs, n_teams)
+    matrix and every matchday batch updates all configs with the same array
+    operations, so thousands of configs cost little more than one.
+    """
+    k = np.asarray(k, dtype=np.float64)[:, None]
+    home_adv = np.asarray(home_adv, dtype=np.float64)[:, None]
+    engine = EloReplay(EloConfig(base_rating=base_rating))
+    home_ids, away_ids, hg, ag = engine.encode(fixtures)
+    R = np.full((k.shape[0], max(len(engine.team_ids), 1)), base_rating)
+
+    Sh = np.where(hg > ag, 1.0, np.where(ag > hg, 0.0, 0.5))
+    Sa = np.where(hg > ag, 0.0, np.where(ag > hg, 1.0, 0.5))
+    goal_diff = np.abs(hg - ag)
+    log_gd = np.where(goal_diff <= 0, 0.0, np.log(goal_diff + 1.0))
+    draw_or_none = goal_diff <= 0
+
+    loss = np.zeros(k.shape[0])
+    scored = 0
+    for start, stop in conflict_free_batches(home_ids, away_ids):
+        h, a = home_ids[start:stop], away_ids[start:stop]
+        Ra, Rb = R[:, h], R[:, a]
+        d = (Ra + home_adv) - Rb
+        Eh = 1.0 / (1.0 + 10 ** (-d / 400.0)); Ea = 1 - Eh
+
+        if stop > burn_in:
+            lo = max(start, burn_in) - start
+            s, e = Sh[start:stop][lo:], np.clip(Eh[:, lo:], 1e-12, 1 - 1e-12)
+            loss -= (s * np.log(e) + (1 - s) * np.log(1 - e)).sum(axis=1)
+            scored += stop - start - lo
+
+        g = log_gd[start:stop] * (2.2 / ((np.abs(d) * 0.001) + 2.2))
+        g[:, draw_or_none[start:stop]] = 1.0
+        R[:, h] = Ra + k * g * (Sh[start:stop] - Eh)
+        R[:, a] = Rb + k * g * (Sa[start:stop] - Ea)
+
+    return loss / max(scored, 1)
+
+
+def main():
+    from db.db_utils import get_all_fixtures, write_elo_history
+
+    parser = argparse.ArgumentParser(description="Replay every fixture in match_results.")
+    parser.add_argument("--write-history", action="store_true",
+                        help="(re)write the full elo_ratings history from the replay")
+    args = parser.parse_args()
+
+    fixtures = get_all_fixtures()
+    t0 = time.perf_counter()
+    result = EloReplay(load_elo_config()).replay(fixtures)
+    elapsed = time.perf_counter() - t0
+    print(f"✅ Replayed {len(fixtures)} fixtures for {len(result.ratings)} teams in {elapsed * 1000:.1f} ms.")
+    for team, rating in sorted(result.ratings.items(), key=lambda kv: -kv[1])[:20]:
+        print(f"  {team:30s} {rating:8.1f}")
+
+    if args.write_history:
+        history = {}
+        for i, (mdate, home, away, *_rest) in enumerate(fixtures):
+            history[(home, mdate)] = result.post_home[i]
+            history[(away, mdate)] = result.post_away[i]
+        n = write_elo_history(history_rows(history))
+        print(f"✅ Wrote {n} elo_ratings history rows.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# scripts/feature_store.py
+"""
+Feature store for the model's form features.
+
+Per team it keeps two fixed-size running windows over match_results:
+  form_goals  mean goals scored in the last `form_window` matches
+  win_rate    share of wins in the last `win_window` matches
+Each fixture updates a window in O(1) (deque + running sum), so new fixtures
+are folded in without rescanning history. The window contents are persisted
+in team_stats next to the current Elo, which lets the next run resume where
+this one stopped. run_elo_updates writes the snapshot in the same transaction
+as the ratings.
+
+/predict_match reads team_stats; training/backtests replay the same
+FeatureStore (see scripts/build_training_set.py), so both see identical features.
+
+Rebuild team_stats from the full history (first run / after changing windows):
+  python -m scripts.feature_store --rebuild
+"""
+import argparse
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+
+@dataclass
+class FormConfig:
+    form_window: int = 5
+    win_window: int = 10
+    # Used until a team has played its first match
+    default_form_goals: float = 1.4
+    default_win_rate: float = 0.37
+
+
+class RunningWindow:
+    """Last `size` values with an O(1) running sum."""
+
+    def __init__(self, size: int, values: Iterable[float] = ()):
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        for v in values:
+            self.push(v)
+
+    def push(self, value: float) -> None:
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+    def mean(self, default: float) -> float:
+        return self.total / len(self.values) if self.values else default
+
+
+class TeamForm:
+    def __init__(self, cfg: FormConfig, recent_goals=(), recent_wins=(), matches_played: int = 0):
+        self.cfg = cfg
+        self.goals = RunningWindow(cfg.form_window, recent_goals)
+        self.wins = RunningWindow(cfg.win_window, recent_wins)
+        self.matches_played = matches_played
+
+    def push(self, goals_for: int, won: bool) -> None:
+        self.goals.push(float(goals_for))
+        self.wins.push(1.0 if won else 0.0)
+        self.matches_played += 1
+
+    @property
+    def form_goals(self) -> float:
+        return self.goals.mean(self.cfg.default_form_goals)
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins.mean(self.cfg.default_win_rate)
+
+
+class FeatureStore:
+    def __init__(self, cfg: Optional[FormConfig] = None):
+        self.cfg = cfg or FormConfig()
+        self.teams: Dict[str, TeamForm] = {}
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict], cfg: Optional[FormConfig] = None) -> "FeatureStore":
+        """Resume from persisted team_stats rows (see snapshot())."""
+        store = cls(cfg)
+        for r in rows:
+            store.teams[r["team_name"]] = TeamForm(
+                store.cfg, r.get("recent_goals") or (), r.get("recent_wins") or (),
+                r.get("matches_played") or 0,
+            )
+        return store
+
+    def team(self, name: str) -> TeamForm:
+        form = self.teams.get(name)
+        if form is None:
+            form = self.teams[name] = TeamForm(self.cfg)
+        return form
+
+    def features(self, home: str, away: str) -> Dict[str, float]:
+        """Form features for a fixture as they stand now (i.e. before kickoff)."""
+        h, a = self.team(home), self.team(away)
+        return {
+            "home_form_goals": h.form_goals,
+            "away_form_goals": a.form_goals,
+            "home_win_rate": h.win_rate,
+            "away_win_rate": a.win_rate,
+        }
+
+    def update(self, home: str, away: str, home_goals: int, away_goals: int) -> None:
+        self.team(home).push(home_goals, home_goals > away_goals)
+        self.team(away).push(away_goals, away_goals > home_goals)
+
+    def snapshot(self, ratings: Dict[str, float], teams: Optional[Iterable[str]] = None,
+                 base_rating: float = 1500.0) -> List[Dict]:
+        """team_stats rows for `teams` (default: all) with their current Elo."""
+        names = self.teams.keys() if teams is None else teams
+        rows = []
+        for name in names:
+            form = self.team(name)
+            rows.append({
+                "team_name": name,
+                "form_goals": form.form_goals,
+                "win_rate": form.win_rate,
+                "elo_rating": float(ratings.get(name, base_rating)),
+                "matches_played": form.matches_played,
+                "recent_goals": list(form.goals.values),
+                "recent_wins": list(form.wins.values),
+            })
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the team_stats feature store.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="recompute team_stats from every processed fixture in match_results")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    from db.db_utils import get_all_fixtures, get_latest_elos, notify_team_stats_changed, replace_team_stats
+
+    # Unprocessed fixtures are left to the next run_elo_updates, which folds them
+    # into the windows along with their Elo; including them here would count them twice.
+    store = FeatureStore()
+    fixtures = get_all_fixtures(processed_only=True)
+    for _, home, away, hg, ag, _ in fixtures:
+        store.update(home, away, hg, ag)
+    rows = store.snapshot(get_latest_elos())
+    replace_team_stats(rows)
+    notify_team_stats_changed()
+    print(f"✅ Rebuilt team_stats for {len(rows)} teams from {len(fixtures)} fixtures.")
+
+if __name__ == "__main__":
+    main()
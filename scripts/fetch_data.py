@@ -1,16 +1,28 @@
 # scripts/fetch_data.py
+import hashlib
+import json
 import os
+import threading
 import time
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Dict, Any, Tuple
 import requests
 
-from db.db_utils import save_fixture  # ORM helper that writes a row
+from db.db_utils import (
+    bulk_insert_fixtures,  # one INSERT ... ON CONFLICT DO NOTHING for all rows
+    get_sync_state,
+    save_sync_state,
+)
+from league import season_bounds, season_of
 
 API_TOKEN = os.getenv("FOOTBALL_DATA_API_TOKEN")
 BASE_URL = "https://api.football-data.org/v4"
 HEADERS = {"X-Auth-Token": API_TOKEN}
 
+# Incremental syncs re-request this many days before the watermark, to pick up
+# late results and rescheduled fixtures.
+LOOKBACK_DAYS = int(os.getenv("FETCH_LOOKBACK_DAYS", 3))
+
 def _normalize_team(name: str) -> str:
     """Keep names consistent. Adjust this map as needed."""
     mapping = {
@@ -36,35 +48,109 @@ def _normalize_team(name: str) -> str:
     }
     return mapping.get(name.strip(), name.strip())
 
-def fetch_finished_epl_matches(
-    season: Optional[int] = None,
-    date_from: Optional[str] = None,  # "YYYY-MM-DD"
-    date_to: Optional[str] = None,    # "YYYY-MM-DD"
+class RateLimiter:
+    """
+    Shared request budget for football-data.org, safe to use from many threads.
+
+    Starts from `per_minute` and then trusts the API's own counters:
+      X-Requests-Available-Minute  requests left in the current window
+      X-RequestCounter-Reset       seconds until the window resets
+    A 429 empties the budget until Retry-After / the reset header has passed.
+    """
+
+    def __init__(self, per_minute: int = 10, window: float = 60.0):
+        self.per_minute = per_minute
+        self.window = window
+        self.available = per_minute
+        self.reset_at = time.monotonic() + window
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """Block until a request may be sent, then spend one unit of budget."""
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now >= self.reset_at:
+                    self.available = self.per_minute
+                    self.reset_at = now + self.window
+                if self.available > 0:
+                    self.available -= 1
+                    return
+                self._cond.wait(self.reset_at - now)
+
+    def observe(self, resp: requests.Response) -> None:
+        """Update the budget from a response's rate-limit headers."""
+        headers = resp.headers
+        with self._cond:
+            now = time.monotonic()
+            reset = headers.get("X-RequestCounter-Reset")
+            if reset is not None:
+                self.reset_at = now + float(reset)
+            remaining = headers.get("X-Requests-Available-Minute")
+            if remaining is not None:
+                # Never trust the header above our own count: other threads' requests may be in flight
+                self.available = min(self.available, int(remaining))
+            if resp.status_code == 429:
+                retry_after = headers.get("Retry-After") or reset or self.window
+                self.available = 0
+                self.reset_at = now + float(retry_after)
+            self._cond.notify_all()
+
+def _request_matches(
+    params: Dict[str, Any],
+    extra_headers: Optional[Dict[str, str]] = None,
     retry: int = 2,
     backoff: float = 1.5,
-) -> List[Dict[str, Any]]:
-    """Pull finished EPL matches from Football-Data.org and return rows for save_fixture()."""
+    limiter: Optional[RateLimiter] = None,
+) -> requests.Response:
+    """
+    GET /competitions/PL/matches with retries; returns a 200 or 304 response.
+    With a limiter, requests wait for budget and 429s wait for the reset
+    instead of sleeping backoff ** attempt.
+    """
     if not API_TOKEN:
         raise RuntimeError("FOOTBALL_DATA_API_TOKEN is not set in your environment.")
 
     url = f"{BASE_URL}/competitions/PL/matches"
-    params = {"status": "FINISHED"}
+    headers = {**HEADERS, **(extra_headers or {})}
+    for attempt in range(retry + 1):
+        if limiter is not None:
+            limiter.acquire()
+        resp = requests.get(url, headers=headers, params=params, timeout=25)
+        if limiter is not None:
+            limiter.observe(resp)
+        if resp.status_code in (200, 304):
+            return resp
+        if attempt == retry:
+            raise RuntimeError(f"Football-Data API error {resp.status_code}: {resp.text[:200]}")
+        if limiter is None or resp.status_code != 429:
+            time.sleep(backoff ** attempt)
+
+def _match_params(season: Optional[int], date_from: Optional[str], date_to: Optional[str]) -> Dict[str, Any]:
+    params: Dict[str, Any] = {"status": "FINISHED"}
     if season is not None:
         params["season"] = season
     if date_from:
         params["dateFrom"] = date_from
     if date_to:
         params["dateTo"] = date_to
+    return params
 
-    for attempt in range(retry + 1):
-        resp = requests.get(url, headers=HEADERS, params=params, timeout=25)
-        if resp.status_code == 200:
-            break
-        if attempt == retry:
-            raise RuntimeError(f"Football-Data API error {resp.status_code}: {resp.text[:200]}")
-        time.sleep(backoff ** attempt)
+def fetch_finished_epl_matches(
+    season: Optional[int] = None,
+    date_from: Optional[str] = None,  # "YYYY-MM-DD"
+    date_to: Optional[str] = None,    # "YYYY-MM-DD"
+    retry: int = 2,
+    backoff: float = 1.5,
+    limiter: Optional[RateLimiter] = None,
+) -> List[Dict[str, Any]]:
+    """Pull finished EPL matches from Football-Data.org and return rows for insert_matches()."""
+    resp = _request_matches(_match_params(season, date_from, date_to), retry=retry,
+                            backoff=backoff, limiter=limiter)
+    return parse_matches(resp.json())
 
-    data = resp.json()
+def parse_matches(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Turn a football-data.org /matches payload into match_results rows."""
     rows: List[Dict[str, Any]] = []
 
     for m in data.get("matches", []):
@@ -101,15 +187,83 @@ def fetch_finished_epl_matches(
 
     return rows
 
-def insert_matches(rows: List[Dict[str, Any]]) -> int:
-    """Insert via ORM helper into match_results."""
-    inserted = 0
-    for r in rows:
-        save_fixture(r)
-        inserted += 1
-    print(f"✅ Inserted {inserted} finished EPL matches.")
-    return inserted
+def insert_matches(rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Bulk insert into match_results; returns (inserted, skipped_duplicates)."""
+    inserted, skipped = bulk_insert_fixtures(rows)
+    print(f"✅ Inserted {inserted} finished EPL matches ({skipped} already stored).")
+    return inserted, skipped
+
+# ---- Incremental sync ----
+def _sync_key(season: int) -> str:
+    return f"PL:{season}"
+
+def _rows_hash(rows: List[Dict[str, Any]]) -> str:
+    return hashlib.sha256(json.dumps(rows, sort_keys=True, default=str).encode()).hexdigest()
+
+def _params_hash(params: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+def sync_finished_matches(season: Optional[int] = None, lookback_days: int = LOOKBACK_DAYS) -> Tuple[int, int]:
+    """
+    Fetch only what changed since the last run and insert it.
+
+    - `season` defaults to the one in progress today (July-June), so each season
+      keeps its own watermark and a new season starts with a full fetch.
+    - Requests dateFrom = watermark - lookback_days up to the season's end on
+      30 June (the first run fetches everything).
+    - Sends If-None-Match / If-Modified-Since from the previous response, but only
+      when the query params are the ones that response answered; a 304 ends the sync.
+    - Skips the DB write when the payload is identical to the last one written.
+    Returns (inserted, skipped).
+    """
+    if season is None:
+        season = season_of(date.today())
+    key = _sync_key(season)
+    state = get_sync_state(key) or {}
+    watermark: Optional[date] = state.get("watermark")
+
+    date_from = date_to = None
+    if watermark:
+        date_from = (watermark - timedelta(days=lookback_days)).isoformat()
+        # The API wants both ends of the range. The season's end keeps the query
+        # (and so its validators) unchanged until the watermark moves.
+        date_to = (season_bounds(season)[1] - timedelta(days=1)).isoformat()
+
+    params = _match_params(season, date_from, date_to)
+    params_hash = _params_hash(params)
+    conditional = {}
+    if state.get("params_hash") == params_hash:
+        if state.get("etag"):
+            conditional["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            conditional["If-Modified-Since"] = state["last_modified"]
+
+    resp = _request_matches(params, extra_headers=conditional)
+    if resp.status_code == 304:
+        print(f"✅ {key}: not modified since last sync; nothing to write.")
+        return 0, 0
+
+    rows = parse_matches(resp.json())
+    content_hash = _rows_hash(rows)
+    validators = {
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "params_hash": params_hash,
+    }
+    if not rows or content_hash == state.get("content_hash"):
+        save_sync_state(key, **validators)
+        print(f"✅ {key}: no new matches since {date_from or 'season start'}; skipped DB write.")
+        return 0, len(rows)
+
+    inserted, skipped = insert_matches(rows)
+    latest = max(r["match_date"] for r in rows)
+    save_sync_state(
+        key,
+        watermark=max(latest, watermark) if watermark else latest,
+        content_hash=content_hash,
+        **validators,
+    )
+    return inserted, skipped
 
 if __name__ == "__main__":
-    payload = fetch_finished_epl_matches()
-    insert_matches(payload)
\ No newline at end of file
+    sync_finished_matches()
\ No newline at end of file
@@ -1,21 +1,43 @@
 # scripts/run_elo_updates.py
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+import json
 import math
+import os
 from typing import Dict
 
 from db.db_utils import (
-    get_latest_elos,
+    apply_elo_updates,
+    get_elos,
+    get_team_stats_rows,
     get_unprocessed_fixtures,
-    mark_fixtures_processed_by_keys,
-    upsert_team_elo,
+    notify_team_stats_changed,
 )
 
+try:
+    from .feature_store import FeatureStore
+except ImportError:
+    from feature_store import FeatureStore
+
 @dataclass
 class EloConfig:
     base_rating: float = 1500.0
     k: float = 24.0
     home_adv: float = 65.0
 
+# Tuned parameters written by scripts/tune_elo.py (falls back to EloConfig defaults)
+ELO_CONFIG_PATH = os.getenv(
+    "ELO_CONFIG_PATH",
+    os.path.join(os.path.dirname(__file__), '..', 'models', 'elo_config.json'),
+)
+
+def load_elo_config(path: str = ELO_CONFIG_PATH) -> EloConfig:
+    if not os.path.exists(path):
+        return EloConfig()
+    with open(path) as f:
+        data = json.load(f)
+    known = {f.name for f in fields(EloConfig)}
+    return EloConfig(**{k: float(v) for k, v in data.items() if k in known})
+
 class SoccerElo:
     def __init__(self, cfg: EloConfig):
         self.cfg = cfg
@@ -46,28 +68,51 @@ class SoccerElo:
         self.ratings[away] = Rb_new
         return Rh_new, Rb_new
 
+def history_rows(history: Dict) -> list:
+    """elo_ratings rows from {(team, match_date): rating}."""
+    return [
+        {"team_name": team, "rating_date": mdate, "rating_value": float(rating),
+         "rating_type": "elo", "source": "pipeline"}
+        for (team, mdate), rating in history.items()
+    ]
+
 def main():
-    cfg = EloConfig()
+    cfg = load_elo_config()
     elo = SoccerElo(cfg)
 
-    # 1) seed with current elos
-    latest = get_latest_elos()  # {team: rating}
-    elo.ratings.update(latest)
-
-    # 2) get unprocessed fixtures
+    # 1) get unprocessed fixtures
     fixtures = get_unprocessed_fixtures()  # (mdate, home, away, hg, ag, result)
     if not fixtures:
         print("No unprocessed fixtures.")
         return
 
+    # 2) seed the teams that play with their current elos (teams cache)
+    teams = {team for _, home, away, *_ in fixtures for team in (home, away)}
+    elo.ratings.update(get_elos(teams, default=cfg.base_rating))
+
+    # form windows resume from the persisted feature store
+    store = FeatureStore.from_rows(get_team_stats_rows())
+
     processed_keys = []
+    touched = set()
+    history = {}  # (team, match_date) -> rating after that day's fixture
     for mdate, home, away, hg, ag, result in fixtures:
         new_home, new_away = elo.update_pair(home, away, hg, ag)
-        upsert_team_elo(home, new_home)
-        upsert_team_elo(away, new_away)
+        store.update(home, away, hg, ag)
+        touched.update((home, away))
+        history[(home, mdate)] = new_home
+        history[(away, mdate)] = new_away
         processed_keys.append((mdate, home, away))
 
-    mark_fixtures_processed_by_keys(processed_keys)
+    # 3) one transaction: final rating per team, team_stats snapshot, rating history,
+    #    fixtures marked processed
+    apply_elo_updates(
+        {team: elo.ratings[team] for team in touched},
+        processed_keys,
+        store.snapshot(elo.ratings, teams=touched, base_rating=cfg.base_rating),
+        history_rows(history),
+    )
+    notify_team_stats_changed()
     print(f"✅ Processed {len(processed_keys)} fixtures and updated team Elo.")
 
 if __name__ == "__main__":
@@ -1,9 +1,13 @@
 # scripts/run_pipeline.py
 """
 End-to-end pipeline:
-1) Fetch finished EPL matches and insert into DB.
+1) Fetch finished EPL matches since the last run's watermark and insert into DB.
 2) Update Elo for all unprocessed fixtures.
 
+Stage timings are printed at the end and recorded in pipeline_stage_seconds;
+set METRICS_TEXTFILE to also write them (plus db_query_seconds) for
+node_exporter's textfile collector.
+
 Run from project root:
   python -m scripts.run_pipeline
 or:
@@ -14,17 +18,20 @@ or:
 import os
 from dotenv import load_dotenv
 
+from db import record_pool_stats
+from metrics import Histogram, StageTimer, write_textfile
+
 # Always load .env from the project root
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 def _import_fetch():
     try:
         # when run as module: python -m scripts.run_pipeline
-        from .fetch_data import fetch_finished_epl_matches, insert_matches
+        from .fetch_data import sync_finished_matches
     except Exception:
         # when run as script: python scripts/run_pipeline.py
-        from fetch_data import fetch_finished_epl_matches, insert_matches
-    return fetch_finished_epl_matches, insert_matches
+        from fetch_data import sync_finished_matches
+    return sync_finished_matches
 
 def _import_elo_runner():
     try:
@@ -33,18 +40,29 @@ def _import_elo_runner():
         from run_elo_updates import main as run_elo_main
     return run_elo_main
 
+PIPELINE_SECONDS = Histogram("pipeline_stage_seconds", "Duration of each run_pipeline stage.", ["stage"])
+
 def main():
-    fetch_finished_epl_matches, insert_matches = _import_fetch()
+    timer = StageTimer(PIPELINE_SECONDS)
+    sync_finished_matches = _import_fetch()
     run_elo_main = _import_elo_runner()
+    timer.lap("import")
 
-    print("📡 Fetching finished EPL matches…")
-    rows = fetch_finished_epl_matches()
-    insert_matches(rows)
+    print("📡 Fetching finished EPL matches (incremental)…")
+    sync_finished_matches()
+    timer.lap("fetch")
 
     print("♻️ Updating Elo ratings…")
     run_elo_main()
+    timer.lap("elo")
+
+    print("✅ Full pipeline complete: " + ", ".join(f"{k}={v:.2f}s" for k, v in timer.laps.items()))
+    stats = record_pool_stats()
+    print("🔌 DB pool: " + ", ".join(f"{k}={v}" for k, v in stats.items()))
 
-    print("✅ Full pipeline complete.")
+    textfile = os.getenv("METRICS_TEXTFILE")
+    if textfile:
+        write_textfile(textfile)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,319 @@
+# scripts/season_sim.py
+"""
+Monte Carlo season simulator: title, top-4 and relegation probabilities.
+
+1) Current table (points, goal difference, played) from the season's results
+   in match_results. The clubs are the LEAGUE_SIZE that have played this season;
+   until all of them have, the previous season's clubs minus its bottom three
+   stand in for the ones not seen yet (see league_clubs). In a double round
+   robin every team hosts every other team once, so the remaining fixtures are
+   the (home, away) pairs not played yet.
+2) H/D/A probabilities for all remaining fixtures in one batch, from the
+   classifier (source="model") or from the Elo expectation (source="elo").
+3) Seasons are simulated as NumPy draws, `chunk` seasons at a time: one
+   uniform per (season, fixture), outcome by comparing it with the cumulative
+   probabilities, points added per team with two matrix products against
+   fixture/team incidence matrices. Chunks run in parallel on a process pool.
+
+Ties on points are broken by the current goal difference, then at random
+(simulated matches only produce results, not scores).
+
+Run from project root:
+  python -m scripts.season_sim [--season 2024] [--sims 200000] [--source model|elo]
+                               [--workers 8] [--fixtures-csv data/fixtures.csv] [--json out.json]
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from league import FEATURE_NAMES, season_of
+
+# Draw probability of an evenly matched game in the Elo source; it shrinks
+# linearly with the favourite's expectation (see elo_probabilities).
+DRAW_PEAK = 0.30
+CHUNK_SEASONS = 25_000
+LEAGUE_SIZE = 20
+TOP_N = 4
+RELEGATED = 3
+
+
+@dataclass
+class SeasonState:
+    season: int
+    teams: List[str]
+    points: np.ndarray      # (T,) current points
+    goal_diff: np.ndarray   # (T,)
+    played: np.ndarray      # (T,)
+    remaining: List[Tuple[str, str]]
+
+
+def league_clubs(fixtures: Iterable[Tuple], season: int) -> List[str]:
+    """
+    The LEAGUE_SIZE clubs of `season`. Once every club has played that is just
+    the clubs in its results; before then it is the previous season's clubs
+    (which must be complete in `fixtures`) minus its bottom RELEGATED, plus the
+    promoted clubs seen so far. Raises ValueError if that doesn't add up.
+    """
+    rows = list(fixtures)
+    played = {t for r in rows if season_of(r[0]) == season for t in r[1:3]}
+    if len(played) >= LEAGUE_SIZE:
+        return sorted(played)
+
+    previous = [r for r in rows if season_of(r[0]) == season - 1]
+    clubs = played
+    last = sorted({t for r in previous for t in r[1:3]})
+    if len(last) == LEAGUE_SIZE:
+        final = season_state(previous, season - 1, teams=last)
+        if not final.remaining:
+            order = sorted(range(len(last)), key=lambda i: (-final.points[i], -final.goal_diff[i], last[i]))
+            clubs = played | {last[i] for i in order[:LEAGUE_SIZE - RELEGATED]}
+    if len(clubs) != LEAGUE_SIZE:
+        raise ValueError(f"Season {season}: only {len(played)} of {LEAGUE_SIZE} clubs have played "
+                         f"and the rest can't be inferred from season {season - 1}; pass the clubs as teams")
+    return sorted(clubs)
+
+
+def season_state(fixtures: Iterable[Tuple], season: Optional[int] = None,
+                 teams: Optional[Sequence[str]] = None) -> SeasonState:
+    """
+    Table and remaining fixtures for `season` (default: the latest one in
+    `fixtures`). `teams` defaults to league_clubs(fixtures, season).
+    """
+    rows = list(fixtures)
+    if season is None:
+        if not rows:
+            raise ValueError("No fixtures to simulate from")
+        season = max(season_of(r[0]) for r in rows)
+    names = sorted(teams) if teams is not None else league_clubs(rows, season)
+    rows = [r for r in rows if season_of(r[0]) == season]
+
+    if len(names) < 2:
+        raise ValueError(f"Season {season}: need at least two teams")
+    idx = {name: i for i, name in enumerate(names)}
+    points = np.zeros(len(names), dtype=np.int64)
+    goal_diff = np.zeros(len(names), dtype=np.int64)
+    played = np.zeros(len(names), dtype=np.int64)
+    done = set()
+    for _, home, away, hg, ag, *_ in rows:
+        if home not in idx or away not in idx:
+            continue
+        h, a = idx[home], idx[away]
+        done.add((home, away))
+        played[[h, a]] += 1
+        goal_diff[h] += hg - ag
+        goal_diff[a] += ag - hg
+        if hg > ag:
+            points[h] += 3
+        elif ag > hg:
+            points[a] += 3
+        else:
+            points[[h, a]] += 1
+
+    remaining = [(h, a) for h in names for a in names if h != a and (h, a) not in done]
+    return SeasonState(season, names, points, goal_diff, played, remaining)
+
+
+# ---- Match probabilities (one batch for every remaining fixture) ----
+def elo_probabilities(remaining: Sequence[Tuple[str, str]], ratings: Dict[str, float],
+                      home_adv: float, base_rating: float = 1500.0, draw_peak: float = DRAW_PEAK) -> np.ndarray:
+    """
+    (m, 3) [home, draw, away] from the SoccerElo expectation E. The draw share is
+    draw_peak * 2 * min(E, 1 - E), and the rest is split so that
+    P(home) + P(draw) / 2 == E, matching Elo's scoring of a draw as half a win.
+    """
+    home = np.array([ratings.get(h, base_rating) for h, _ in remaining], dtype=np.float64)
+    away = np.array([ratings.get(a, base_rating) for _, a in remaining], dtype=np.float64)
+    expected = 1.0 / (1.0 + 10 ** (-((home + home_adv) - away) / 400.0))
+    draw = draw_peak * 2 * np.minimum(expected, 1 - expected)
+    return np.column_stack([expected - draw / 2, draw, 1 - expected - draw / 2])
+
+
+def fixture_features(remaining: Sequence[Tuple[str, str]], stats: Dict[str, Dict]) -> np.ndarray:
+    """(m, 6) model features from team_stats-shaped rows {form_goals, win_rate, elo_rating}."""
+    missing = sorted({t for pair in remaining for t in pair if t not in stats})
+    if missing:
+        raise ValueError(f"No stats found for team: {', '.join(missing)}")
+    return np.array([
+        [stats[h]["form_goals"], stats[a]["form_goals"], stats[h]["win_rate"], stats[a]["win_rate"],
+         stats[h]["elo_rating"], stats[a]["elo_rating"]]
+        for h, a in remaining
+    ], dtype=np.float32)
+
+
+def model_probabilities(remaining: Sequence[Tuple[str, str]], stats: Dict[str, Dict], predictor) -> np.ndarray:
+    """(m, 3) from the classifier: one predict_proba call for every remaining fixture."""
+    if not remaining:
+        return np.zeros((0, 3))
+    return np.asarray(predictor.predict_proba(fixture_features(remaining, stats)), dtype=np.float64)
+
+
+# ---- Simulation ----
+def _simulate_chunk(args) -> Tuple[np.ndarray, np.ndarray]:
+    """Simulate `n` seasons; returns (position counts (T, T), summed final points (T,))."""
+    cum, home_idx, away_idx, points, goal_diff, n, seed = args
+    rng = np.random.default_rng(seed)
+    n_teams = len(points)
+    m = len(home_idx)
+
+    final = np.broadcast_to(points.astype(np.float32), (n, n_teams)).copy()
+    if m:
+        home_onehot = np.zeros((m, n_teams), dtype=np.float32)
+        away_onehot = np.zeros((m, n_teams), dtype=np.float32)
+        home_onehot[np.arange(m), home_idx] = 1
+        away_onehot[np.arange(m), away_idx] = 1
+
+        u = rng.random((n, m), dtype=np.float32)
+        home_win = u < cum[:, 0]
+        away_win = u >= cum[:, 1]
+        draw = ~(home_win | away_win)
+        final += (3 * home_win + draw).astype(np.float32) @ home_onehot
+        final += (3 * away_win + draw).astype(np.float32) @ away_onehot
+
+    # points first, then goal difference, then a coin flip
+    key = final.astype(np.float64) * 1000 + goal_diff + rng.random((n, n_teams))
+    order = np.argsort(-key, axis=1)
+    positions = np.empty_like(order)
+    positions[np.arange(n)[:, None], order] = np.arange(n_teams)
+    counts = np.bincount((np.arange(n_teams) * n_teams + positions).ravel(),
+                         minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+    return counts, final.sum(axis=0, dtype=np.float64)
+
+
+def simulate(state: SeasonState, probabilities: np.ndarray, n_sims: int = 100_000,
+             workers: Optional[int] = 1, seed: Optional[int] = None, chunk: int = CHUNK_SEASONS) -> Dict:
+    """Run `n_sims` seasons; returns the summary (see summarize)."""
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    if probabilities.shape != (len(state.remaining), 3):
+        raise ValueError(f"Expected ({len(state.remaining)}, 3) probabilities, got {probabilities.shape}")
+    probabilities = probabilities / probabilities.sum(axis=1, keepdims=True)
+    cum = np.cumsum(probabilities, axis=1)[:, :2].astype(np.float32)
+
+    idx = {name: i for i, name in enumerate(state.teams)}
+    home_idx = np.array([idx[h] for h, _ in state.remaining], dtype=np.int64)
+    away_idx = np.array([idx[a] for _, a in state.remaining], dtype=np.int64)
+
+    sizes = [chunk] * (n_sims // chunk) + ([n_sims % chunk] if n_sims % chunk else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(cum, home_idx, away_idx, state.points, state.goal_diff, n, s) for n, s in zip(sizes, seeds)]
+
+    t0 = time.perf_counter()
+    if workers == 1 or len(tasks) == 1:
+        parts = [_simulate_chunk(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_chunk, tasks))
+    counts = sum(p[0] for p in parts)
+    points_sum = sum(p[1] for p in parts)
+    return summarize(state, counts, points_sum, n_sims, time.perf_counter() - t0)
+
+
+def summarize(state: SeasonState, counts: np.ndarray, points_sum: np.ndarray, n_sims: int,
+              elapsed: float) -> Dict:
+    n_teams = len(state.teams)
+    share = counts / n_sims
+    relegated = min(RELEGATED, n_teams - 1)
+    table = []
+    for i, team in enumerate(state.teams):
+        table.append({
+            "team": team,
+            "played": int(state.played[i]),
+            "points": int(state.points[i]),
+            "goal_diff": int(state.goal_diff[i]),
+            "expected_points": round(float(points_sum[i] / n_sims), 2),
+            "expected_position": round(float((share[i] * np.arange(1, n_teams + 1)).sum()), 2),
+            "title": round(float(share[i, 0]), 4),
+            "top4": round(float(share[i, :TOP_N].sum()), 4),
+            "relegation": round(float(share[i, n_teams - relegated:].sum()), 4),
+            "positions": [round(float(p), 4) for p in share[i]],
+        })
+    table.sort(key=lambda r: (-r["expected_points"], r["expected_position"]))
+    return {
+        "season": state.season,
+        "simulations": n_sims,
+        "remaining_fixtures": len(state.remaining),
+        "elapsed_s": round(elapsed, 3),
+        "table": table,
+    }
+
+
+# ---- Inputs for the CLI ----
+def stats_from_fixtures(fixtures: Sequence[Tuple]) -> Dict[str, Dict]:
+    """team_stats-shaped rows from a full replay of `fixtures` (offline mode)."""
+    from scripts.elo_replay import EloReplay
+    from scripts.feature_store import FeatureStore
+    from scripts.run_elo_updates import load_elo_config
+
+    cfg = load_elo_config()
+    replay = EloReplay(cfg)
+    replay.replay(fixtures)
+    store = FeatureStore()
+    for _, home, away, hg, ag, *_ in fixtures:
+        store.update(home, away, hg, ag)
+    return {row["team_name"]: row for row in store.snapshot(replay.as_dict(), base_rating=cfg.base_rating)}
+
+
+def load_predictor():
+    from api.inference import Predictor
+    from api.model_loader import load_model
+    model, _ = load_model(FEATURE_NAMES)
+    return Predictor(model)
+
+
+def print_summary(summary: Dict) -> None:
+    print(f"🏆 Season {summary['season']}/{(summary['season'] + 1) % 100:02d}: "
+          f"{summary['simulations']:,} simulations of {summary['remaining_fixtures']} remaining fixtures "
+          f"in {summary['elapsed_s']:.2f}s")
+    print(f"{'Team':<26}{'Pts':>5}{'xPts':>8}{'Title':>8}{'Top 4':>8}{'Rel':>8}")
+    for r in summary["table"]:
+        print(f"{r['team']:<26}{r['points']:>5}{r['expected_points']:>8.1f}"
+              f"{r['title']:>8.1%}{r['top4']:>8.1%}{r['relegation']:>8.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of the rest of the season.")
+    parser.add_argument("--season", type=int, help="season start year (default: latest in the data)")
+    parser.add_argument("--sims", type=int, default=100_000)
+    parser.add_argument("--source", choices=("model", "elo"), default="model")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--fixtures-csv", help="offline fixtures dump instead of the database")
+    parser.add_argument("--json", help="write the summary as JSON")
+    args = parser.parse_args()
+
+    from scripts.run_elo_updates import load_elo_config
+    cfg = load_elo_config()
+
+    if args.fixtures_csv:
+        from scripts.build_training_set import read_fixtures_csv
+        fixtures = list(read_fixtures_csv(args.fixtures_csv))
+        state = season_state(fixtures, args.season)
+        stats = stats_from_fixtures(fixtures)
+    else:
+        from db.db_utils import get_season_fixtures, get_team_stats_rows
+        season, fixtures = get_season_fixtures(args.season)
+        _, previous = get_season_fixtures(season - 1)  # its final table fills in clubs yet to play
+        state = season_state(previous + fixtures, season)
+        stats = {row["team_name"]: row for row in get_team_stats_rows()}
+
+    if args.source == "model":
+        probabilities = model_probabilities(state.remaining, stats, load_predictor())
+    else:
+        ratings = {team: row["elo_rating"] for team, row in stats.items()}
+        probabilities = elo_probabilities(state.remaining, ratings, cfg.home_adv, cfg.base_rating)
+
+    summary = simulate(state, probabilities, args.sims, args.workers, args.seed)
+    summary["source"] = args.source
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
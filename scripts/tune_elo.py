@@ -0,0 +1,105 @@
+# scripts/tune_elo.py
+"""
+Grid search over EloConfig (k, home_adv) using the vectorized replay engine.
+
+Every candidate is scored by the mean log-loss of the Elo home expectation
+against actual results over the historical fixtures (after a burn-in period in
+which ratings are still settling). Configs are evaluated as one array dimension
+(scripts.elo_replay.replay_configs); large grids are split into chunks that run
+on a process pool.
+
+base_rating is not searched: all teams start at it and updates are zero-sum,
+so rating differences, and therefore predictions, don't depend on it.
+
+The best config is written as JSON (default models/elo_config.json), which
+run_elo_updates.load_elo_config() picks up.
+
+Run from project root:
+  python -m scripts.tune_elo [--fixtures-csv dump.csv] [--k 8:48:2] [--home-adv 0:120:5]
+                             [--burn-in 380] [--out models/elo_config.json]
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from scripts.elo_replay import replay_configs
+from scripts.run_elo_updates import ELO_CONFIG_PATH, EloConfig
+
+CONFIGS_PER_CHUNK = 512
+
+
+def parse_range(spec: str) -> np.ndarray:
+    """'start:stop:step' (stop inclusive) or a comma list."""
+    if ":" in spec:
+        start, stop, step = (float(v) for v in spec.split(":"))
+        return np.arange(start, stop + step / 2, step)
+    return np.array([float(v) for v in spec.split(",")])
+
+
+def grid_search(
+    fixtures: List[Tuple],
+    k_values: np.ndarray,
+    home_adv_values: np.ndarray,
+    burn_in: int = 380,
+    workers: Optional[int] = None,
+) -> Tuple[EloConfig, float, np.ndarray]:
+    """Returns (best config, its log-loss, loss grid shaped (len(k), len(home_adv)))."""
+    kk, hh = np.meshgrid(k_values, home_adv_values, indexing="ij")
+    k_flat, h_flat = kk.ravel(), hh.ravel()
+    chunks = [(k_flat[i:i + CONFIGS_PER_CHUNK], h_flat[i:i + CONFIGS_PER_CHUNK])
+              for i in range(0, len(k_flat), CONFIGS_PER_CHUNK)]
+
+    if len(chunks) == 1 or workers == 1:
+        losses = [replay_configs(fixtures, k, h, burn_in=burn_in) for k, h in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = [pool.submit(replay_configs, fixtures, k, h, 1500.0, burn_in) for k, h in chunks]
+            losses = [f.result() for f in futures]
+
+    loss = np.concatenate(losses)
+    best = int(np.argmin(loss))
+    cfg = EloConfig(k=float(k_flat[best]), home_adv=float(h_flat[best]))
+    return cfg, float(loss[best]), loss.reshape(kk.shape)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid-search Elo k / home advantage.")
+    parser.add_argument("--fixtures-csv", help="local fixtures dump instead of the DB")
+    parser.add_argument("--k", default="4:60:1", help="k values, start:stop:step or a,b,c")
+    parser.add_argument("--home-adv", default="0:150:2", help="home advantage values")
+    parser.add_argument("--burn-in", type=int, default=380, help="fixtures excluded from scoring")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=ELO_CONFIG_PATH, help="where to write the best config")
+    args = parser.parse_args()
+
+    if args.fixtures_csv:
+        from scripts.build_training_set import read_fixtures_csv
+        fixtures = list(read_fixtures_csv(args.fixtures_csv))
+    else:
+        from db.db_utils import get_all_fixtures
+        fixtures = get_all_fixtures()
+
+    k_values, h_values = parse_range(args.k), parse_range(args.home_adv)
+    t0 = time.perf_counter()
+    cfg, loss, grid = grid_search(fixtures, k_values, h_values, args.burn_in, args.workers)
+    elapsed = time.perf_counter() - t0
+
+    default_loss = float(replay_configs(fixtures, [EloConfig().k], [EloConfig().home_adv],
+                                        burn_in=args.burn_in)[0])
+    print(f"✅ Evaluated {grid.size} configs over {len(fixtures)} fixtures in {elapsed:.1f}s.")
+    print(f"  default k={EloConfig().k:g} home_adv={EloConfig().home_adv:g}: log-loss {default_loss:.5f}")
+    print(f"  best    k={cfg.k:g} home_adv={cfg.home_adv:g}: log-loss {loss:.5f}")
+
+    with open(args.out, "w") as f:
+        json.dump({**asdict(cfg), "log_loss": round(loss, 6), "fixtures": len(fixtures)}, f, indent=2)
+    print(f"✅ Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
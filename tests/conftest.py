@@ -0,0 +1,25 @@
+# tests/conftest.py
+import os
+import sys
+
+# Make the project packages (api, db, models, scripts) importable under plain `pytest`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    """In-memory SQLite database wired into db_utils in place of Postgres."""
+    from db import db_utils
+    from models import Base
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False},
+                           poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(db_utils, "SessionLocal", factory)
+    return factory
@@ -0,0 +1,119 @@
+# tests/test_async_app.py
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("quart")
+pytest.importorskip("asyncpg")
+
+from api import app as sync_app  # noqa: E402
+from api import async_app  # noqa: E402
+from api.micro_batcher import MicroBatcher  # noqa: E402
+
+STATS = {
+    'Arsenal': {'form_goals': 1.5, 'win_rate': 0.6, 'elo_rating': 1450},
+    'Chelsea': {'form_goals': 1.2, 'win_rate': 0.4, 'elo_rating': 1380},
+}
+
+
+def test_micro_batcher_coalesces_concurrent_rows():
+    calls = []
+
+    def predict_proba(X):
+        calls.append(len(X))
+        return np.column_stack([X[:, 0], X[:, 0] * 0, 1 - X[:, 0]])
+
+    async def run():
+        batcher = MicroBatcher(predict_proba, window=0.01, max_batch=8)
+        results = await asyncio.gather(*(batcher.predict([i / 20] * 6) for i in range(20)))
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+    assert calls == [8, 8, 4]
+    assert [float(r[0]) for r in results] == pytest.approx([i / 20 for i in range(20)])
+
+
+def test_async_predict_match_matches_sync_contract(monkeypatch):
+    async def fake_get_many(names):
+        return {n: STATS[n] for n in names if n in STATS}
+
+    monkeypatch.setattr(async_app.team_stats, 'get_many', fake_get_many)
+    monkeypatch.setattr(sync_app, 'get_team_stats_many',
+                        lambda names: {n: STATS[n] for n in names if n in STATS})
+    payload = {'home_team': 'Arsenal', 'away_team': 'Chelsea'}
+    expected = sync_app.app.test_client().post('/predict_match', json=payload).get_json()
+
+    async def run():
+        client = async_app.app.test_client()
+        responses = await asyncio.gather(*(client.post('/predict_match', json=payload) for _ in range(5)))
+        unknown = await client.post('/predict_match', json={'home_team': 'Arsenal', 'away_team': 'Nowhere'})
+        bad = await client.post('/predict', json={'home_form_goals': 1})
+        return [await r.get_json() for r in responses], unknown.status_code, await unknown.get_json(), bad.status_code
+
+    bodies, unknown_status, unknown_body, bad_status = asyncio.run(run())
+    assert all(body == expected for body in bodies)
+    assert unknown_status == 400 and unknown_body == {'error': 'No stats found for team: Nowhere'}
+    assert bad_status == 400
+
+
+def test_micro_batcher_isolates_a_failing_row():
+    def predict_proba(X):
+        if np.isnan(X).any():
+            raise ValueError("bad row")
+        return np.column_stack([X[:, 0], X[:, 0] * 0, 1 - X[:, 0]])
+
+    async def run():
+        batcher = MicroBatcher(predict_proba, window=0.01, max_batch=8)
+        rows = [[0.1] * 6, [float('nan')] * 6, [0.3] * 6]
+        results = await asyncio.gather(*(batcher.predict(r) for r in rows), return_exceptions=True)
+        await batcher.close()
+        return results
+
+    good, bad, other = asyncio.run(run())
+    assert float(good[0]) == pytest.approx(0.1)
+    assert float(other[0]) == pytest.approx(0.3)
+    assert isinstance(bad, ValueError)
+
+
+def test_micro_batcher_keeps_scoring_after_a_failing_row_is_cancelled():
+    async def run():
+        loop = asyncio.get_running_loop()
+        tasks = []
+
+        def predict_proba(X):
+            if np.isnan(X).any():
+                if len(X) == 1:
+                    # The client behind the bad row disconnects while it is rescored alone
+                    loop.call_soon_threadsafe(tasks[0].cancel)
+                    time.sleep(0.05)
+                raise ValueError("bad row")
+            return np.column_stack([X[:, 0], X[:, 0] * 0, 1 - X[:, 0]])
+
+        batcher = MicroBatcher(predict_proba, window=0.01, max_batch=8)
+        tasks.extend(asyncio.ensure_future(batcher.predict(r)) for r in ([float('nan')] * 6, [0.3] * 6))
+        results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), timeout=5)
+        await batcher.close()
+        return results
+
+    cancelled, good = asyncio.run(run())
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert float(good[0]) == pytest.approx(0.3)
+
+
+def test_async_predict_rejects_a_bad_row_without_failing_its_batch():
+    body = {'home_form_goals': 1.5, 'away_form_goals': 1.2, 'home_win_rate': 0.6,
+            'away_win_rate': 0.4, 'elo_home': 1450, 'elo_away': 1380}
+
+    async def run():
+        client = async_app.app.test_client()
+        responses = await asyncio.gather(
+            client.post('/predict', json=body),
+            client.post('/predict', json={**body, 'elo_home': 'abc'}),
+            client.post('/predict', json=body),
+        )
+        return [r.status_code for r in responses]
+
+    assert asyncio.run(run()) == [200, 400, 200]
@@ -0,0 +1,58 @@
+# tests/test_backfill.py
+import threading
+import time
+from datetime import date
+
+from db import db_utils
+from scripts import backfill as backfill_module
+from scripts.fetch_data import RateLimiter
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_limiter_blocks_when_budget_spent():
+    limiter = RateLimiter(per_minute=2, window=0.2)
+    t0 = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - t0 >= 0.15
+
+
+def test_limiter_follows_api_headers_and_429():
+    limiter = RateLimiter(per_minute=10)
+    limiter.observe(FakeResponse(headers={"X-Requests-Available-Minute": "3",
+                                          "X-RequestCounter-Reset": "30"}))
+    assert limiter.available == 3
+
+    limiter.observe(FakeResponse(429, headers={"Retry-After": "0.1"}))
+    assert limiter.available == 0
+    t0 = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - t0 >= 0.05
+
+
+def test_backfill_streams_seasons_and_resumes(session_factory, monkeypatch):
+    fetched = []
+    lock = threading.Lock()
+
+    def fake_fetch(season, retry, limiter):
+        with lock:
+            fetched.append(season)
+        return [{"match_date": date(season + 1, 5, 19), "home_team": "Arsenal",
+                 "away_team": "Everton", "home_goals": 2, "away_goals": 1,
+                 "result": "H", "processed": False}]
+
+    monkeypatch.setattr(backfill_module, "fetch_finished_epl_matches", fake_fetch)
+
+    results = backfill_module.backfill([2019, 2020, 2021], workers=3)
+    assert results == {2019: (1, 0), 2020: (1, 0), 2021: (1, 0)}
+    assert db_utils.get_sync_state("PL:2020")["watermark"] == date(2021, 5, 19)
+
+    fetched.clear()
+    backfill_module.backfill([2019, 2020, 2021, 2022], workers=3)
+    assert fetched == [2022]
+    assert len(db_utils.get_all_fixtures()) == 4
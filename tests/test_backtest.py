@@ -0,0 +1,46 @@
+# tests/test_backtest.py
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from scripts import backtest
+
+
+def synthetic_history(n_seasons=4, n_teams=8, seed=1):
+    rng = random.Random(seed)
+    strength = {f"T{i}": rng.gauss(0, 1) for i in range(n_teams)}
+    teams = list(strength)
+    rows = []
+    for s in range(n_seasons):
+        day = date(2010 + s, 8, 10)
+        for home in teams:
+            for away in teams:
+                if home == away:
+                    continue
+                edge = strength[home] - strength[away] + 0.3
+                hg = max(0, int(rng.gauss(1.4 + 0.5 * edge, 1)))
+                ag = max(0, int(rng.gauss(1.1 - 0.5 * edge, 1)))
+                rows.append((day, home, away, hg, ag, "H" if hg > ag else "A" if ag > hg else "D"))
+                day += timedelta(days=3)
+    return rows
+
+
+def test_metrics_on_known_values():
+    y = np.array([0, 2])
+    proba = np.array([[0.5, 0.25, 0.25], [0.2, 0.2, 0.6]])
+    assert backtest.log_loss(y, proba) == pytest.approx(-(np.log(0.5) + np.log(0.6)) / 2)
+    assert backtest.brier_score(y, proba) == pytest.approx((0.375 + 0.24) / 2)
+    perfect = np.eye(3)[y]
+    assert backtest.calibration(y, perfect)["ece"] == 0.0
+
+
+def test_walk_forward_trains_only_on_past_seasons():
+    results = backtest.walk_forward(synthetic_history(), min_train_seasons=2, workers=2,
+                                    params={"n_estimators": 20})
+    assert [r["season"] for r in results] == [2012, 2013]
+    assert results[0]["train_rows"] == 2 * 56 and results[1]["train_rows"] == 3 * 56
+    for r in results:
+        assert r["test_rows"] == 56
+        assert 0 < r["log_loss"] < 2 and 0 <= r["brier"] <= 2
@@ -0,0 +1,54 @@
+# tests/test_benchmarks.py
+import requests
+
+from benchmarks import suite
+from benchmarks.stub_football_data import StubFootballData
+from benchmarks.synthetic import football_data_payload, synthetic_match_results
+from scripts.fetch_data import parse_matches
+
+
+def test_synthetic_match_results_are_unique_and_ordered():
+    rows = synthetic_match_results(1000, seed=3)
+    keys = [(r["match_date"], r["home_team"], r["away_team"]) for r in rows]
+    assert len(rows) == 1000
+    assert len(set(keys)) == 1000
+    assert keys == sorted(keys)
+    assert synthetic_match_results(1000, seed=3) == rows
+
+
+def test_stub_serves_a_payload_parse_matches_accepts():
+    rows = synthetic_match_results(50)
+    with StubFootballData(football_data_payload(rows)) as stub:
+        resp = requests.get(f"{stub.base_url}/competitions/PL/matches", timeout=5)
+    assert resp.headers["X-Requests-Available-Minute"] == "9"
+    parsed = parse_matches(resp.json())
+    assert [(r["match_date"], r["home_goals"], r["away_goals"]) for r in parsed] == \
+        [(r["match_date"], r["home_goals"], r["away_goals"]) for r in rows]
+
+
+def test_offline_pipeline_benchmarks_run_end_to_end():
+    report = suite.run_suite(only=["elo_updates", "insert_matches", "sync_matches"],
+                             n_fixtures=200, n_rows=300)
+    results = report["results"]
+    assert results["elo_updates"]["unprocessed_after"] == 0
+    assert results["insert_matches"]["inserted"] == 300
+    assert results["insert_matches"]["duplicates_skipped"] == 300
+    assert results["sync_matches"]["inserted"] == 300
+
+
+def test_compare_flags_regressions_in_the_right_direction():
+    baseline = {"results": {"predict": {"rps": 100.0, "p99_ms": 10.0, "requests": 500}}}
+    current = {"results": {"predict": {"rps": 80.0, "p99_ms": 8.0, "requests": 900}}}
+    rows = {r["metric"]: r for r in suite.compare(current, baseline, tolerance=0.1)}
+    assert set(rows) == {"predict.rps", "predict.p99_ms"}  # counts aren't compared
+    assert rows["predict.rps"]["status"] == "regressed"
+    assert rows["predict.p99_ms"]["status"] == "improved"
+    assert round(rows["predict.rps"]["change_pct"]) == -20
+
+
+def test_main_exits_nonzero_on_regression(tmp_path, monkeypatch):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text('{"results": {"elo_updates": {"seconds": 0.000001}}}')
+    monkeypatch.setattr(suite, "run_suite", lambda *a: {"meta": {}, "results": {"elo_updates": {"seconds": 1.0}}})
+    assert suite.main(["--baseline", str(baseline)]) == 0
+    assert suite.main(["--baseline", str(baseline), "--fail-on-regression"]) == 1
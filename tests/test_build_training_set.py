@@ -0,0 +1,62 @@
+# tests/test_build_training_set.py
+import csv
+from datetime import date, timedelta
+
+import numpy as np
+
+from db import db_utils
+from scripts.build_training_set import (
+    build,
+    load_training_set,
+    point_in_time_chunks,
+    read_fixtures_csv,
+)
+from scripts.feature_store import FeatureStore
+from scripts.run_elo_updates import EloConfig, SoccerElo
+
+FIXTURES = [
+    (date(2023, 8, 12) + timedelta(days=7 * i), home, away, hg, ag,
+     "H" if hg > ag else "A" if ag > hg else "D")
+    for i, (home, away, hg, ag) in enumerate([
+        ("Arsenal", "Chelsea", 2, 1), ("Chelsea", "Everton", 0, 0),
+        ("Everton", "Arsenal", 1, 3), ("Arsenal", "Everton", 1, 1),
+        ("Chelsea", "Arsenal", 2, 0), ("Everton", "Chelsea", 4, 2),
+    ])
+]
+
+
+def test_features_are_taken_before_kickoff():
+    chunk = next(point_in_time_chunks(FIXTURES))
+    elo, store = SoccerElo(EloConfig()), FeatureStore()
+    for i, (_, home, away, hg, ag, _) in enumerate(FIXTURES):
+        form = store.features(home, away)
+        expected = [form["home_form_goals"], form["away_form_goals"], form["home_win_rate"],
+                    form["away_win_rate"], elo.get(home), elo.get(away)]
+        np.testing.assert_allclose(chunk["X"][i], expected, rtol=1e-6)
+        elo.update_pair(home, away, hg, ag)
+        store.update(home, away, hg, ag)
+    assert chunk["y"].tolist() == [0, 1, 2, 1, 0, 0]
+    # First fixture: nobody has played yet
+    assert chunk["X"][0, 4] == chunk["X"][0, 5] == 1500.0
+
+
+def test_chunking_does_not_change_rows(tmp_path):
+    paths = build(FIXTURES, str(tmp_path), chunk_rows=4)
+    assert len(paths) == 2
+    merged = load_training_set(str(tmp_path))
+    single = next(point_in_time_chunks(FIXTURES))
+    np.testing.assert_array_equal(merged["X"], single["X"])
+    assert merged["home_team"].tolist() == [f[1] for f in FIXTURES]
+
+
+def test_db_stream_and_csv_dump_agree(session_factory, tmp_path):
+    db_utils.bulk_insert_fixtures([
+        dict(match_date=d, home_team=h, away_team=a, home_goals=hg, away_goals=ag, result=r, processed=False)
+        for d, h, a, hg, ag, r in FIXTURES
+    ])
+    dump = tmp_path / "fixtures.csv"
+    with open(dump, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["match_date", "home_team", "away_team", "home_goals", "away_goals", "result"])
+        writer.writerows(FIXTURES)
+    assert list(db_utils.iter_fixtures(chunk_size=2)) == list(read_fixtures_csv(str(dump)))
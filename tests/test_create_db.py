@@ -0,0 +1,48 @@
+# tests/test_create_db.py
+from sqlalchemy import create_engine, inspect, text
+
+from models import Base
+from scripts.create_db import add_missing_columns
+
+
+def test_old_team_stats_table_gains_the_feature_store_columns():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE team_stats (team_name VARCHAR(128) PRIMARY KEY, "
+                          "form_goals FLOAT NOT NULL, win_rate FLOAT NOT NULL, elo_rating FLOAT NOT NULL)"))
+        conn.execute(text("INSERT INTO team_stats VALUES ('Arsenal', 1.5, 0.6, 1450)"))
+
+    added = add_missing_columns(engine)
+    Base.metadata.create_all(bind=engine)
+
+    assert added == ["team_stats.matches_played", "team_stats.recent_goals",
+                     "team_stats.recent_wins", "team_stats.updated_at"]
+    columns = {c["name"] for c in inspect(engine).get_columns("team_stats")}
+    assert {"matches_played", "recent_goals", "recent_wins", "updated_at"} <= columns
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT matches_played, recent_goals FROM team_stats")).one() == (0, "[]")
+    assert add_missing_columns(engine) == []
+
+
+def test_missing_index_is_created_on_an_existing_table():
+    from scripts.create_db import add_missing_indexes
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_elo_ratings_type_date"))
+    assert add_missing_indexes(engine) == ["ix_elo_ratings_type_date"]
+    assert add_missing_indexes(engine) == []
+
+
+def test_teams_version_trigger_is_added_to_an_existing_database():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE teams (id INTEGER PRIMARY KEY, name VARCHAR(128) UNIQUE NOT NULL, "
+                          "elo_rating FLOAT NOT NULL, last_updated DATETIME)"))
+    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=engine)  # idempotent
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO teams (name, elo_rating) VALUES ('Arsenal', 1500)"))
+        conn.execute(text("UPDATE teams SET elo_rating = 1510"))
+        assert conn.execute(text("SELECT version FROM table_versions WHERE table_name = 'teams'")).scalar() == 2
@@ -0,0 +1,144 @@
+# tests/test_db_bulk.py
+"""Bulk write paths in db_utils, exercised against an in-memory SQLite database."""
+import sqlite3
+from datetime import date
+
+import pytest
+from sqlalchemy import event, text
+
+from db import db_utils
+from models import Fixture, Team
+
+
+def add_fixtures(factory, rows):
+    db = factory()
+    for mdate, home, away, hg, ag in rows:
+        result = "H" if hg > ag else "A" if ag > hg else "D"
+        db.add(Fixture(match_date=mdate, home_team=home, away_team=away,
+                       home_goals=hg, away_goals=ag, result=result, processed=False))
+    db.commit()
+    db.close()
+
+
+def test_apply_elo_updates_upserts_teams_and_marks_fixtures(session_factory):
+    db = session_factory()
+    db.add(Team(name="Arsenal", elo_rating=1500.0))
+    db.commit()
+    db.close()
+    add_fixtures(session_factory, [
+        (date(2024, 8, 17), "Arsenal", "Wolves", 2, 0),
+        (date(2024, 8, 24), "Aston Villa", "Arsenal", 0, 2),
+    ])
+
+    db_utils.apply_elo_updates(
+        {"Arsenal": 1531.2, "Wolves": 1480.0},
+        [(date(2024, 8, 17), "Arsenal", "Wolves")],
+    )
+
+    assert db_utils.get_latest_elos() == {"Arsenal": 1531.2, "Wolves": 1480.0}
+    unprocessed = db_utils.get_unprocessed_fixtures()
+    assert [(r[1], r[2]) for r in unprocessed] == [("Aston Villa", "Arsenal")]
+
+
+def test_run_elo_updates_main_writes_in_bulk(session_factory):
+    from scripts import run_elo_updates
+
+    add_fixtures(session_factory, [
+        (date(2024, 8, 17), "Arsenal", "Wolves", 2, 0),
+        (date(2024, 8, 24), "Wolves", "Chelsea", 1, 1),
+    ])
+    run_elo_updates.main()
+
+    elo = run_elo_updates.SoccerElo(run_elo_updates.EloConfig())
+    elo.update_pair("Arsenal", "Wolves", 2, 0)
+    elo.update_pair("Wolves", "Chelsea", 1, 1)
+    assert db_utils.get_latest_elos() == pytest.approx(elo.ratings)
+    assert db_utils.get_unprocessed_fixtures() == []
+
+    # the next run seeds from the stored ratings (teams cache) and carries on
+    add_fixtures(session_factory, [(date(2024, 8, 31), "Chelsea", "Arsenal", 0, 1)])
+    run_elo_updates.main()
+    elo.update_pair("Chelsea", "Arsenal", 0, 1)
+    assert db_utils.get_latest_elos() == pytest.approx(elo.ratings)
+
+
+def test_mark_fixtures_processed_by_keys(session_factory):
+    add_fixtures(session_factory, [
+        (date(2024, 8, 17), "Arsenal", "Wolves", 2, 0),
+        (date(2024, 8, 17), "Everton", "Brighton", 0, 3),
+    ])
+    db_utils.mark_fixtures_processed_by_keys([(date(2024, 8, 17), "Everton", "Brighton")])
+    assert [r[1] for r in db_utils.get_unprocessed_fixtures()] == ["Arsenal"]
+
+
+def test_bulk_insert_fixtures_counts_duplicates_as_skipped(session_factory):
+    rows = [
+        {"match_date": date(2024, 8, 17), "home_team": "Arsenal", "away_team": "Wolves",
+         "home_goals": 2, "away_goals": 0, "result": "H", "processed": False},
+        {"match_date": date(2024, 8, 17), "home_team": "Everton", "away_team": "Brighton",
+         "home_goals": 0, "away_goals": 3, "result": "A", "processed": False},
+    ]
+    assert db_utils.bulk_insert_fixtures(rows) == (2, 0)
+
+    rows.append({"match_date": date(2024, 8, 24), "home_team": "Brighton", "away_team": "Man United",
+                 "home_goals": 2, "away_goals": 1, "result": "H", "processed": False})
+    assert db_utils.bulk_insert_fixtures(rows) == (1, 2)
+    assert len(db_utils.get_all_fixtures()) == 3
+
+
+def test_large_backlogs_are_written_in_pages(session_factory):
+    # 12k keys x 3 columns and 12k history rows x 5 columns are over SQLite's default
+    # 32766 bind parameters (pinned here; some builds raise the limit)
+    with session_factory.kw["bind"].connect() as conn:
+        conn.connection.driver_connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 32766)
+    start = date(1990, 1, 1).toordinal()
+    rows = [dict(match_date=date.fromordinal(start + i), home_team="Arsenal", away_team="Wolves",
+                 home_goals=1, away_goals=0, result="H", processed=False) for i in range(12000)]
+    db_utils.bulk_insert_fixtures(rows)
+    keys = [(r["match_date"], "Arsenal", "Wolves") for r in rows]
+    history = [{"team_name": "Arsenal", "rating_date": k[0], "rating_value": 1500.0 + i,
+                "rating_type": "elo", "source": "pipeline"} for i, k in enumerate(keys)]
+
+    db_utils.mark_fixtures_processed_by_keys(keys[:6000])
+    assert len(db_utils.get_unprocessed_fixtures()) == 6000
+    db_utils.apply_elo_updates({"Arsenal": 1600.0}, keys, history_rows=history)
+    assert db_utils.get_unprocessed_fixtures() == []
+    assert db_utils.get_elo_as_of("Arsenal", date.fromordinal(start + 11999))[1] == 13499.0
+
+
+def test_rating_reads_see_writes_from_other_sessions(session_factory):
+    db = session_factory()
+    db.add(Team(name="Arsenal", elo_rating=1600.0))
+    db.commit()
+    assert db_utils.get_elo("Arsenal") == 1600.0
+    assert db_utils.get_elo("Nowhere") == 1500.0
+
+    db.query(Team).filter_by(name="Arsenal").update({"elo_rating": 1650.0})
+    db.commit()
+    db.close()
+    assert db_utils.get_elo("Arsenal") == 1650.0
+    assert db_utils.get_latest_elos() == {"Arsenal": 1650.0}
+
+
+def test_teams_cache_reloads_only_after_a_write(session_factory):
+    db = session_factory()
+    db.add_all([Team(name="Arsenal", elo_rating=1600.0), Team(name="Wolves", elo_rating=1450.0)])
+    db.commit()
+    engine = db.get_bind()
+    loads = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_loads(conn, cursor, statement, *args):
+        if "FROM teams" in statement:
+            loads.append(statement)
+
+    assert db_utils.get_elos(["Arsenal", "Chelsea"]) == {"Arsenal": 1600.0, "Chelsea": 1500.0}
+    assert db_utils.get_elos(["Wolves"], default=1400.0) == {"Wolves": 1450.0}
+    assert len(loads) == 1  # the second read only checked the version
+
+    # a raw write outside db_utils, stamped with an older last_updated, still moves the version
+    db.execute(text("UPDATE teams SET elo_rating = 1620, last_updated = '2000-01-01' WHERE name = 'Arsenal'"))
+    db.commit()
+    db.close()
+    assert db_utils.get_elos(["Arsenal"]) == {"Arsenal": 1620.0}
+    assert len(loads) == 2
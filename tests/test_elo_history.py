@@ -0,0 +1,60 @@
+# tests/test_elo_history.py
+from datetime import date
+
+from api import app as app_module
+from db import db_utils
+
+
+def test_runner_writes_one_history_row_per_team_per_date(session_factory):
+    from scripts import run_elo_updates
+
+    db_utils.bulk_insert_fixtures([
+        dict(match_date=date(2024, 8, 17), home_team="Arsenal", away_team="Wolves",
+             home_goals=2, away_goals=0, result="H", processed=False),
+        dict(match_date=date(2024, 8, 24), home_team="Aston Villa", away_team="Arsenal",
+             home_goals=0, away_goals=2, result="A", processed=False),
+    ])
+    run_elo_updates.main()
+
+    first = db_utils.get_elo_as_of("Arsenal", date(2024, 8, 20))
+    latest = db_utils.get_elo_as_of("Arsenal", date(2025, 1, 1))
+    assert first[0] == date(2024, 8, 17)
+    assert latest == (date(2024, 8, 24), db_utils.get_latest_elos()["Arsenal"])
+    assert first[1] < latest[1]
+    assert db_utils.get_elo_as_of("Arsenal", date(2024, 8, 1)) is None
+
+
+def test_history_upsert_is_idempotent(session_factory):
+    row = {"team_name": "Arsenal", "rating_date": date(2024, 8, 17), "rating_value": 1510.0,
+           "rating_type": "elo", "source": "pipeline"}
+    db_utils.write_elo_history([row])
+    db_utils.write_elo_history([{**row, "rating_value": 1520.0}])
+    assert db_utils.get_elo_as_of("Arsenal", date(2024, 8, 17)) == (date(2024, 8, 17), 1520.0)
+
+
+def _history(team, rows, source="pipeline"):
+    return [{"team_name": team, "rating_date": d, "rating_value": v, "rating_type": "elo",
+             "source": source} for d, v in rows]
+
+
+def test_endpoints_read_the_history_table(session_factory):
+    db_utils.write_elo_history(
+        _history("Arsenal", [(date(2024, 8, 17), 1510.0), (date(2024, 9, 14), 1530.0)])
+        + _history("Chelsea", [(date(2024, 8, 18), 1490.0), (date(2024, 9, 15), 1540.0)])
+        + _history("Luton Town", [(date(2024, 5, 19), 1600.0)])  # relegated: no rating this season
+        + _history("Real Madrid", [(date(2024, 9, 1), 1900.0)], source="ClubElo")
+    )
+    client = app_module.app.test_client()
+
+    body = client.get("/elo/Arsenal?as_of=2024-09-01").get_json()
+    assert body == {"as_of": "2024-09-01", "team": "Arsenal", "rating_date": "2024-08-17", "elo_rating": 1510.0}
+    assert client.get("/elo/Arsenal?as_of=2024-08-01").status_code == 404
+    assert client.get("/elo/Nowhere FC").status_code == 404
+    assert client.get("/elo/Arsenal?as_of=yesterday").status_code == 400
+
+    board = client.get("/elo/leaderboard?as_of=2024-12-01").get_json()["leaderboard"]
+    assert [(r["rank"], r["team"], r["elo_rating"]) for r in board] == [(1, "Chelsea", 1540.0), (2, "Arsenal", 1530.0)]
+
+    # Before the new season's first matchday last season's clubs are still the table
+    board = client.get("/elo/leaderboard?as_of=2024-06-01").get_json()["leaderboard"]
+    assert [r["team"] for r in board] == ["Luton Town"]
@@ -0,0 +1,70 @@
+# tests/test_elo_ratings_fetch.py
+import json
+
+from scripts import elo_ratings_fetch
+from scripts.elo_ratings_fetch import _pages, iter_clubelo_records
+
+CSV = """Rank,Club,Country,Level,Elo,From,To
+1,Man City,ENG,1,2051.3,2024-05-20,2024-05-27
+None,Arsenal,ENG,1,1987.0,2024-05-20,2024-05-27
+2,Arsenal,ENG,1,None,2024-05-28,2024-06-01
+3,Arsenal,ENG,1,1990.5,2024-05-28,2024-06-01
+"""
+
+
+def test_parses_clubelo_csv_and_skips_missing_ratings(tmp_path):
+    path = tmp_path / "dump.csv"
+    path.write_text(CSV)
+    records = list(iter_clubelo_records(str(path)))
+    assert [(r["team_name"], r["rating_date"], r["rating_value"]) for r in records] == [
+        ("Man City", "2024-05-20", "2051.3"),
+        ("Arsenal", "2024-05-20", "1987.0"),
+        ("Arsenal", "2024-05-28", "1990.5"),
+    ]
+    assert records[1]["meta"] == {"Country": "ENG", "Level": "1", "To": "2024-05-27"}
+
+
+def test_pages_are_bounded_and_deduplicated():
+    records = [{"team_name": t, "rating_date": "2024-01-01", "rating_value": v}
+               for t, v in [("T0", 1), ("T0", 4), ("T1", 3), ("T9", 1)]]
+    pages = list(_pages(records, page_size=2))
+    assert all(len(p) <= 2 for p in pages)
+    # duplicate keys collapse within a page, last value wins
+    assert [(r[0], r[2]) for r in pages[0]] == [("T0", 4.0), ("T1", 3.0)]
+    assert [(r[0], r[2]) for r in pages[1]] == [("T9", 1.0)]
+    assert pages[0][0][3:5] == ("clubelo", "ClubElo")
+    assert json.loads(pages[0][0][5]) == {}
+
+
+def test_upsert_borrows_a_pooled_connection(tmp_path, monkeypatch):
+    class FakeCursor:
+        rowcount = 0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    class FakeConnection:
+        committed = closed = False
+
+        def cursor(self):
+            return FakeCursor()
+
+        def commit(self):
+            self.committed = True
+
+        def close(self):
+            self.closed = True
+
+    conn = FakeConnection()
+    pages = []
+    monkeypatch.setattr(elo_ratings_fetch, "get_connection", lambda: conn)
+    monkeypatch.setattr(elo_ratings_fetch, "execute_values", lambda cur, sql, page, page_size: pages.append(page))
+    path = tmp_path / "clubelo.csv"
+    path.write_text(CSV)
+
+    elo_ratings_fetch.upsert_elo_batches(iter_clubelo_records(str(path)), page_size=10)
+    assert sum(len(p) for p in pages) == 3
+    assert conn.committed and conn.closed
@@ -0,0 +1,84 @@
+# tests/test_elo_replay.py
+import random
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from scripts.elo_replay import EloReplay, conflict_free_batches
+from scripts.run_elo_updates import EloConfig, SoccerElo
+
+
+def synthetic_fixtures(n_teams=20, n_seasons=3, seed=7):
+    """Double round-robin seasons, one matchday per week, random scorelines."""
+    rng = random.Random(seed)
+    teams = [f"Team {i:02d}" for i in range(n_teams)]
+    fixtures = []
+    day = date(2000, 8, 1)
+    for _ in range(n_seasons):
+        order = teams[:]
+        rng.shuffle(order)
+        rounds = []
+        for r in range(n_teams - 1):
+            pairs = [(order[i], order[n_teams - 1 - i]) for i in range(n_teams // 2)]
+            rounds.append(pairs)
+            rounds.append([(b, a) for a, b in pairs])
+            order = [order[0]] + [order[-1]] + order[1:-1]
+        for pairs in rounds:
+            for home, away in pairs:
+                fixtures.append((day, home, away, rng.randint(0, 4), rng.randint(0, 3), None))
+            day += timedelta(days=7)
+    return fixtures
+
+
+def reference(fixtures, cfg, initial=None):
+    elo = SoccerElo(cfg)
+    if initial:
+        elo.ratings.update(initial)
+    pre = []
+    for _, home, away, hg, ag, _ in fixtures:
+        pre.append((elo.get(home), elo.get(away)))
+        elo.update_pair(home, away, hg, ag)
+    return elo.ratings, pre
+
+
+@pytest.mark.parametrize("cfg", [EloConfig(), EloConfig(base_rating=1000.0, k=32.0, home_adv=0.0)])
+def test_sequential_mode_matches_soccer_elo_exactly(cfg):
+    fixtures = synthetic_fixtures()
+    initial = {"Team 00": 1620.0, "Team 05": 1410.5}
+    expected, pre = reference(fixtures, cfg, initial)
+
+    result = EloReplay(cfg, initial).replay(fixtures, sequential=True)
+    assert result.ratings == expected
+    assert [tuple(p) for p in zip(result.pre_home, result.pre_away)] == pre
+
+
+def test_batched_mode_matches_soccer_elo():
+    cfg = EloConfig()
+    fixtures = synthetic_fixtures()
+    expected, pre = reference(fixtures, cfg)
+
+    result = EloReplay(cfg).replay(fixtures)
+    assert result.ratings.keys() == expected.keys()
+    for team, rating in expected.items():
+        assert result.ratings[team] == pytest.approx(rating, abs=1e-9)
+    np.testing.assert_allclose(np.column_stack([result.pre_home, result.pre_away]), pre, atol=1e-9)
+
+
+def test_batches_never_repeat_a_team():
+    fixtures = synthetic_fixtures(n_seasons=1)
+    replay = EloReplay(EloConfig())
+    home_ids, away_ids, _, _ = replay.encode(fixtures)
+    batches = conflict_free_batches(home_ids, away_ids)
+    assert len(batches) == 38
+    for start, stop in batches:
+        teams = np.concatenate([home_ids[start:stop], away_ids[start:stop]])
+        assert len(set(teams)) == len(teams)
+
+
+def test_decades_of_history_replay_quickly():
+    fixtures = synthetic_fixtures(n_seasons=40)
+    t0 = time.perf_counter()
+    EloReplay(EloConfig()).replay(fixtures)
+    assert time.perf_counter() - t0 < 1.0
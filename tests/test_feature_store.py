@@ -0,0 +1,94 @@
+# tests/test_feature_store.py
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from db import db_utils
+from models import Fixture
+from scripts.feature_store import FeatureStore, FormConfig, RunningWindow
+
+
+def naive_features(history, team, cfg):
+    """Recompute from scratch: what the running windows must agree with."""
+    goals = [g for t, g, _ in history if t == team]
+    wins = [w for t, _, w in history if t == team]
+    form = goals[-cfg.form_window:]
+    rate = wins[-cfg.win_window:]
+    return (sum(form) / len(form) if form else cfg.default_form_goals,
+            sum(rate) / len(rate) if rate else cfg.default_win_rate)
+
+
+def test_running_window_drops_oldest_value():
+    w = RunningWindow(3, [1, 2, 3])
+    w.push(10)
+    assert list(w.values) == [2, 3, 10]
+    assert w.mean(0.0) == pytest.approx(5.0)
+
+
+def test_incremental_updates_match_full_rescan():
+    rng = random.Random(3)
+    cfg = FormConfig(form_window=5, win_window=10)
+    store = FeatureStore(cfg)
+    teams = [f"T{i}" for i in range(6)]
+    history = []
+    for _ in range(300):
+        home, away = rng.sample(teams, 2)
+        hg, ag = rng.randint(0, 4), rng.randint(0, 4)
+        store.update(home, away, hg, ag)
+        history += [(home, hg, 1.0 if hg > ag else 0.0), (away, ag, 1.0 if ag > hg else 0.0)]
+    for team in teams:
+        form = store.team(team)
+        assert (form.form_goals, form.win_rate) == pytest.approx(naive_features(history, team, cfg))
+
+
+def test_elo_runner_persists_snapshot_and_resumes(session_factory):
+    from scripts import run_elo_updates
+
+    def add(rows):
+        db = session_factory()
+        for mdate, home, away, hg, ag in rows:
+            db.add(Fixture(match_date=mdate, home_team=home, away_team=away,
+                                    home_goals=hg, away_goals=ag, result="H", processed=False))
+        db.commit()
+        db.close()
+
+    start = date(2024, 8, 17)
+    games = [(start + timedelta(days=7 * i), "Arsenal", "Chelsea", i % 4, 1) for i in range(8)]
+    add(games[:5])
+    run_elo_updates.main()
+    add(games[5:])
+    run_elo_updates.main()  # second run only sees the three new fixtures
+
+    stats = {r["team_name"]: r for r in db_utils.get_team_stats_rows()}
+    full = FeatureStore()
+    for _, home, away, hg, ag in games:
+        full.update(home, away, hg, ag)
+    assert stats["Arsenal"]["form_goals"] == pytest.approx(full.team("Arsenal").form_goals)
+    assert stats["Arsenal"]["win_rate"] == pytest.approx(full.team("Arsenal").win_rate)
+    assert stats["Chelsea"]["matches_played"] == 8
+    assert stats["Arsenal"]["elo_rating"] == pytest.approx(db_utils.get_latest_elos()["Arsenal"])
+
+
+def test_rebuild_skips_unprocessed_fixtures(session_factory, monkeypatch):
+    import sys
+
+    from scripts import feature_store, run_elo_updates
+
+    db = session_factory()
+    start = date(2024, 8, 17)
+    for i in range(6):
+        db.add(Fixture(match_date=start + timedelta(days=7 * i), home_team="Arsenal", away_team="Chelsea",
+                       home_goals=2, away_goals=0, result="H", processed=False))
+    db.commit()
+    db.close()
+    run_elo_updates.main()
+    db_utils.bulk_insert_fixtures([{"match_date": start + timedelta(days=70), "home_team": "Chelsea",
+                                    "away_team": "Arsenal", "home_goals": 1, "away_goals": 1,
+                                    "result": "D", "processed": False}])
+
+    monkeypatch.setattr(sys, "argv", ["feature_store", "--rebuild"])
+    feature_store.main()
+    run_elo_updates.main()  # folds in the pending fixture exactly once
+    stats = {r["team_name"]: r for r in db_utils.get_team_stats_rows()}
+    assert stats["Arsenal"]["matches_played"] == 7
@@ -0,0 +1,103 @@
+# tests/test_fetch_sync.py
+from datetime import date
+
+import pytest
+
+from db import db_utils
+from scripts import fetch_data
+from league import season_of
+
+CURRENT = f"PL:{season_of(date.today())}"
+
+
+def match(day, home, away, hg, ag):
+    return {
+        "status": "FINISHED",
+        "utcDate": f"{day}T15:00:00Z",
+        "homeTeam": {"name": home},
+        "awayTeam": {"name": away},
+        "score": {"fullTime": {"home": hg, "away": ag}},
+    }
+
+
+class FakeResponse:
+    def __init__(self, status_code, matches=(), headers=None):
+        self.status_code = status_code
+        self._matches = list(matches)
+        self.headers = headers or {}
+
+    def json(self):
+        return {"matches": self._matches}
+
+
+@pytest.fixture
+def api(monkeypatch, session_factory):
+    calls = []
+    responses = []
+
+    def fake_request(params, extra_headers=None, retry=2, backoff=1.5):
+        calls.append((params, extra_headers))
+        return responses.pop(0)
+
+    monkeypatch.setattr(fetch_data, "_request_matches", fake_request)
+    return calls, responses
+
+
+def test_first_sync_fetches_everything_and_stores_watermark(api):
+    calls, responses = api
+    responses.append(FakeResponse(200, [
+        match("2024-08-17", "Arsenal FC", "Wolverhampton Wanderers FC", 2, 0),
+        match("2024-08-24", "Aston Villa FC", "Arsenal FC", 0, 2),
+    ], headers={"ETag": '"v1"'}))
+
+    assert fetch_data.sync_finished_matches() == (2, 0)
+    assert "dateFrom" not in calls[0][0]
+    assert calls[0][0]["season"] == season_of(date.today())
+    state = db_utils.get_sync_state(CURRENT)
+    assert state["watermark"] == date(2024, 8, 24)
+    assert state["etag"] == '"v1"'
+
+
+def test_next_sync_is_incremental_and_conditional(api):
+    calls, responses = api
+    first = [match("2024-08-24", "Aston Villa FC", "Arsenal FC", 0, 2)]
+    responses.append(FakeResponse(200, first, headers={"ETag": '"v1"'}))
+    fetch_data.sync_finished_matches(lookback_days=3)
+
+    # different query (now incremental): the full fetch's ETag doesn't apply
+    responses.append(FakeResponse(200, first, headers={"ETag": '"v2"'}))
+    assert fetch_data.sync_finished_matches(lookback_days=3) == (0, 1)
+    params, headers = calls[1]
+    assert params["dateFrom"] == "2024-08-21"
+    assert params["dateTo"] == f"{season_of(date.today()) + 1}-06-30"  # not today: stable across days
+    assert headers == {}
+
+    responses.append(FakeResponse(304))
+    assert fetch_data.sync_finished_matches(lookback_days=3) == (0, 0)
+    assert calls[2] == (params, {"If-None-Match": '"v2"'})
+
+
+def test_each_season_keeps_its_own_watermark(api):
+    calls, responses = api
+    responses.append(FakeResponse(200, [match("2024-05-19", "Arsenal FC", "Everton FC", 2, 1)]))
+    fetch_data.sync_finished_matches(season=2023)
+    responses.append(FakeResponse(200, [match("2024-08-17", "Arsenal FC", "Wolverhampton Wanderers FC", 2, 0)]))
+    fetch_data.sync_finished_matches(season=2024)
+
+    assert "dateFrom" not in calls[1][0]  # the new season starts with a full fetch
+    assert db_utils.get_sync_state("PL:2023")["watermark"] == date(2024, 5, 19)
+    assert db_utils.get_sync_state("PL:2024")["watermark"] == date(2024, 8, 17)
+
+
+def test_unchanged_payload_skips_db_write(api, monkeypatch):
+    calls, responses = api
+    payload = [match("2024-08-24", "Aston Villa FC", "Arsenal FC", 0, 2)]
+    responses.append(FakeResponse(200, payload))
+    fetch_data.sync_finished_matches()
+
+    def no_write(rows):
+        raise AssertionError("DB write should be skipped")
+
+    monkeypatch.setattr(fetch_data, "bulk_insert_fixtures", no_write)
+    responses.append(FakeResponse(200, payload))
+    assert fetch_data.sync_finished_matches() == (0, 1)
@@ -0,0 +1,48 @@
+# tests/test_inference.py
+import numpy as np
+import pytest
+
+from api.app import model
+from api.inference import Predictor
+
+X = np.array([
+    [1.5, 1.2, 0.6, 0.4, 1450, 1380],
+    [0.8, 2.1, 0.2, 0.7, 1390, 1560],
+    [1.1, 1.1, 0.4, 0.4, 1500, 1500],
+], dtype=np.float32)
+
+
+@pytest.mark.parametrize("backend", ["sklearn", "booster", "compiled"])
+def test_backends_match_sklearn_wrapper(backend):
+    predictor = Predictor(model, backend=backend)
+    np.testing.assert_allclose(predictor.predict_proba(X), model.predict_proba(X), atol=1e-6)
+
+
+def test_label_is_argmax_of_probabilities():
+    predictor = Predictor(model, backend="sklearn")
+    for row, expected in zip(X, model.predict(X)):
+        label, probabilities = predictor.predict(row)
+        assert label == int(expected)
+        assert probabilities.shape == (3,)
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        Predictor(model, backend="gpu")
+
+
+def test_compiled_backend_agrees_on_random_corpus():
+    rng = np.random.default_rng(42)
+    n = 20000
+    corpus = np.column_stack([
+        rng.uniform(0, 4, n), rng.uniform(0, 4, n),
+        rng.uniform(0, 1, n), rng.uniform(0, 1, n),
+        rng.uniform(1100, 2000, n), rng.uniform(1100, 2000, n),
+    ]).astype(np.float32)
+    # Values exactly on split thresholds, and missing values (default_left)
+    corpus[:200, 2] = 0.4
+    corpus[200:400, 0] = 2.0
+    corpus[400:600, 4] = np.nan
+
+    compiled = Predictor(model, backend="compiled")
+    np.testing.assert_allclose(compiled.predict_proba(corpus), model.predict_proba(corpus), atol=1e-6)
@@ -0,0 +1,16 @@
+# tests/test_league.py
+from datetime import date
+
+from league import season_bounds, season_of
+
+
+def test_season_boundary():
+    assert season_of(date(2024, 5, 19)) == 2023
+    assert season_of(date(2024, 8, 17)) == 2024
+    assert season_of(date(2024, 7, 1)) == 2024
+
+
+def test_season_bounds_cover_july_to_june():
+    start, end = season_bounds(2024)
+    assert (start, end) == (date(2024, 7, 1), date(2025, 7, 1))
+    assert season_of(start) == 2024 and season_of(end) == 2025
@@ -0,0 +1,82 @@
+# tests/test_metrics.py
+import time
+
+from api import app as app_module
+from metrics import Histogram, SamplingProfiler, StageTimer, render
+
+STATS = {
+    'Arsenal': {'form_goals': 1.5, 'win_rate': 0.6, 'elo_rating': 1450},
+    'Chelsea': {'form_goals': 1.2, 'win_rate': 0.4, 'elo_rating': 1380},
+}
+
+
+def test_histogram_exposition_is_cumulative():
+    hist = Histogram("demo_seconds", "Demo.", ["stage"], buckets=(0.1, 1.0), register=False)
+    for value in (0.05, 0.1, 0.5, 2.0):
+        hist.observe(value, stage="db")
+    text = render([hist])
+    assert 'demo_seconds_bucket{stage="db",le="0.1"} 2' in text
+    assert 'demo_seconds_bucket{stage="db",le="1.0"} 3' in text
+    assert 'demo_seconds_bucket{stage="db",le="+Inf"} 4' in text
+    assert 'demo_seconds_count{stage="db"} 4' in text
+    assert 'demo_seconds_sum{stage="db"} 2.65' in text
+
+
+def test_stage_timer_records_each_lap():
+    hist = Histogram("laps_seconds", "Laps.", ["endpoint", "stage"], register=False)
+    timer = StageTimer(hist, endpoint="/x")
+    timer.lap("parse")
+    timer.lap("inference")
+    assert hist.count(endpoint="/x", stage="parse") == 1
+    assert hist.count(endpoint="/x", stage="inference") == 1
+    assert set(timer.laps) == {"parse", "inference"}
+
+
+def test_sampling_profiler_sees_the_busy_function():
+    def busy_loop():
+        end = time.perf_counter() + 0.1
+        while time.perf_counter() < end:
+            pass
+
+    profiler = SamplingProfiler(interval=0.002).start()
+    busy_loop()
+    profiler.stop()
+    assert sum(profiler.samples.values()) > 0
+    assert "busy_loop" in profiler.collapsed()
+
+
+def test_metrics_endpoint_reports_request_stages(monkeypatch, tmp_path):
+    monkeypatch.setattr(app_module, 'get_team_stats_many',
+                        lambda teams: {t: STATS[t] for t in teams if t in STATS})
+    monkeypatch.setattr(app_module, 'PROFILING_ENABLED', True)
+    monkeypatch.setattr(app_module, 'PROFILE_TOKEN', 'secret')
+    monkeypatch.setattr(app_module, 'PROFILE_DIR', str(tmp_path))
+    client = app_module.app.test_client()
+
+    resp = client.post('/predict_match', json={'home_team': 'Arsenal', 'away_team': 'Chelsea'},
+                       headers={'X-Profile': 'secret'})
+    assert resp.status_code == 200
+    assert (tmp_path / resp.headers['X-Profile-File']).exists()
+
+    text = client.get('/metrics').get_data(as_text=True)
+    for stage in ('parse', 'db', 'inference', 'serialize'):
+        assert f'http_request_stage_seconds_count{{endpoint="/predict_match",stage="{stage}"}}' in text
+    assert 'http_request_duration_seconds_count{endpoint="/predict_match",method="POST",status="200"}' in text
+
+
+def test_profiling_requires_the_token(monkeypatch, tmp_path):
+    monkeypatch.setattr(app_module, 'get_team_stats_many',
+                        lambda teams: {t: STATS[t] for t in teams if t in STATS})
+    monkeypatch.setattr(app_module, 'PROFILING_ENABLED', True)
+    monkeypatch.setattr(app_module, 'PROFILE_DIR', str(tmp_path))
+    client = app_module.app.test_client()
+    body = {'home_team': 'Arsenal', 'away_team': 'Chelsea'}
+
+    monkeypatch.setattr(app_module, 'PROFILE_TOKEN', None)
+    resp = client.post('/predict_match', json=body, headers={'X-Profile': '1'})
+    assert resp.status_code == 200 and 'X-Profile-File' not in resp.headers
+
+    monkeypatch.setattr(app_module, 'PROFILE_TOKEN', 'secret')
+    resp = client.post('/predict_match', json=body, headers={'X-Profile': 'wrong'})
+    assert 'X-Profile-File' not in resp.headers
+    assert list(tmp_path.iterdir()) == []
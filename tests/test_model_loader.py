@@ -0,0 +1,38 @@
+# tests/test_model_loader.py
+import os
+
+import pytest
+
+from api import model_loader
+from league import FEATURE_NAMES
+
+
+def test_loads_validates_and_reports_timings():
+    model, timings = model_loader.load_model(FEATURE_NAMES, path=model_loader.JSON_PATH)
+    assert model.n_classes_ == 3
+    for key in ('import_xgboost_ms', 'load_ms', 'validate_ms', 'warmup_ms'):
+        assert timings[key] >= 0
+
+
+def test_empty_model_file_fails_clearly(tmp_path):
+    empty = tmp_path / 'model.json'
+    empty.write_text('')
+    with pytest.raises(model_loader.ModelLoadError, match='empty'):
+        model_loader.load_model(FEATURE_NAMES, path=str(empty))
+
+
+def test_feature_mismatch_is_rejected():
+    with pytest.raises(model_loader.ModelLoadError):
+        model_loader.load_model(FEATURE_NAMES[::-1], path=model_loader.JSON_PATH)
+
+
+def test_ubj_export_round_trips_and_is_preferred(tmp_path, monkeypatch):
+    ubj = tmp_path / 'model.ubj'
+    model_loader.export_ubj(dst=str(ubj))
+    monkeypatch.setattr(model_loader, 'UBJ_PATH', str(ubj))
+    monkeypatch.delenv('MODEL_PATH', raising=False)
+    os.utime(ubj, (os.path.getmtime(model_loader.JSON_PATH) + 1,) * 2)
+    assert model_loader.resolve_model_path() == str(ubj)
+
+    model, timings = model_loader.load_model(FEATURE_NAMES)
+    assert timings['model_path'] == 'model.ubj'
@@ -0,0 +1,104 @@
+# tests/test_predict_batch.py
+import pytest
+
+from api import app as app_module
+
+ROW = {
+    'home_form_goals': 1.5,
+    'away_form_goals': 1.2,
+    'home_win_rate': 0.6,
+    'away_win_rate': 0.4,
+    'elo_home': 1450,
+    'elo_away': 1380,
+}
+
+STATS = {
+    'Arsenal': {'form_goals': 1.5, 'win_rate': 0.6, 'elo_rating': 1450},
+    'Chelsea': {'form_goals': 1.2, 'win_rate': 0.4, 'elo_rating': 1380},
+}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    lookups = []
+
+    def fake_stats_many(teams):
+        lookups.append(list(teams))
+        return {team: STATS[team] for team in teams if team in STATS}
+
+    monkeypatch.setattr(app_module, 'get_team_stats_many', fake_stats_many)
+    client = app_module.app.test_client()
+    client.lookups = lookups
+    return client
+
+
+def test_batch_matches_single_predictions_in_order(client):
+    rows = [
+        ROW,
+        [ROW[name] for name in app_module.FEATURE_NAMES],
+        {'home_team': 'Arsenal', 'away_team': 'Chelsea'},
+    ]
+    resp = client.post('/predict_batch', json={'rows': rows})
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body['count'] == 3 and body['errors'] == 0
+
+    single = client.post('/predict', json=ROW).get_json()
+    for result in body['results']:
+        assert result == single
+
+
+def test_batch_reports_errors_per_row(client):
+    rows = [
+        {'home_team': 'Arsenal', 'away_team': 'Nowhere FC'},
+        {'home_form_goals': 1.0},
+        [1, 2, 3],
+        ROW,
+    ]
+    resp = client.post('/predict_batch', json=rows)
+    assert resp.status_code == 200
+    results = resp.get_json()['results']
+    assert 'Nowhere FC' in results[0]['error']
+    assert results[1]['error'].startswith('Missing field')
+    assert 'error' in results[2]
+    assert results[3]['prediction'] in app_module.label_map.values()
+
+
+def test_batch_scores_feature_rows_when_the_team_lookup_fails(client, monkeypatch):
+    def broken_stats_many(teams):
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(app_module, 'get_team_stats_many', broken_stats_many)
+    rows = [ROW, {'home_team': 'Arsenal', 'away_team': 'Chelsea'},
+            [ROW[name] for name in app_module.FEATURE_NAMES]]
+    resp = client.post('/predict_batch', json=rows)
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body['errors'] == 1
+    assert 'database is down' in body['results'][1]['error']
+    single = client.post('/predict', json=ROW).get_json()
+    assert body['results'][0] == single and body['results'][2] == single
+
+
+def test_batch_fetches_all_teams_in_one_lookup(client):
+    rows = [{'home_team': 'Arsenal', 'away_team': 'Chelsea'},
+            {'home_team': 'Chelsea', 'away_team': 'Arsenal'}] * 5
+    client.post('/predict_batch', json=rows)
+    assert len(client.lookups) == 1
+
+
+def test_predict_match_uses_one_lookup_for_both_teams(client):
+    resp = client.post('/predict_match', json={'home_team': 'Arsenal', 'away_team': 'Chelsea'})
+    assert resp.status_code == 200
+    assert client.lookups == [['Arsenal', 'Chelsea']]
+
+
+def test_batch_rejects_non_list_body(client):
+    resp = client.post('/predict_batch', json={'rows': 'nope'})
+    assert resp.status_code == 400
+
+
+def test_healthz_reports_ready_once_model_loaded(client, monkeypatch):
+    assert client.get('/healthz').get_json()['model_loaded'] is True
+    monkeypatch.setattr(app_module, 'model_ready', False)
+    assert client.get('/healthz').status_code == 503
@@ -0,0 +1,53 @@
+# tests/test_prediction_log.py
+import json
+import time
+
+from api.prediction_log import PredictionLogger, prediction_record, write_jsonl
+
+
+def _record(i):
+    return prediction_record('/predict', [i, 1, 0.5, 0.5, 1500, 1500], 'Draw',
+                             {'Home Win': 0.3, 'Draw': 0.4, 'Away Win': 0.3})
+
+
+def test_flushes_by_size_and_on_close(tmp_path):
+    batches = []
+    logger = PredictionLogger(batches.append, batch_size=10, flush_interval=60)
+    for i in range(25):
+        logger.log(_record(i))
+
+    deadline = time.monotonic() + 5
+    while len(batches) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [len(b) for b in batches] == [10, 10]
+
+    logger.close()
+    assert [len(b) for b in batches] == [10, 10, 5]
+    assert [r['features'][0] for b in batches for r in b] == [float(i) for i in range(25)]
+    logger.log(_record(99))  # ignored after close
+    assert logger.written == 25
+
+
+def test_flushes_by_time(tmp_path):
+    path = tmp_path / "predictions.jsonl"
+    logger = PredictionLogger(write_jsonl(str(path)), batch_size=1000, flush_interval=0.05)
+    logger.log(_record(1))
+    deadline = time.monotonic() + 5
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    line = json.loads(path.read_text())
+    assert line['predicted_result'] == 'Draw' and line['endpoint'] == '/predict'
+    logger.close()
+
+
+def test_failed_writes_are_retried_then_spilled(tmp_path):
+    fallback = tmp_path / "fallback.jsonl"
+
+    def broken(batch):
+        raise RuntimeError("db down")
+
+    logger = PredictionLogger(broken, batch_size=2, flush_interval=0.01, fallback_path=str(fallback))
+    for i in range(3):
+        logger.log(_record(i))
+    logger.close()
+    assert len(fallback.read_text().splitlines()) == 3
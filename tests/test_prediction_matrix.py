@@ -0,0 +1,82 @@
+# tests/test_prediction_matrix.py
+import numpy as np
+import pytest
+
+from api import app as app_module
+from api.inference import Predictor
+from api.prediction_matrix import PredictionMatrix
+
+STATS = {
+    'Arsenal': {'form_goals': 1.5, 'win_rate': 0.6, 'elo_rating': 1450},
+    'Chelsea': {'form_goals': 1.2, 'win_rate': 0.4, 'elo_rating': 1380},
+    'Everton': {'form_goals': 0.9, 'win_rate': 0.3, 'elo_rating': 1320},
+}
+
+
+@pytest.fixture
+def matrix():
+    calls = []
+
+    def load_stats():
+        calls.append(1)
+        return STATS
+
+    m = PredictionMatrix(Predictor(app_module.model, backend='sklearn'), load_stats)
+    m.calls = calls
+    return m
+
+
+def test_lookup_matches_direct_prediction(matrix):
+    predictor = matrix.predictor
+    for home in STATS:
+        for away in STATS:
+            if home == away:
+                continue
+            h, a = STATS[home], STATS[away]
+            _, expected = predictor.predict([h['form_goals'], a['form_goals'], h['win_rate'],
+                                             a['win_rate'], h['elo_rating'], a['elo_rating']])
+            np.testing.assert_allclose(matrix.lookup(home, away), expected, atol=1e-6)
+    assert len(matrix.calls) == 1
+
+
+def test_unknown_or_same_team_returns_none(matrix):
+    assert matrix.lookup('Arsenal', 'Nowhere FC') is None
+    assert matrix.lookup('Arsenal', 'Arsenal') is None
+
+
+def test_mark_stale_triggers_rebuild(matrix):
+    matrix.lookup('Arsenal', 'Chelsea')
+    matrix.mark_stale()
+    matrix.lookup('Arsenal', 'Chelsea')
+    assert len(matrix.calls) == 2
+
+
+def test_predict_match_and_matrix_endpoint_served_from_table(monkeypatch, matrix):
+    monkeypatch.setattr(app_module, 'prediction_matrix', matrix)
+    monkeypatch.setattr(app_module, 'MATERIALIZED_PREDICTIONS', True)
+
+    def no_db(teams):
+        raise AssertionError('DB should not be queried')
+
+    monkeypatch.setattr(app_module, 'get_team_stats_many', no_db)
+    client = app_module.app.test_client()
+
+    resp = client.post('/predict_match', json={'home_team': 'Arsenal', 'away_team': 'Chelsea'})
+    assert resp.status_code == 200
+    assert resp.get_json()['prediction'] in app_module.label_map.values()
+
+    body = client.get('/matrix').get_json()
+    assert body['teams'] == sorted(STATS)
+    assert body['probabilities'][0][0] is None
+    assert len(body['probabilities'][0][1]) == 3
+
+
+def test_matrix_expires_after_max_age(matrix, monkeypatch):
+    matrix.max_age = 60
+    first = matrix.ensure_fresh()
+    assert not matrix.stale
+    monkeypatch.setattr(matrix, 'snapshot', first._replace(built_at=first.built_at - 61))
+    matrix.lookup('Arsenal', 'Chelsea')
+    assert len(matrix.calls) == 2
+    assert matrix.snapshot is not first
+    assert not matrix.snapshot.probabilities.flags.writeable
@@ -0,0 +1,120 @@
+# tests/test_season_sim.py
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from api import app as app_module
+from api import simulation
+from db import db_utils
+from scripts import season_sim
+from scripts.season_sim import elo_probabilities, season_state, simulate
+
+FIXTURES = [
+    (date(2024, 8, 17), "A", "B", 2, 0, "H"),
+    (date(2024, 8, 17), "C", "D", 1, 1, "D"),
+    (date(2024, 8, 24), "B", "C", 0, 3, "A"),
+    (date(2023, 9, 1), "A", "D", 0, 5, "A"),  # previous season, ignored
+]
+CLUBS = list("ABCD")
+
+# A finished 20-club 2023 season where the lower-numbered club always wins at
+# home and draws away, so C17-C19 finish bottom and go down.
+LAST_SEASON = [f"C{i:02d}" for i in range(20)]
+PREVIOUS = [
+    (date(2023, 8, 12) + timedelta(days=7 * (k // 10)), home, away, *((1, 0, "H") if home < away else (0, 0, "D")))
+    for k, (home, away) in enumerate((h, a) for h in LAST_SEASON for a in LAST_SEASON if h != a)
+]
+
+
+def test_season_state_builds_table_and_remaining_pairs():
+    state = season_state(FIXTURES, teams=CLUBS)
+    assert state.season == 2024
+    assert state.teams == ["A", "B", "C", "D"]
+    assert state.points.tolist() == [3, 0, 4, 1]
+    assert state.goal_diff.tolist() == [2, -5, 3, 0]
+    assert len(state.remaining) == 4 * 3 - 3
+    assert ("A", "B") not in state.remaining and ("B", "A") in state.remaining
+
+
+def test_elo_probabilities_are_consistent_with_expectation():
+    probs = elo_probabilities([("A", "B"), ("B", "A")], {"A": 1600, "B": 1500}, home_adv=65)
+    assert np.allclose(probs.sum(axis=1), 1)
+    assert (probs > 0).all()
+    assert probs[0, 0] > probs[1, 0]
+
+
+def test_certain_outcomes_give_a_certain_table():
+    state = season_state(FIXTURES, teams=CLUBS)
+    # every remaining game is a home win
+    probs = np.tile([1.0, 0.0, 0.0], (len(state.remaining), 1))
+    summary = simulate(state, probs, n_sims=1000, workers=1, seed=0, chunk=300)
+    table = {r["team"]: r for r in summary["table"]}
+    home_games = {t: sum(1 for h, _ in state.remaining if h == t) for t in state.teams}
+    for team, row in table.items():
+        assert row["expected_points"] == row["points"] + 3 * home_games[team]
+    assert summary["simulations"] == 1000
+    assert sum(r["title"] for r in summary["table"]) == 1.0
+
+
+def test_simulate_endpoint_is_cached(monkeypatch):
+    calls = []
+
+    def fake_fixtures(season=None):
+        calls.append(season)
+        return 2024, FIXTURES[:3]
+
+    stats = {t: {"form_goals": 1.4, "win_rate": 0.4, "elo_rating": 1500 + 10 * i}
+             for i, t in enumerate("ABCD")}
+    monkeypatch.setattr(simulation, "season_fixtures", fake_fixtures)
+    monkeypatch.setattr(season_sim, "LEAGUE_SIZE", 4)
+    monkeypatch.setattr(simulation, "get_all_team_stats", lambda: stats)
+    simulation.invalidate()
+    client = app_module.app.test_client()
+
+    first = client.get('/simulate?sims=2000&source=model').get_json()
+    second = client.get('/simulate?sims=2000&source=model').get_json()
+    assert first["cached"] is False and second["cached"] is True
+    assert len(calls) == 1
+    assert {r["team"] for r in first["table"]} == set("ABCD")
+
+    simulation.invalidate()
+    assert client.get('/simulate?sims=2000&source=model').get_json()["cached"] is False
+    assert client.get('/simulate?source=nope').status_code == 400
+
+
+def test_season_fixtures_reads_the_latest_season(session_factory):
+    with pytest.raises(ValueError):
+        simulation.season_fixtures()
+    db_utils.bulk_insert_fixtures([
+        dict(match_date=date(2024, 5, 19), home_team="A", away_team="B", home_goals=1, away_goals=0,
+             result="H", processed=True),
+        dict(match_date=date(2024, 8, 17), home_team="B", away_team="A", home_goals=2, away_goals=2,
+             result="D", processed=True),
+    ])
+    season, fixtures = simulation.season_fixtures()
+    assert season == 2024
+    assert [f[0] for f in fixtures] == [date(2024, 5, 19), date(2024, 8, 17)]  # with the previous season
+
+
+def test_opening_weekend_is_rejected_until_the_clubs_are_known(monkeypatch):
+    opening = [(date(2024, 8, 16), "C00", "New1", 1, 0, "H")]
+    # one game in: 17 clubs stayed up and one promoted club has played, two are unknown
+    with pytest.raises(ValueError, match="only 2 of 20 clubs"):
+        season_state(PREVIOUS + opening)
+    with pytest.raises(ValueError):
+        season_state(opening)  # no previous season to fill in from
+
+    monkeypatch.setattr(simulation, "season_fixtures", lambda season=None: (2024, PREVIOUS + opening))
+    monkeypatch.setattr(simulation, "get_all_team_stats", lambda: {})
+    simulation.invalidate()
+    assert app_module.app.test_client().get('/simulate?sims=100&source=elo').status_code == 400
+
+
+def test_clubs_yet_to_play_come_from_last_seasons_table():
+    opening = [(date(2024, 8, 16), "C00", "New1", 1, 0, "H"),
+               (date(2024, 8, 17), "New2", "New3", 2, 2, "D")]
+    state = season_state(PREVIOUS + opening)
+    assert state.teams == sorted(LAST_SEASON[:17] + ["New1", "New2", "New3"])
+    assert len(state.remaining) == 20 * 19 - 2
+    assert state.points.sum() == 5 and state.played.sum() == 4
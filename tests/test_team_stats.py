@@ -0,0 +1,136 @@
+# tests/test_team_stats.py
+from contextlib import contextmanager
+
+import pytest
+
+from api import team_stats
+
+ROWS = [
+    ("Arsenal", 1.5, 0.6, 1450.0),
+    ("Chelsea", 1.2, 0.4, 1380.0),
+]
+
+
+class FakeCursor:
+    def __init__(self, queries):
+        self.queries = queries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params):
+        self.queries.append(params[0])
+        self._rows = [r for r in ROWS if r[0] in params[0]]
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeConnection:
+    def __init__(self, queries):
+        self.queries = queries
+
+    def cursor(self):
+        return FakeCursor(self.queries)
+
+
+class FakeListener:
+    def __init__(self):
+        self.notifies = []
+
+    def poll(self):
+        pass
+
+
+@pytest.fixture
+def db(monkeypatch):
+    queries = []
+
+    @contextmanager
+    def fake_pooled_connection():
+        yield FakeConnection(queries)
+
+    listener = FakeListener()
+    monkeypatch.setattr(team_stats, "pooled_connection", fake_pooled_connection)
+    monkeypatch.setattr(team_stats, "_listen_conn", listener)
+    team_stats.invalidate()
+    yield queries, listener
+    team_stats.invalidate()
+
+
+def test_both_teams_fetched_in_one_query_then_cached(db):
+    queries, _ = db
+    stats = team_stats.get_team_stats_many(["Arsenal", "Chelsea"])
+    assert stats["Arsenal"]["elo_rating"] == 1450.0
+    assert queries == [["Arsenal", "Chelsea"]]
+
+    team_stats.get_team_stats_many(["Chelsea", "Arsenal"])
+    assert len(queries) == 1
+
+
+def test_unknown_team_is_absent(db):
+    assert team_stats.get_team_stats_many(["Nowhere FC"]) == {}
+
+
+def test_notification_invalidates_cache(db):
+    queries, listener = db
+    team_stats.get_team_stats_many(["Arsenal"])
+    listener.notifies.append(object())
+    team_stats.get_team_stats_many(["Arsenal"])
+    assert len(queries) == 2
+    assert listener.notifies == []
+
+
+def test_expired_entries_are_refetched(db, monkeypatch):
+    queries, _ = db
+    monkeypatch.setattr(team_stats, "CACHE_TTL", -1)
+    team_stats.get_team_stats_many(["Arsenal"])
+    team_stats.get_team_stats_many(["Arsenal"])
+    assert len(queries) == 2
+
+
+def test_listener_failure_is_retried_with_backoff(monkeypatch):
+    attempts = []
+    clock = [1000.0]
+
+    def connect(url):
+        attempts.append(clock[0])
+        if len(attempts) < 3:
+            raise OSError("connection refused")
+        return FakeListenConnection()
+
+    class FakeListenConnection(FakeListener):
+        autocommit = False
+
+        def cursor(self):
+            return FakeListenCursor()
+
+    class FakeListenCursor(FakeCursor):
+        def __init__(self):
+            super().__init__([])
+
+        def execute(self, sql, params=None):
+            assert sql.startswith("LISTEN")
+
+    monkeypatch.setattr(team_stats.psycopg2, "connect", connect)
+    monkeypatch.setattr(team_stats.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(team_stats, "_database_url", lambda: "postgresql://test")
+    monkeypatch.setattr(team_stats, "_listen_conn", None)
+    monkeypatch.setattr(team_stats, "_listen_retry_at", 0.0)
+    monkeypatch.setattr(team_stats, "_listen_backoff", 0.0)
+    monkeypatch.setattr(team_stats, "LISTEN_RETRY_MIN", 1.0)
+
+    team_stats._poll_listener()          # fails, retry in 1s
+    team_stats._poll_listener()          # too early: no new attempt
+    clock[0] += 1.0
+    team_stats._poll_listener()          # fails, retry in 2s
+    clock[0] += 1.0
+    team_stats._poll_listener()          # still backing off
+    clock[0] += 1.0
+    team_stats._poll_listener()          # connects
+    assert attempts == [1000.0, 1001.0, 1003.0]
+    assert team_stats._listen_conn is not None
+    assert team_stats._listen_backoff == 0.0
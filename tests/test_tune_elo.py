@@ -0,0 +1,50 @@
+# tests/test_tune_elo.py
+import json
+import math
+
+import pytest
+
+from scripts import run_elo_updates
+from scripts.elo_replay import replay_configs
+from scripts.run_elo_updates import EloConfig, SoccerElo
+from scripts.tune_elo import grid_search, parse_range
+from tests.test_elo_replay import synthetic_fixtures
+
+
+def reference_log_loss(fixtures, cfg, burn_in):
+    elo = SoccerElo(cfg)
+    total, n = 0.0, 0
+    for i, (_, home, away, hg, ag, _) in enumerate(fixtures):
+        e = elo.expected(elo.get(home) + cfg.home_adv - elo.get(away))
+        s = 1.0 if hg > ag else 0.0 if ag > hg else 0.5
+        if i >= burn_in:
+            total -= s * math.log(e) + (1 - s) * math.log(1 - e)
+            n += 1
+        elo.update_pair(home, away, hg, ag)
+    return total / n
+
+
+def test_vectorized_configs_match_soccer_elo():
+    fixtures = synthetic_fixtures(n_seasons=2)
+    configs = [EloConfig(k=24, home_adv=65), EloConfig(k=10, home_adv=0), EloConfig(k=40, home_adv=100)]
+    losses = replay_configs(fixtures, [c.k for c in configs], [c.home_adv for c in configs], burn_in=50)
+    for cfg, loss in zip(configs, losses):
+        assert loss == pytest.approx(reference_log_loss(fixtures, cfg, 50), rel=1e-9)
+
+
+def test_grid_search_picks_lowest_loss():
+    fixtures = synthetic_fixtures(n_seasons=2)
+    k_values, h_values = parse_range("10:30:10"), parse_range("0,50")
+    cfg, loss, grid = grid_search(fixtures, k_values, h_values, burn_in=50, workers=1)
+    assert grid.shape == (3, 2)
+    brute = min((reference_log_loss(fixtures, EloConfig(k=k, home_adv=h), 50), k, h)
+                for k in k_values for h in h_values)
+    assert (cfg.k, cfg.home_adv) == (brute[1], brute[2])
+    assert loss == pytest.approx(brute[0])
+
+
+def test_pipeline_loads_tuned_config(tmp_path):
+    path = tmp_path / "elo_config.json"
+    path.write_text(json.dumps({"k": 18.0, "home_adv": 52.0, "base_rating": 1500.0, "log_loss": 0.6}))
+    assert run_elo_updates.load_elo_config(str(path)) == EloConfig(k=18.0, home_adv=52.0)
+    assert run_elo_updates.load_elo_config(str(tmp_path / "missing.json")) == EloConfig()